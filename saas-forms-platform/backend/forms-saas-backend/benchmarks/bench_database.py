@@ -0,0 +1,94 @@
+"""Concurrent submit/read benchmark comparing database modes
+
+Runs writer and reader threads against the forms API for a fixed time
+and reports throughput and latency per operation for each mode:
+
+  sqlite-default   SQLite with stock connection settings
+  sqlite-tuned     SQLite with WAL and the pragmas from src/models/engine.py
+  url              whatever --database-url points at (e.g. PostgreSQL)
+
+Usage: python benchmarks/bench_database.py [--writers 8] [--readers 8] [--seconds 5]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from common import make_app, summarize
+
+def run_mode(database_url, tuned, writers, readers, seconds):
+    app = make_app(database_url, SQLITE_TUNED=tuned)
+    client = app.test_client()
+    form_id = client.post('/api/forms', json={
+        'name': 'Benchmark',
+        'fields': [
+            {'name': 'email', 'type': 'email', 'required': True},
+            {'name': 'message', 'type': 'textarea'},
+        ]
+    }).get_json()['form']['id']
+    
+    results = {'submit': ([], [0]), 'read': ([], [0])}
+    stop = threading.Event()
+    
+    def worker(kind):
+        latencies, errors = results[kind]
+        worker_client = app.test_client()
+        counter = 0
+        while not stop.is_set():
+            counter += 1
+            started = time.perf_counter()
+            if kind == 'submit':
+                response = worker_client.post(f'/api/forms/{form_id}/submit', json={
+                    'data': {'email': f'user{counter}@example.com', 'message': 'Hello ' * 20}
+                })
+            else:
+                response = worker_client.get(f'/api/forms/{form_id}/entries?limit=50')
+            elapsed = time.perf_counter() - started
+            if response.status_code < 400:
+                latencies.append(elapsed)
+            else:
+                errors[0] += 1
+    
+    threads = [threading.Thread(target=worker, args=('submit',)) for _ in range(writers)]
+    threads += [threading.Thread(target=worker, args=('read',)) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    return {kind: summarize(latencies, elapsed, errors[0]) for kind, (latencies, errors) in results.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--database-url', help='Also benchmark this database (it must be empty)')
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix='tid-forms-bench-')
+    modes = [
+        ('sqlite-default', f'sqlite:///{os.path.join(workdir, "default.db")}', False),
+        ('sqlite-tuned', f'sqlite:///{os.path.join(workdir, "tuned.db")}', True),
+    ]
+    if args.database_url:
+        modes.append(('url', args.database_url, False))
+    
+    try:
+        print(f'{"mode":<16} {"op":<7} {"req/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>7}')
+        for name, database_url, tuned in modes:
+            report = run_mode(database_url, tuned, args.writers, args.readers, args.seconds)
+            for kind, stats in report.items():
+                print(f'{name:<16} {kind:<7} {stats["throughput"]:>9.1f} {stats["p50_ms"]:>8.2f} '
+                      f'{stats["p95_ms"]:>8.2f} {stats["p99_ms"]:>8.2f} {stats["errors"]:>7}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
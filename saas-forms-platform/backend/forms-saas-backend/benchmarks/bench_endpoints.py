@@ -0,0 +1,255 @@
+"""Endpoint benchmark with JSON results and regression checks
+
+Seeds a fresh SQLite database with --forms forms of --fields fields each
+and --entries entries on the benchmarked form, then times the key
+endpoints:
+
+  get_forms          GET  /api/forms
+  get_forms_sparse   GET  /api/forms?fields=id,name,theme,entry_count&limit=50
+  get_form_entries   GET  /api/forms/<id>/entries?limit=50
+  export             GET  /api/forms/<id>/entries/export (whole CSV)
+  embed              GET  /api/embed/<id>
+  submit             POST /api/forms/<id>/submit
+
+through the Flask test client and, with --server, against src.main served
+by a threaded werkzeug server and driven by --concurrency client threads.
+
+Results (throughput and p50/p95/p99 per target and endpoint) are saved to
+--output. With --baseline, endpoints whose p95 grew or throughput dropped
+by more than --threshold compared to that file are flagged and the script
+exits with status 1.
+
+Usage:
+  python benchmarks/bench_endpoints.py [--forms 200] [--fields 12] [--entries 20000]
+      [--requests 300] [--server] [--output bench.json] [--baseline old.json]
+"""
+import argparse
+from datetime import datetime, timedelta
+import http.client
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from common import BACKEND_DIR, free_port, make_app, start_server, summarize
+from bench_render import make_fields
+
+from src.models.form import db, Form, FormEntry
+from src.services.entries import backfill_entry_values
+from src.services.lookups import client_ids
+from src.services.stats import rebuild_stats
+
+SEED_CHUNK_SIZE = 1000
+SAMPLE_VALUES = {
+    'email': 'user{index}@example.com',
+    'number': '{index}',
+    'tel': '+1555{index:07d}',
+    'url': 'https://example.com/{index}',
+    'date': '2024-01-02',
+    'file': 'upload-{index}.pdf',
+    'gdpr_consent': '1',
+}
+SERVER_CODE = ("from werkzeug.serving import run_simple; from src.main import app; "
+               "run_simple('127.0.0.1', {port}, app, threaded=True)")
+
+def sample_data(fields, index):
+    """Build submission data that passes validation for the given fields"""
+    data = {}
+    for field in fields:
+        field_type = field['type']
+        if field_type in ('select', 'radio'):
+            value = field['options'][index % len(field['options'])]
+        elif field_type == 'checkbox':
+            value = [field['options'][index % len(field['options'])]]
+        else:
+            value = SAMPLE_VALUES.get(field_type, 'Value {index} for the benchmark').format(index=index)
+        data[field['name']] = value
+    return data
+
+def seed(app, forms, fields, entries):
+    """Create the forms and entries; returns the benchmarked form's id and fields"""
+    definition = make_fields(fields)
+    with app.app_context():
+        db.session.add_all(Form(name=f'Form {index}', fields=definition, settings={}) for index in range(forms))
+        db.session.commit()
+        form_id = db.session.query(db.func.min(Form.id)).scalar()
+        
+        started = datetime.utcnow() - timedelta(minutes=entries)
+        client = client_ids('127.0.0.1', 'bench')
+        for start in range(0, entries, SEED_CHUNK_SIZE):
+            db.session.execute(db.insert(FormEntry), [{
+                'form_id': form_id,
+                'data': sample_data(definition, index),
+                **client,
+                'submitted_at': started + timedelta(minutes=index)
+            } for index in range(start, min(start + SEED_CHUNK_SIZE, entries))])
+            db.session.commit()
+        
+        backfill_entry_values()
+        rebuild_stats(form_id)
+    return form_id, definition
+
+def scenarios(form_id, definition):
+    """(name, method, path, body factory, requests multiplier) per endpoint"""
+    def submit_body(index):
+        return {'data': sample_data(definition, index)}
+    
+    return [
+        ('get_forms', 'GET', '/api/forms', None, 1),
+        ('get_forms_sparse', 'GET', '/api/forms?fields=id,name,theme,entry_count&limit=50', None, 1),
+        ('get_form_entries', 'GET', f'/api/forms/{form_id}/entries?limit=50', None, 1),
+        ('export', 'GET', f'/api/forms/{form_id}/entries/export', None, 0.02),
+        ('embed', 'GET', f'/api/embed/{form_id}', None, 1),
+        ('submit', 'POST', f'/api/forms/{form_id}/submit', submit_body, 1),
+    ]
+
+def run_client(app, form_id, definition, requests):
+    client = app.test_client()
+    results = {}
+    for name, method, path, body, multiplier in scenarios(form_id, definition):
+        count = max(3, int(requests * multiplier))
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        for index in range(count):
+            request_started = time.perf_counter()
+            response = client.open(path, method=method, json=body(index) if body else None)
+            # Consume streamed bodies so exports are timed end to end
+            response.get_data()
+            if response.status_code < 400:
+                latencies.append(time.perf_counter() - request_started)
+            else:
+                errors += 1
+        results[name] = summarize(latencies, time.perf_counter() - started, errors)
+    return results
+
+def run_server(database_url, form_id, definition, requests, concurrency):
+    port = free_port()
+    process = start_server(SERVER_CODE.format(port=port), port,
+                           {'DATABASE_URL': database_url, 'METRICS_ENABLED': '0', 'RATE_LIMIT_ENABLED': '0'}, name='werkzeug server')
+    try:
+        results = {}
+        for name, method, path, body, multiplier in scenarios(form_id, definition):
+            count = max(concurrency, int(requests * multiplier))
+            results[name] = drive(port, method, path, body, count, concurrency)
+        return results
+    finally:
+        process.terminate()
+        process.wait()
+
+def drive(port, method, path, body, count, concurrency):
+    """Send count requests from concurrency threads and summarize them"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    
+    def worker(offset):
+        for index in range(offset, count, concurrency):
+            payload = json.dumps(body(index)).encode('utf-8') if body else None
+            started = time.perf_counter()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            try:
+                connection.request(method, path, payload, {'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except OSError:
+                status = 599
+            finally:
+                connection.close()
+            elapsed = time.perf_counter() - started
+            with lock:
+                if status < 400:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+    
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started, errors[0])
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold):
+    """List regressions of p95 latency or throughput beyond threshold"""
+    regressions = []
+    for target, endpoints in results.items():
+        for name, stats in endpoints.items():
+            before = baseline.get('results', {}).get(target, {}).get(name)
+            if not before:
+                continue
+            if before['p95_ms'] and stats['p95_ms'] > before['p95_ms'] * (1 + threshold):
+                regressions.append(f'{target}/{name}: p95 {before["p95_ms"]:.2f}ms -> {stats["p95_ms"]:.2f}ms')
+            if before['throughput'] and stats['throughput'] < before['throughput'] * (1 - threshold):
+                regressions.append(f'{target}/{name}: throughput '
+                                   f'{before["throughput"]:.1f} -> {stats["throughput"]:.1f} req/s')
+    return regressions
+
+def print_results(results):
+    print(f'{"target":<7} {"endpoint":<17} {"req/s":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"errors":>7}')
+    for target, endpoints in results.items():
+        for name, stats in endpoints.items():
+            print(f'{target:<7} {name:<17} {stats["throughput"]:>9.1f} {stats["p50_ms"]:>9.2f} '
+                  f'{stats["p95_ms"]:>9.2f} {stats["p99_ms"]:>9.2f} {stats["errors"]:>7}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--forms', type=int, default=200)
+    parser.add_argument('--fields', type=int, default=12)
+    parser.add_argument('--entries', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=300, help='Requests per endpoint (exports run 2%%)')
+    parser.add_argument('--server', action='store_true', help='Also benchmark a real local server')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--output', default='bench-results.json')
+    parser.add_argument('--baseline', help='Results file from an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed regression, as a fraction')
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix='tid-forms-bench-')
+    try:
+        database_url = f'sqlite:///{os.path.join(workdir, "bench.db")}'
+        app = make_app(database_url)
+        form_id, definition = seed(app, args.forms, args.fields, args.entries)
+        
+        results = {'client': run_client(app, form_id, definition, args.requests)}
+        if args.server:
+            results['server'] = run_server(database_url, form_id, definition, args.requests, args.concurrency)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    print_results(results)
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'parameters': {key: getattr(args, key) for key in ('forms', 'fields', 'entries', 'requests', 'concurrency')},
+        'results': results,
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+    print(f'Results written to {args.output}')
+    
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            raise SystemExit(1)
+        print(f'No regressions beyond {args.threshold:.0%}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Micro-benchmark for embed field rendering
+
+Usage: python benchmarks/bench_render.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.rendering import render_fields
+
+FIELD_TYPES = ['text', 'email', 'textarea', 'select', 'radio', 'checkbox',
+               'number', 'tel', 'url', 'date', 'file', 'gdpr_consent']
+
+def make_fields(count):
+    """Build a form definition cycling through every supported field type"""
+    fields = []
+    for index in range(count):
+        field_type = FIELD_TYPES[index % len(FIELD_TYPES)]
+        fields.append({
+            'type': field_type,
+            'name': f'field_{index}',
+            'label': f'Field <{index}> & "label"',
+            'placeholder': f'Enter field {index}',
+            'required': index % 2 == 0,
+            'options': [f'Option {option}' for option in range(5)],
+        })
+    return fields
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    print(f'{"fields":>8} {"per render":>14} {"bytes":>10}')
+    for count in (10, 100, 1000):
+        fields = make_fields(count)
+        number = max(1, 10000 // count)
+        best = min(timeit.repeat(lambda: render_fields(fields), number=number, repeat=args.repeat))
+        print(f'{count:>8} {best / number * 1e6:>11.1f} us {len(render_fields(fields)):>10}')
+
+if __name__ == '__main__':
+    main()
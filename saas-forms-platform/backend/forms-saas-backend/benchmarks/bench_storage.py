@@ -0,0 +1,115 @@
+"""Storage benchmark for interning entry IP addresses and user agents
+
+Builds a SQLite database in the old layout, with ip_address and user_agent
+stored inline in every form_entries row. It seeds --entries rows whose
+clients are drawn, with a skewed distribution, from --user-agents distinct
+user agents and --ips distinct addresses. Then it measures the tables,
+runs the schema upgrade that interns those values into lookup tables and
+measures again. Sizes come from SQLite's dbstat and are taken after VACUUM.
+
+Usage: python benchmarks/bench_storage.py [--entries 200000] [--user-agents 2000] [--ips 20000]
+"""
+import argparse
+from datetime import datetime, timedelta
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from common import make_app
+
+from src.models.form import db, FormEntry
+
+OLD_ENTRIES_DDL = [
+    'CREATE TABLE form_entries (id INTEGER NOT NULL PRIMARY KEY, form_id INTEGER NOT NULL, data TEXT, '
+    'ip_address VARCHAR(45), user_agent TEXT, submitted_at DATETIME)',
+    'CREATE INDEX ix_form_entries_form_id_submitted_at ON form_entries (form_id, submitted_at DESC, id)',
+]
+BROWSERS = ['Chrome/{major}.0.{build}.{patch} Safari/537.36', 'Firefox/{major}.0', 'Version/{major}.1 Safari/605.1.15']
+PLATFORMS = ['Windows NT 10.0; Win64; x64', 'Macintosh; Intel Mac OS X 10_15_{patch}', 'X11; Linux x86_64',
+             'iPhone; CPU iPhone OS 17_{patch} like Mac OS X', 'Linux; Android 14; Pixel {patch}']
+
+def make_user_agent(rng):
+    return (f'Mozilla/5.0 ({rng.choice(PLATFORMS)}) AppleWebKit/537.36 (KHTML, like Gecko) '
+            f'{rng.choice(BROWSERS)}').format(major=rng.randint(100, 130), build=rng.randint(1000, 9999),
+                                               patch=rng.randint(0, 99))
+
+def skewed_choices(rng, values, count):
+    """Pick values with a Zipf-like skew, as real traffic repeats a few clients a lot"""
+    weights = [1 / (rank + 1) for rank in range(len(values))]
+    return rng.choices(values, weights=weights, k=count)
+
+def seed_old_layout(path, entries, user_agents, ips, seed):
+    rng = random.Random(seed)
+    agent_values = list(dict.fromkeys(make_user_agent(rng) for _ in range(user_agents)))
+    ip_values = [f'{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}'
+                 for _ in range(ips)]
+    started = datetime.utcnow() - timedelta(minutes=entries)
+    
+    conn = sqlite3.connect(path)
+    for statement in OLD_ENTRIES_DDL:
+        conn.execute(statement)
+    conn.executemany('INSERT INTO form_entries (form_id, data, ip_address, user_agent, submitted_at) '
+                     'VALUES (1, ?, ?, ?, ?)', (
+        (json.dumps({'email': f'user{index}@example.com', 'message': 'Hello from the benchmark'}),
+         ip_address, user_agent, (started + timedelta(minutes=index)).isoformat(' '))
+        for index, (ip_address, user_agent) in enumerate(zip(skewed_choices(rng, ip_values, entries),
+                                                              skewed_choices(rng, agent_values, entries)))
+    ))
+    conn.commit()
+    conn.close()
+
+def table_sizes(path):
+    """Bytes per table, indexes included, after a VACUUM"""
+    conn = sqlite3.connect(path)
+    conn.execute('VACUUM')
+    tables = dict(conn.execute('SELECT name, tbl_name FROM sqlite_schema'))
+    sizes = {}
+    for name, size in conn.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name'):
+        table = tables.get(name, name)
+        sizes[table] = sizes.get(table, 0) + size
+    conn.close()
+    return sizes
+
+def print_sizes(label, sizes, tables):
+    print(f'{label}:')
+    for table in tables:
+        print(f'  {table:<14} {sizes.get(table, 0) / 1024 / 1024:>9.2f} MiB')
+    print(f'  {"total":<14} {sum(sizes.get(table, 0) for table in tables) / 1024 / 1024:>9.2f} MiB')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=200000)
+    parser.add_argument('--user-agents', type=int, default=2000)
+    parser.add_argument('--ips', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    tables = ['form_entries', 'ip_addresses', 'user_agents']
+    
+    workdir = tempfile.mkdtemp(prefix='tid-forms-bench-')
+    try:
+        path = os.path.join(workdir, 'storage.db')
+        seed_old_layout(path, args.entries, args.user_agents, args.ips, args.seed)
+        before = table_sizes(path)
+        
+        started = time.perf_counter()
+        app = make_app(f'sqlite:///{path}')
+        migration_seconds = time.perf_counter() - started
+        with app.app_context():
+            assert FormEntry.query.filter(FormEntry.user_agent_id.is_(None)).count() == 0
+            db.engine.dispose()
+        after = table_sizes(path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    print_sizes('Inline (before)', before, tables)
+    print_sizes('Interned (after)', after, tables)
+    saved = sum(before.get(table, 0) for table in tables) - sum(after.get(table, 0) for table in tables)
+    print(f'Saved {saved / 1024 / 1024:.2f} MiB ({saved / sum(before.get(table, 0) for table in tables):.0%}); '
+          f'migration of {args.entries} entries took {migration_seconds:.2f}s')
+
+if __name__ == '__main__':
+    main()
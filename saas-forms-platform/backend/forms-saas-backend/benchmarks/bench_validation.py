@@ -0,0 +1,54 @@
+"""Micro-benchmark for compiled submission validation
+
+Usage: python benchmarks/bench_validation.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.validation import compile_validator
+from bench_render import make_fields
+
+SAMPLE_VALUES = {
+    'text': 'Jane Doe',
+    'email': 'jane@example.com',
+    'textarea': 'Hello,\nI would like to know more about your product.',
+    'select': 'Option 1',
+    'radio': 'Option 2',
+    'checkbox': ['Option 0', 'Option 3'],
+    'number': '42',
+    'tel': '+1 (555) 010-0000',
+    'url': 'https://example.com/about',
+    'date': '2024-05-01',
+    'file': 'upload.pdf',
+    'gdpr_consent': '1',
+}
+
+def make_submission(fields):
+    return {field['name']: SAMPLE_VALUES[field['type']] for field in fields}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    print(f'{"fields":>8} {"compile":>12} {"validate":>12} {"invalid":>12}')
+    for count in (10, 100, 1000):
+        fields = make_fields(count)
+        validate = compile_validator(fields)
+        valid = make_submission(fields)
+        invalid = {name: 'x' * 5000 for name in valid}
+        assert not validate(valid)[0]
+        
+        number = max(1, 10000 // count)
+        timings = []
+        for statement in (lambda: compile_validator(fields), lambda: validate(valid), lambda: validate(invalid)):
+            best = min(timeit.repeat(statement, number=number, repeat=args.repeat))
+            timings.append(best / number * 1e6)
+        print(f'{count:>8}' + ''.join(f'{timing:>9.1f} us' for timing in timings))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Shared helpers for the benchmark scripts"""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from flask import Flask
+
+from src.models.engine import configure_database, init_database
+from src.models.form import Form, FormEntry, FormTemplate
+from src.models.stats import SubmissionCount, FieldValueCount
+from src.routes.forms import forms_bp, form_cache, embed_cache
+from src.services.dedup import recent_keys
+from src.services.lookups import ip_addresses, user_agents
+
+def make_app(database_url, **config):
+    """Build a bare app with the forms API against the given database"""
+    app = Flask(__name__)
+    app.config.update(config)
+    app.register_blueprint(forms_bp, url_prefix='/api')
+    configure_database(app, database_url)
+    init_database(app)
+    
+    # The route-level caches are module globals; start every run cold
+    form_cache.clear()
+    embed_cache.clear()
+    ip_addresses.clear()
+    user_agents.clear()
+    recent_keys.clear()
+    return app
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(latencies, elapsed, errors=0):
+    """Summarize latencies in seconds into a throughput/percentile report"""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+def timed(call):
+    """Run call() and return (result, seconds)"""
+    started = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - started
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(code, port, env=None, preexec_fn=None, name='server'):
+    """Run `python -c code` from the backend directory and wait until port accepts connections"""
+    process = subprocess.Popen(
+        [sys.executable, '-c', code],
+        cwd=BACKEND_DIR, env=dict(os.environ, **(env or {})), preexec_fn=preexec_fn,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{name} did not start')
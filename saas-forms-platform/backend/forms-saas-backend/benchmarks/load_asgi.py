@@ -0,0 +1,118 @@
+"""Load test comparing the sync WSGI server with the ASGI entry point
+
+Starts each server pinned to one CPU core against a fresh SQLite database,
+then drives it with many concurrent slow clients: each submission sends
+its headers, waits --client-delay seconds, then sends the body. Embed
+requests are interleaved. A synchronous single-threaded worker is busy
+for the whole upload; the async handlers are not.
+
+  wsgi   werkzeug, single process, single thread (src.main:app)
+  asgi   uvicorn, single worker (src.asgi:application)
+
+Needs requirements-asgi.txt. Usage:
+  python benchmarks/load_asgi.py [--clients 50] [--seconds 10] [--client-delay 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from common import free_port, start_server, summarize
+
+SERVERS = {
+    'wsgi': "from werkzeug.serving import run_simple; from src.main import app; "
+            "run_simple('127.0.0.1', {port}, app, threaded=False)",
+    'asgi': "import uvicorn; "
+            "uvicorn.run('src.asgi:application', host='127.0.0.1', port={port}, workers=1, log_level='warning')",
+}
+
+def start(kind, port, database_url):
+    return start_server(SERVERS[kind].format(port=port), port, {'DATABASE_URL': database_url, 'RATE_LIMIT_ENABLED': '0'},
+                        preexec_fn=pin_to_one_core, name=kind)
+
+def pin_to_one_core():
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+
+async def http(port, method, path, body=b'', delay=0.0):
+    """Send one request, optionally pausing between headers and body"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        head = (f'{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n'
+                f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n')
+        writer.write(head.encode('latin-1'))
+        await writer.drain()
+        if delay:
+            await asyncio.sleep(delay)
+        writer.write(body)
+        await writer.drain()
+        response = await reader.read()
+        status = int(response.split(b' ', 2)[1])
+        return status, response.split(b'\r\n\r\n', 1)[1]
+    finally:
+        writer.close()
+
+async def run_load(port, form_id, clients, seconds, client_delay):
+    latencies = []
+    errors = [0]
+    deadline = time.monotonic() + seconds
+    body = json.dumps({'data': {'email': 'load@example.com', 'message': 'Hello'}}).encode('utf-8')
+    
+    async def client(index):
+        count = 0
+        while time.monotonic() < deadline:
+            count += 1
+            started = time.perf_counter()
+            try:
+                if (index + count) % 2:
+                    status, _ = await http(port, 'POST', f'/api/forms/{form_id}/submit', body, client_delay)
+                else:
+                    status, _ = await http(port, 'GET', f'/api/embed/{form_id}')
+            except OSError:
+                status = 599
+            if status < 400:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors[0] += 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(clients)))
+    return summarize(latencies, time.perf_counter() - started, errors[0])
+
+async def benchmark(kind, args, workdir):
+    port = free_port()
+    process = start(kind, port, f'sqlite:///{os.path.join(workdir, kind + ".db")}')
+    try:
+        form = json.dumps({
+            'name': 'Load test',
+            'fields': [{'name': 'email', 'type': 'email'}, {'name': 'message', 'type': 'textarea'}]
+        }).encode('utf-8')
+        _, response = await http(port, 'POST', '/api/forms', form)
+        form_id = json.loads(response)['form']['id']
+        return await run_load(port, form_id, args.clients, args.seconds, args.client_delay)
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--client-delay', type=float, default=0.2)
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix='tid-forms-load-')
+    try:
+        print(f'{"server":<8} {"req/s":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"errors":>7}')
+        for kind in SERVERS:
+            stats = asyncio.run(benchmark(kind, args, workdir))
+            print(f'{kind:<8} {stats["throughput"]:>9.1f} {stats["p50_ms"]:>9.1f} '
+                  f'{stats["p95_ms"]:>9.1f} {stats["p99_ms"]:>9.1f} {stats["errors"]:>7}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
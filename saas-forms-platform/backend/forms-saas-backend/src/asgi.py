@@ -0,0 +1,337 @@
+"""ASGI entry point
+
+Serves the public embed and submit endpoints with native async handlers on
+SQLAlchemy's asyncio extension, so slow clients do not tie up a worker.
+Every other route is handed to the Flask app through asgiref's WSGI
+adapter. Needs the packages in requirements-asgi.txt:
+
+    uvicorn src.asgi:application --workers 1
+"""
+import asyncio
+from datetime import datetime
+import re
+
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy import insert, select
+
+from src.main import app
+from src.models.engine import create_async_engine_for
+from src.models.form import db, Form, FormEntry, EntryValue
+from src.models.types import dumps, loads
+from src.routes.forms import embed_cache, form_cache, render_embed
+from src.services.dedup import (IDEMPOTENCY_HEADER, MAX_IDEMPOTENCY_KEY_LENGTH, cached_duplicate, claim_statements,
+                                 duplicate_query, holder_query, remember_keys, remember_row, submission_keys)
+from src.services.form_cache import META_COLUMNS
+from src.services.lookups import cached_client_ids, client_ids
+from src.services.stats import rollup_statements
+
+EMBED_PATH = re.compile(r'^/api/embed/(\d+)$')
+SUBMIT_PATH = re.compile(r'^/api/forms/(\d+)/submit$')
+
+class Request:
+    """The parts of an ASGI HTTP request the async handlers need"""
+    
+    def __init__(self, scope, receive, trusted_proxies=None):
+        self.scope = scope
+        self.receive = receive
+        self.trusted_proxies = trusted_proxies
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+    
+    @property
+    def remote_addr(self):
+        """The client address, read from X-Forwarded-For like ProxyFix behind TRUSTED_PROXIES proxies"""
+        if self.trusted_proxies:
+            forwarded = [value.strip() for value in self.headers.get('x-forwarded-for', '').split(',') if value.strip()]
+            if len(forwarded) >= self.trusted_proxies:
+                return forwarded[-self.trusted_proxies]
+        client = self.scope.get('client')
+        return client[0] if client else None
+    
+    async def body(self, limit):
+        """Read the request body; returns None once it exceeds limit bytes"""
+        chunks = []
+        size = 0
+        while True:
+            message = await self.receive()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if limit is not None and size > limit:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+async def send_response(send, status, body, content_type, headers=()):
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    response_headers = [(b'content-type', content_type.encode('latin-1')),
+                        (b'content-length', str(len(body)).encode('latin-1'))]
+    response_headers += [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+async def send_json(send, status, payload, headers=()):
+    await send_response(send, status, dumps(payload), 'application/json', headers)
+
+async def too_many_submissions(send, retry_after):
+    await send_json(send, 429, {'success': False, 'error': 'Too many requests, please retry'},
+                    [('retry-after', str(retry_after))])
+
+class DuplicateSubmission(Exception):
+    """Raised by AsyncForms.write_entry when a dedup key is already held"""
+    
+    def __init__(self, entry_id):
+        super().__init__(entry_id)
+        self.entry_id = entry_id
+
+class AsyncForms:
+    """ASGI application: async public endpoints in front of the Flask app"""
+    
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.engine = None
+        self.poller = None
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            return await self.wsgi(scope, receive, send)
+        
+        method = scope['method']
+        path = scope['path']
+        match = EMBED_PATH.match(path)
+        if match and method == 'GET':
+            return await self.embed_form(int(match.group(1)), self.request(scope, receive), send)
+        
+        match = SUBMIT_PATH.match(path)
+        # The batched writer lives in the Flask app; let it handle submissions then
+        if match and method == 'POST' and 'submission_queue' not in self.flask_app.extensions:
+            return await self.submit_form(int(match.group(1)), self.request(scope, receive), send)
+        
+        return await self.wsgi(scope, receive, send)
+    
+    def request(self, scope, receive):
+        return Request(scope, receive, self.flask_app.config.get('TRUSTED_PROXIES'))
+    
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.engine = create_async_engine_for(self.flask_app)
+                self.poller = asyncio.create_task(self.poll_form_changes())
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.poller.cancel()
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def poll_form_changes(self):
+        """Pick up form changes from other workers without blocking the loop"""
+        def poll():
+            with self.flask_app.app_context():
+                form_cache.poll_changes()
+                db.session.remove()
+        
+        while True:
+            await asyncio.to_thread(poll)
+            await asyncio.sleep(form_cache.poll_interval)
+    
+    async def form_meta(self, form_id):
+        found, meta = form_cache.lookup(form_id)
+        if found:
+            return meta
+        
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(select(*META_COLUMNS).where(Form.id == form_id))).first()
+        return form_cache.store(form_id, row)
+    
+    async def rate_limited(self, scope, request, form=None):
+        """Retry-After seconds when the request is over a rate limit, otherwise None
+
+        Without a form only the per-client limit is checked.
+        """
+        limiter = self.flask_app.extensions.get('rate_limiter')
+        if limiter is None:
+            return None
+        if form is None:
+            check, args = limiter.check_client, (scope, request.remote_addr)
+        else:
+            check, args = limiter.check_form, (scope, form.id, request.remote_addr, form.settings)
+        if limiter.storage.shared:
+            return await asyncio.to_thread(check, *args)
+        return check(*args)
+    
+    async def embed_form(self, form_id, request, send):
+        """Public endpoint for embedded forms"""
+        try:
+            retry_after = await self.rate_limited('embed', request)
+            if retry_after is None:
+                meta = await self.form_meta(form_id)
+                if meta is None or not meta.is_active:
+                    return await send_response(send, 404, 'Form not found or inactive', 'text/html')
+                retry_after = await self.rate_limited('embed', request, meta)
+            if retry_after is not None:
+                return await send_response(send, 429, 'Too many requests', 'text/html',
+                                           [('retry-after', str(retry_after))])
+            
+            rendered = embed_cache.get(form_id)
+            
+            if rendered is None or rendered[0] != meta.version:
+                async with self.engine.connect() as conn:
+                    row = (await conn.execute(select(Form.__table__).where(Form.id == form_id))).first()
+                
+                if row is None or not row.is_active:
+                    return await send_response(send, 404, 'Form not found or inactive', 'text/html')
+                
+                rendered = render_embed(Form(**row._mapping))
+            
+            version, html, etag = rendered
+            headers = [
+                ('etag', f'"{etag}"'),
+                ('cache-control', f'public, max-age={self.flask_app.config.get("EMBED_CACHE_MAX_AGE", 60)}'),
+            ]
+            if_none_match = request.headers.get('if-none-match', '')
+            if f'"{etag}"' in if_none_match or if_none_match.strip() == '*':
+                return await send_response(send, 304, b'', 'text/html', headers)
+            return await send_response(send, 200, html, 'text/html', headers)
+        except Exception as e:
+            return await send_response(send, 500, f'Error loading form: {str(e)}', 'text/html')
+    
+    async def submit_form(self, form_id, request, send):
+        """Submit form data"""
+        try:
+            retry_after = await self.rate_limited('submit', request)
+            if retry_after is not None:
+                return await too_many_submissions(send, retry_after)
+            
+            form = await self.form_meta(form_id)
+            
+            if form is None:
+                return await send_json(send, 404, {'success': False, 'error': 'Form not found'})
+            if not form.is_active:
+                return await send_json(send, 400, {'success': False, 'error': 'Form is not active'})
+            
+            retry_after = await self.rate_limited('submit', request, form)
+            if retry_after is not None:
+                return await too_many_submissions(send, retry_after)
+            
+            idempotency_key = request.headers.get(IDEMPOTENCY_HEADER.lower())
+            if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+                return await send_json(send, 400, {
+                    'success': False,
+                    'error': f'{IDEMPOTENCY_HEADER} must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters'
+                })
+            
+            body = await request.body(self.flask_app.config.get('MAX_CONTENT_LENGTH'))
+            if body is None:
+                return await send_json(send, 413, {'success': False, 'error': 'Request body too large'})
+            try:
+                data = loads(body) if body else {}
+            except ValueError:
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+            
+            # Validate before anything is written
+            errors, entry_data = form.validate(data.get('data', {}))
+            if errors:
+                return await send_json(send, 400, {
+                    'success': False,
+                    'error': next(iter(errors.values())),
+                    'errors': errors
+                })
+            
+            # Replays of an earlier submission get its entry back instead of a new one
+            now = datetime.utcnow()
+            keys = submission_keys(form, entry_data, idempotency_key, request.remote_addr, now,
+                                   self.flask_app.config.get('IDEMPOTENCY_KEY_TTL', 86400))
+            duplicate_id = await self.find_duplicate(form_id, keys, now) if keys else None
+            if duplicate_id is None:
+                try:
+                    entry_id = await self.write_entry(form, entry_data, request, keys, now)
+                except DuplicateSubmission as e:
+                    # A concurrent request with the same key committed first
+                    duplicate_id = e.entry_id
+            if duplicate_id is not None:
+                return await send_json(send, 200, {
+                    'success': True,
+                    'message': 'Form already submitted',
+                    'entry_id': duplicate_id,
+                    'duplicate': True
+                })
+            
+            return await send_json(send, 201, {
+                'success': True,
+                'message': 'Form submitted successfully',
+                'entry_id': entry_id
+            })
+        except Exception as e:
+            return await send_json(send, 500, {'success': False, 'error': str(e)})
+    
+    async def client_ids(self, request):
+        """Lookup ids for the client's IP address and user agent, resolved off the loop on a miss"""
+        ip_address = request.remote_addr
+        user_agent = request.headers.get('user-agent', '')
+        ids = cached_client_ids(ip_address, user_agent)
+        if ids is not None:
+            return ids
+        
+        def resolve():
+            with self.flask_app.app_context():
+                return client_ids(ip_address, user_agent)
+        
+        return await asyncio.to_thread(resolve)
+    
+    async def find_duplicate(self, form_id, keys, now):
+        """Get the id of the entry holding any of keys, or None"""
+        cached = cached_duplicate(form_id, keys, now)
+        if cached is not None:
+            return cached
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(duplicate_query(form_id, keys, now))).first()
+        return remember_row(form_id, row)
+    
+    async def write_entry(self, form, entry_data, request, keys=(), now=None):
+        """Insert an entry with its dedup keys, entry_values and rollups in one transaction
+
+        Raises DuplicateSubmission, with nothing written, when another entry
+        already holds one of the keys.
+        """
+        entry = FormEntry(
+            form_id=form.id,
+            submitted_at=now or datetime.utcnow(),
+            **await self.client_ids(request)
+        )
+        entry.set_data(entry_data)
+        
+        async with self.engine.begin() as conn:
+            result = await conn.execute(insert(FormEntry.__table__).values(
+                form_id=entry.form_id,
+                data=entry.data,
+                ip_address_id=entry.ip_address_id,
+                user_agent_id=entry.user_agent_id,
+                submitted_at=entry.submitted_at
+            ))
+            entry.id = result.inserted_primary_key[0]
+            
+            if keys:
+                for key, statement in claim_statements(conn.dialect.name, form.id, keys, entry.id, entry.submitted_at):
+                    result = await conn.execute(statement)
+                    if key is not None and result.rowcount == 0:
+                        # Leaving the block with an exception rolls the entry back
+                        raise DuplicateSubmission((await conn.execute(holder_query(form.id, key))).scalar())
+            if self.flask_app.config.get('ENTRY_VALUES_ENABLED', True):
+                rows = EntryValue.rows_for(entry.id, entry.form_id, entry_data)
+                if rows:
+                    await conn.execute(insert(EntryValue), rows)
+            if self.flask_app.config.get('STATS_ROLLUPS_ENABLED', True):
+                for statement in rollup_statements(conn.dialect.name, [entry], {form.id: form.fields}):
+                    await conn.execute(statement)
+        
+        remember_keys(form.id, keys, entry.id)
+        return entry.id
+
+application = AsyncForms(app)
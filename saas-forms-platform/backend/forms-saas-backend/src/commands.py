@@ -0,0 +1,100 @@
+import json
+
+import click
+from flask.cli import AppGroup
+
+from src.models.schema import migrate_schema
+from src.models.search import rebuild_search_index
+from src.models.user import db
+from src.services.archive import ARCHIVE_BATCH_SIZE, archive_entries
+from src.services.assets import STATIC_DIR, build_assets
+from src.services.bulk import create_forms, insert_entries, plugin_form_item, read_plugin_entries_csv
+from src.services.dedup import prune_submission_keys
+from src.services.entries import backfill_entry_values
+from src.services.form_cache import FormMetadataCache
+from src.services.stats import rebuild_stats
+
+forms_cli = AppGroup('forms', help='Forms maintenance commands')
+
+@forms_cli.command('upgrade-schema')
+def upgrade_schema_command():
+    """Convert data from older schemas and drop columns the models no longer use"""
+    converted, dropped = migrate_schema()
+    click.echo(f'Converted {converted} entries')
+    for table, columns in dropped.items():
+        click.echo(f"  dropped {table}.{', '.join(columns)}")
+
+@forms_cli.command('backfill-entry-values')
+@click.option('--batch-size', default=500, show_default=True)
+def backfill_entry_values_command(batch_size):
+    """Index existing entries into the entry_values table"""
+    indexed = backfill_entry_values(batch_size)
+    click.echo(f'Indexed {indexed} entries')
+
+@forms_cli.command('rebuild-search')
+def rebuild_search_command():
+    """Rebuild the full-text search index from stored entries"""
+    if rebuild_search_index(db.engine):
+        click.echo('Rebuilt the search index')
+    else:
+        click.echo('Only SQLite keeps a separate search index; nothing to rebuild')
+
+@forms_cli.command('rebuild-stats')
+@click.option('--form-id', type=int, help='Only rebuild this form')
+def rebuild_stats_command(form_id):
+    """Rebuild submission rollups from stored entries"""
+    rebuilt = rebuild_stats(form_id)
+    click.echo(f'Rebuilt stats for {rebuilt} forms')
+
+@forms_cli.command('archive-entries')
+@click.option('--batch-size', default=ARCHIVE_BATCH_SIZE, show_default=True)
+def archive_entries_command(batch_size):
+    """Move entries older than their form's archive_after_days setting to the archive"""
+    moved = archive_entries(batch_size=batch_size)
+    for form_id, count in moved.items():
+        click.echo(f'  form {form_id}: {count} entries')
+    click.echo(f'Archived {sum(moved.values())} entries from {len(moved)} forms')
+
+@forms_cli.command('prune-submission-keys')
+def prune_submission_keys_command():
+    """Delete expired idempotency and content dedup keys"""
+    deleted = prune_submission_keys()
+    click.echo(f'Deleted {deleted} expired keys')
+
+def echo_errors(result, offset=0):
+    for error in result.errors:
+        click.echo(f"  item {error['index'] + offset}: {error['error']}", err=True)
+
+@forms_cli.command('import-wp-forms')
+@click.argument('path', type=click.File('r', encoding='utf-8'))
+def import_wp_forms_command(path):
+    """Import forms exported from the WordPress plugin's forms table as JSON"""
+    rows = json.load(path)
+    result = create_forms([plugin_form_item(row) for row in rows])
+    echo_errors(result)
+    click.echo(f'Imported {len(result.ids)} forms: {result.ids}')
+
+@forms_cli.command('import-wp-entries')
+@click.argument('form_id', type=int)
+@click.argument('path', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--no-validate', is_flag=True, help='Store values without running the form validator')
+def import_wp_entries_command(form_id, path, no_validate):
+    """Import the WordPress plugin's entries CSV export into a form"""
+    form = FormMetadataCache().get(form_id)
+    if form is None:
+        raise click.ClickException(f'Form {form_id} not found')
+    
+    imported = 0
+    offset = 0
+    for batch in read_plugin_entries_csv(path, form):
+        result = insert_entries(form, batch, validate=not no_validate)
+        echo_errors(result, offset)
+        imported += len(result.ids)
+        offset += len(batch)
+    click.echo(f'Imported {imported} entries')
+
+@forms_cli.command('build-assets')
+def build_assets_command():
+    """Fingerprint and precompress static files into src/static/dist"""
+    manifest = build_assets(STATIC_DIR)
+    click.echo(f'Built {len(manifest)} assets')
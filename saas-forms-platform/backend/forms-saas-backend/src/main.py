@@ -3,44 +3,113 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from src.models.user import db
 from src.models.form import Form, FormEntry, FormTemplate
+from src.models.stats import SubmissionCount, FieldValueCount
+from src.models.job import Job
+from src.models.archive import ArchivedEntry
+from src.models.lookup import IPAddress, UserAgent
+from src.models.dedup import SubmissionKey
+from src.models.backfill import Backfill
+from src.models.engine import configure_database, init_database
+from src.models.types import init_json
+from src.services.assets import init_assets
+from src.services.ingest import init_submission_queue
+from src.services.jobs import init_job_runner
+from src.services.metrics import init_metrics
+from src.services.ratelimit import init_rate_limiter
+from src.commands import forms_cli
 from src.routes.user import user_bp
 from src.routes.forms import forms_bp
+from src.routes.jobs import jobs_bp
 from flask_cors import CORS
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+# Static files are served from memory by src/services/assets.py
+app = Flask(__name__, static_folder=None)
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+# Run directly, the app serves through the debug reloader (see the bottom
+# of this file); set debug now so background threads skip its watcher process
+if __name__ == '__main__':
+    app.debug = True
+# Reject oversized request bodies before they are parsed
+app.config['MAX_CONTENT_LENGTH'] = 1024 * 1024
+# Public URL used in embed snippets; defaults to the URL of each request
+app.config['PUBLIC_BASE_URL'] = os.environ.get('PUBLIC_BASE_URL')
+# Use orjson for jsonify and request parsing when it is installed
+init_json(app)
 
 # Enable CORS for all routes
 CORS(app)
 
+# Request latency, SQL and response-size metrics on /metrics
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') == '1'
+app.config['SLOW_REQUEST_SECONDS'] = float(os.environ.get('SLOW_REQUEST_SECONDS', '1.0'))
+# Allow per-request profiling through the X-Profile header
+app.config['PROFILING_ENABLED'] = os.environ.get('PROFILING_ENABLED') == '1'
+init_metrics(app)
+# Number of reverse proxies in front of the app that append to
+# X-Forwarded-For; 0 means clients connect directly. Unset, client
+# addresses are unknown behind a proxy and per-client limits stay off.
+# The proxy must also set or strip X-Tenant-ID, which the jobs API only
+# honours behind one.
+app.config['TRUSTED_PROXIES'] = int(os.environ['TRUSTED_PROXIES']) if os.environ.get('TRUSTED_PROXIES') else None
+if app.config['TRUSTED_PROXIES']:
+    proxies = app.config['TRUSTED_PROXIES']
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+# Token-bucket limits on the public submit and embed endpoints; set
+# RATE_LIMIT_STORAGE_URL to share buckets between worker processes
+app.config['RATE_LIMIT_ENABLED'] = os.environ.get(
+    'RATE_LIMIT_ENABLED', '0' if app.config['TRUSTED_PROXIES'] is None else '1') == '1'
+app.config['RATE_LIMIT_STORAGE_URL'] = os.environ.get('RATE_LIMIT_STORAGE_URL')
+app.config['RATE_LIMITS'] = {
+    'submit': {'ip': os.environ.get('SUBMIT_RATE_LIMIT_IP', '30/minute'),
+               'form': os.environ.get('SUBMIT_RATE_LIMIT_FORM', '600/minute')},
+    'embed': {'ip': os.environ.get('EMBED_RATE_LIMIT_IP', '300/minute'),
+              'form': os.environ.get('EMBED_RATE_LIMIT_FORM', '6000/minute')},
+}
+init_rate_limiter(app)
+
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(forms_bp, url_prefix='/api')
+app.register_blueprint(jobs_bp, url_prefix='/api')
+app.cli.add_command(forms_cli)
 
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+# Database from DATABASE_URL, defaulting to the bundled SQLite file
+configure_database(app)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
+# Batched submission ingestion (see src/services/ingest.py). Submissions
+# not written within SUBMISSION_ACK_TIMEOUT get a 202 and are held only in
+# memory until written, so they are lost if the process dies first
+app.config['SUBMISSION_QUEUE_ENABLED'] = os.environ.get('SUBMISSION_QUEUE_ENABLED') == '1'
+# Maintain the normalized entry_values table used by field filters
+app.config['ENTRY_VALUES_ENABLED'] = True
+# Maintain the submission rollups behind /api/forms/<id>/stats
+app.config['STATS_ROLLUPS_ENABLED'] = True
+# Seconds a submission's Idempotency-Key keeps answering replays
+app.config['IDEMPOTENCY_KEY_TTL'] = int(os.environ.get('IDEMPOTENCY_KEY_TTL', '86400'))
+init_database(app)
+init_submission_queue(app)
+# Background jobs (exports, imports, rollup rebuilds) on /api/jobs
+app.config['JOBS_ENABLED'] = os.environ.get('JOBS_ENABLED', '1') == '1'
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', '4'))
+app.config['JOB_TENANT_CONCURRENCY'] = int(os.environ.get('JOB_TENANT_CONCURRENCY', '2'))
+init_job_runner(app)
+
+# Fingerprinted, precompressed static files held in memory
+static_assets = init_assets(app)
+
+@app.route('/static/<path:path>')
+def serve_static(path):
+    return static_assets.serve(path) or ("Not found", 404)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    if path != "" and path in static_assets:
+        return static_assets.serve(path)
+    return static_assets.serve('index.html') or ("index.html not found", 404)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,39 @@
+from src.models.user import db
+from src.models.types import CompressedJSON
+from datetime import datetime
+
+class ArchivedEntry(db.Model):
+    """A form entry moved out of form_entries by archival (see src/services/archive.py)
+
+    Rows keep the id they had as a FormEntry and are only ever inserted,
+    never updated. Reads go through the same to_dict/get_data interface,
+    so exports and the entries API handle both tiers alike.
+    """
+    __tablename__ = 'archived_entries'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    form_id = db.Column(db.Integer, db.ForeignKey('forms.id'), nullable=False)
+    data = db.Column(CompressedJSON)  # Submitted data, zlib-compressed JSON
+    ip_address = db.Column(db.String(45))
+    user_agent = db.Column(db.Text)
+    submitted_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Same keyset order as ix_form_entries_form_id_submitted_at
+        db.Index('ix_archived_entries_form_id_submitted_at', form_id, submitted_at.desc(), id),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'form_id': self.form_id,
+            'data': self.data or {},
+            'ip_address': self.ip_address,
+            'user_agent': self.user_agent,
+            'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None
+        }
+    
+    def get_data(self):
+        """Get entry data as dictionary"""
+        return self.data or {}
@@ -0,0 +1,14 @@
+from src.models.user import db
+from datetime import datetime
+
+class Backfill(db.Model):
+    """Whether rows that predate a derived table have been copied into it
+
+    Recorded once by upgrade_schema (see src/models/schema.py); readers of
+    the derived table fall back to the source data until it is complete.
+    """
+    __tablename__ = 'backfills'
+    
+    name = db.Column(db.String(50), primary_key=True)  # The derived table
+    complete = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
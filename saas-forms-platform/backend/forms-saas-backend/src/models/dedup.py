@@ -0,0 +1,22 @@
+from src.models.user import db
+from datetime import datetime
+
+class SubmissionKey(db.Model):
+    """A key that identifies a submission until it expires (see src/services/dedup.py)
+
+    Keys are digests of an Idempotency-Key header or of the submitted
+    content; the unique index makes sure only one entry holds a key.
+    """
+    __tablename__ = 'submission_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    form_id = db.Column(db.Integer, db.ForeignKey('forms.id'), nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    # Not a foreign key: archival moves entries out of form_entries
+    entry_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    __table_args__ = (
+        db.UniqueConstraint(form_id, key, name='uq_submission_keys_form_id_key'),
+    )
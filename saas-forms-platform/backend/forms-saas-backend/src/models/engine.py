@@ -0,0 +1,86 @@
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from src.models.user import db
+from src.models.schema import upgrade_schema
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'app.db')
+
+# Applied on every new SQLite connection in tuned mode: WAL lets readers
+# proceed while a writer commits, NORMAL sync is durable across crashes in
+# WAL mode, and busy_timeout makes writers wait for the lock instead of
+# failing immediately.
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', '5000'),
+    ('cache_size', '-65536'),
+    ('mmap_size', '268435456'),
+    ('temp_store', 'MEMORY'),
+)
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def engine_options(url):
+    """Get SQLALCHEMY_ENGINE_OPTIONS for a database URL"""
+    if url.get_backend_name() == 'sqlite':
+        return {}
+    return {
+        'pool_size': env_int('DB_POOL_SIZE', 10),
+        'max_overflow': env_int('DB_MAX_OVERFLOW', 20),
+        'pool_recycle': env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': True,
+    }
+
+def configure_database(app, database_url=None):
+    """Fill in the database config from DATABASE_URL and related env vars
+
+    Without DATABASE_URL the bundled SQLite file is used. SQLITE_TUNED=0
+    disables the connection pragmas.
+    """
+    database_url = database_url or os.environ.get('DATABASE_URL') or f'sqlite:///{DEFAULT_SQLITE_PATH}'
+    if database_url.startswith('postgres://'):
+        database_url = 'postgresql://' + database_url[len('postgres://'):]
+    url = make_url(database_url)
+    
+    if url.get_backend_name() == 'sqlite' and url.database and url.database != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
+    
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(url))
+    app.config.setdefault('SQLITE_TUNED', os.environ.get('SQLITE_TUNED', '1') == '1')
+
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+def create_async_engine_for(app):
+    """Create an asyncio engine for the app's database (needs aiosqlite or asyncpg)"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No asyncio driver configured for {backend}')
+    
+    engine = create_async_engine(url.set(drivername=ASYNC_DRIVERS[backend]), **engine_options(url))
+    if backend == 'sqlite' and app.config.get('SQLITE_TUNED'):
+        event.listen(engine.sync_engine, 'connect', apply_sqlite_pragmas)
+    return engine
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS:
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+def init_database(app):
+    """Bind the app to the database and bring the schema up to date"""
+    db.init_app(app)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite' and app.config.get('SQLITE_TUNED'):
+            event.listen(db.engine, 'connect', apply_sqlite_pragmas)
+        db.create_all()
+        upgrade_schema()
@@ -1,6 +1,8 @@
 from src.models.user import db
+from src.models.lookup import IPAddress, UserAgent
+from src.models.types import JSONText
 from datetime import datetime
-import json
+import math
 
 class Form(db.Model):
     __tablename__ = 'forms'
@@ -9,76 +11,172 @@ class Form(db.Model):
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     theme = db.Column(db.String(50), default='modern')
-    fields = db.Column(db.Text)  # JSON string of form fields
-    settings = db.Column(db.Text)  # JSON string of form settings
-    embed_code = db.Column(db.Text)  # Generated embed code
-    iframe_code = db.Column(db.Text)  # Generated iframe code
+    fields = db.Column(JSONText)  # Form fields, stored as JSON text
+    settings = db.Column(JSONText)  # Form settings, stored as JSON text
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationships
     entries = db.relationship('FormEntry', backref='form', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'theme': self.theme,
-            'fields': json.loads(self.fields) if self.fields else [],
-            'settings': json.loads(self.settings) if self.settings else {},
-            'embed_code': self.embed_code,
-            'iframe_code': self.iframe_code,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'entry_count': len(self.entries)
-        }
+    __table_args__ = (
+        # Serves the newest-first forms list and its keyset pages
+        db.Index('ix_forms_is_active_created_at', is_active, created_at.desc(), id),
+    )
+    
+    @classmethod
+    def with_entry_counts(cls):
+        """Query (form, entry_count) pairs with a single grouped COUNT subquery"""
+        counts = db.session.query(
+            FormEntry.form_id,
+            db.func.count(FormEntry.id).label('entry_count')
+        ).group_by(FormEntry.form_id).subquery()
+        
+        return db.session.query(cls, db.func.coalesce(counts.c.entry_count, 0)) \
+            .outerjoin(counts, counts.c.form_id == cls.id)
+    
+    def count_entries(self):
+        """Count this form's entries without loading them"""
+        return FormEntry.query.filter_by(form_id=self.id).count()
+    
+    def to_dict(self, entry_count=None, only=None):
+        """Serialize the form; `only` limits the keys so deferred columns stay unloaded"""
+        data = {name: serialize(self) for name, serialize in FORM_DICT_FIELDS.items() if only is None or name in only}
+        if only is None or 'entry_count' in only:
+            data['entry_count'] = self.count_entries() if entry_count is None else entry_count
+        return data
     
     def set_fields(self, fields_data):
         """Set form fields from dictionary"""
-        self.fields = json.dumps(fields_data)
+        self.fields = fields_data
     
     def get_fields(self):
         """Get form fields as dictionary"""
-        return json.loads(self.fields) if self.fields else []
+        return self.fields or []
     
     def set_settings(self, settings_data):
         """Set form settings from dictionary"""
-        self.settings = json.dumps(settings_data)
+        self.settings = settings_data
     
     def get_settings(self):
         """Get form settings as dictionary"""
-        return json.loads(self.settings) if self.settings else {}
+        return self.settings or {}
+
+# Form.to_dict keys and how to read each from a form
+FORM_DICT_FIELDS = {
+    'id': lambda form: form.id,
+    'name': lambda form: form.name,
+    'description': lambda form: form.description,
+    'theme': lambda form: form.theme,
+    'fields': lambda form: form.fields or [],
+    'settings': lambda form: form.settings or {},
+    'is_active': lambda form: form.is_active,
+    'created_at': lambda form: form.created_at.isoformat() if form.created_at else None,
+    'updated_at': lambda form: form.updated_at.isoformat() if form.updated_at else None,
+}
 
 class FormEntry(db.Model):
     __tablename__ = 'form_entries'
     
     id = db.Column(db.Integer, primary_key=True)
     form_id = db.Column(db.Integer, db.ForeignKey('forms.id'), nullable=False)
-    data = db.Column(db.Text)  # JSON string of submitted data
-    ip_address = db.Column(db.String(45))
-    user_agent = db.Column(db.Text)
+    data = db.Column(JSONText)  # Submitted data, stored as JSON text
+    # Client details are interned into lookup tables (see src/services/lookups.py)
+    ip_address_id = db.Column(db.Integer, db.ForeignKey('ip_addresses.id'))
+    user_agent_id = db.Column(db.Integer, db.ForeignKey('user_agents.id'))
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Inline client details of older databases, loaded only until they have
+    # been interned (see load_legacy_clients in src/services/entries.py)
+    legacy_ip_address = db.query_expression()
+    legacy_user_agent = db.query_expression()
+    
+    # Relationships
+    values = db.relationship('EntryValue', backref='entry', lazy=True, cascade='all, delete-orphan')
+    ip_address_row = db.relationship(IPAddress, lazy='joined')
+    user_agent_row = db.relationship(UserAgent, lazy='joined')
+    
+    __table_args__ = (
+        # Serves the newest-first keyset pagination of a form's entries
+        db.Index('ix_form_entries_form_id_submitted_at', form_id, submitted_at.desc(), id),
+    )
     
     def to_dict(self):
         return {
             'id': self.id,
             'form_id': self.form_id,
-            'data': json.loads(self.data) if self.data else {},
+            'data': self.data or {},
             'ip_address': self.ip_address,
             'user_agent': self.user_agent,
             'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None
         }
     
+    @property
+    def ip_address(self):
+        return self.ip_address_row.value if self.ip_address_row is not None else self.legacy_ip_address
+    
+    @property
+    def user_agent(self):
+        return self.user_agent_row.value if self.user_agent_row is not None else self.legacy_user_agent
+    
     def set_data(self, entry_data):
         """Set entry data from dictionary"""
-        self.data = json.dumps(entry_data)
+        self.data = entry_data
     
     def get_data(self):
         """Get entry data as dictionary"""
-        return json.loads(self.data) if self.data else {}
+        return self.data or {}
+
+class EntryValue(db.Model):
+    """One submitted field value, normalized out of FormEntry.data for indexed lookups"""
+    __tablename__ = 'entry_values'
+    
+    # Values longer than this (message bodies and the like) are not indexed
+    MAX_INDEXED_LENGTH = 255
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.Integer, db.ForeignKey('form_entries.id', ondelete='CASCADE'), nullable=False, index=True)
+    form_id = db.Column(db.Integer, nullable=False)
+    field_name = db.Column(db.String(100), nullable=False)
+    value_text = db.Column(db.String(MAX_INDEXED_LENGTH))
+    value_num = db.Column(db.Float)
+    
+    __table_args__ = (
+        db.Index('ix_entry_values_text', form_id, field_name, value_text),
+        db.Index('ix_entry_values_num', form_id, field_name, value_num),
+    )
+    
+    @classmethod
+    def rows_for(cls, entry_id, form_id, entry_data):
+        """Build insert mappings for an entry's data, one row per scalar or list item"""
+        rows = []
+        for field_name, value in entry_data.items():
+            if len(field_name) > 100:
+                continue
+            for item in value if isinstance(value, list) else [value]:
+                if item is None or isinstance(item, (dict, list)):
+                    continue
+                text = str(item)
+                if len(text) > cls.MAX_INDEXED_LENGTH:
+                    continue
+                rows.append({
+                    'entry_id': entry_id,
+                    'form_id': form_id,
+                    'field_name': field_name,
+                    'value_text': text,
+                    'value_num': to_number(item)
+                })
+        return rows
+
+def to_number(value):
+    """Get a numeric value for indexing, or None"""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
 
 class FormTemplate(db.Model):
     __tablename__ = 'form_templates'
@@ -87,8 +185,8 @@ class FormTemplate(db.Model):
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     category = db.Column(db.String(100))
-    fields = db.Column(db.Text)  # JSON string of template fields
-    settings = db.Column(db.Text)  # JSON string of template settings
+    fields = db.Column(JSONText)  # Template fields, stored as JSON text
+    settings = db.Column(JSONText)  # Template settings, stored as JSON text
     is_featured = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -98,8 +196,8 @@ class FormTemplate(db.Model):
             'name': self.name,
             'description': self.description,
             'category': self.category,
-            'fields': json.loads(self.fields) if self.fields else [],
-            'settings': json.loads(self.settings) if self.settings else {},
+            'fields': self.fields or [],
+            'settings': self.settings or {},
             'is_featured': self.is_featured,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
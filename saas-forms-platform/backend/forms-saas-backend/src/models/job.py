@@ -0,0 +1,52 @@
+from src.models.user import db
+from src.models.types import JSONText
+from datetime import datetime
+
+class Job(db.Model):
+    """A background task run by the job runner (see src/services/jobs.py)"""
+    __tablename__ = 'jobs'
+    
+    STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+    FINISHED = ('succeeded', 'failed', 'cancelled')
+    
+    id = db.Column(db.String(32), primary_key=True)
+    type = db.Column(db.String(50), nullable=False)
+    tenant = db.Column(db.String(100), nullable=False, default='default')
+    params = db.Column(JSONText)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    result = db.Column(JSONText)  # Summary returned by the job
+    result_path = db.Column(db.Text)  # File produced by the job, if any
+    result_name = db.Column(db.String(255))
+    result_mimetype = db.Column(db.String(100))
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        # Serves the runner's scan for queued and running jobs
+        db.Index('ix_jobs_status_created_at', status, created_at),
+        db.Index('ix_jobs_tenant_created_at', tenant, created_at.desc()),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.type,
+            'tenant': self.tenant,
+            'params': self.params or {},
+            'status': self.status,
+            'progress': self.progress,
+            'progress_total': self.progress_total,
+            'cancel_requested': self.cancel_requested,
+            'result': self.result,
+            'has_file': self.result_path is not None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
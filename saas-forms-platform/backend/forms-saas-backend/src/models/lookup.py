@@ -0,0 +1,110 @@
+import hashlib
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.user import db
+
+INSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+RESOLVE_CHUNK_SIZE = 500
+
+class IPAddress(db.Model):
+    """A distinct client IP address, shared by every entry submitted from it"""
+    __tablename__ = 'ip_addresses'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.String(45), nullable=False, unique=True)
+    
+    # Column lookups match on; key_for derives it from a value
+    KEY = 'value'
+    
+    @staticmethod
+    def key_for(value):
+        return value
+    
+    @classmethod
+    def row_for(cls, value):
+        return {'value': value}
+
+class UserAgent(db.Model):
+    """A distinct User-Agent header, shared by every entry that sent it"""
+    __tablename__ = 'user_agents'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # User agents can be longer than a unique index allows; match on a digest
+    digest = db.Column(db.String(40), nullable=False, unique=True)
+    value = db.Column(db.Text, nullable=False)
+    
+    KEY = 'digest'
+    
+    @staticmethod
+    def key_for(value):
+        return hashlib.sha1(value.encode('utf-8', 'surrogatepass')).hexdigest()
+    
+    @classmethod
+    def row_for(cls, value):
+        return {'digest': cls.key_for(value), 'value': value}
+
+def resolve_ids(conn, model, values):
+    """Map values to their lookup row ids on conn, inserting rows for new values
+
+    Concurrent writers inserting the same value are fine: the insert skips
+    conflicting rows and the ids are read back afterwards.
+    """
+    key_column = getattr(model, model.KEY)
+    ids = {}
+    values = list(dict.fromkeys(values))
+    for start in range(0, len(values), RESOLVE_CHUNK_SIZE):
+        chunk = {model.key_for(value): value for value in values[start:start + RESOLVE_CHUNK_SIZE]}
+        found = dict(conn.execute(db.select(key_column, model.id).where(key_column.in_(chunk))).all())
+        
+        missing = [key for key in chunk if key not in found]
+        if missing:
+            insert = INSERT_DIALECTS.get(conn.dialect.name)
+            rows = [model.row_for(chunk[key]) for key in missing]
+            if insert is None:
+                conn.execute(db.insert(model), rows)
+            else:
+                conn.execute(insert(model).on_conflict_do_nothing(index_elements=[model.KEY]), rows)
+            found.update(conn.execute(db.select(key_column, model.id).where(key_column.in_(missing))).all())
+        
+        ids.update((value, found[key]) for key, value in chunk.items())
+    return ids
+
+MIGRATE_BATCH_SIZE = 1000
+
+def intern_entry_clients(engine, batch_size=MIGRATE_BATCH_SIZE):
+    """Move inline ip_address/user_agent values of an older database into the lookup tables
+
+    Fills ip_address_id/user_agent_id batch by batch; returns the number of
+    entries converted. Safe to rerun after an interruption, since the old
+    columns are only dropped once this has gone through every entry.
+    """
+    if 'ip_address' not in {column['name'] for column in db.inspect(engine).get_columns('form_entries')}:
+        return 0
+    
+    select = db.text('SELECT id, ip_address, user_agent FROM form_entries WHERE id > :last_id ORDER BY id LIMIT :limit')
+    update = db.text('UPDATE form_entries SET ip_address_id = :ip_address_id, user_agent_id = :user_agent_id '
+                     'WHERE id = :id')
+    known = {IPAddress: {}, UserAgent: {}}
+    converted = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(select, {'last_id': last_id, 'limit': batch_size}).all()
+            if not rows:
+                return converted
+            
+            for model, values in ((IPAddress, [row.ip_address for row in rows]),
+                                  (UserAgent, [row.user_agent for row in rows])):
+                new_values = [value for value in values if value is not None and value not in known[model]]
+                if new_values:
+                    known[model].update(resolve_ids(conn, model, new_values))
+            
+            conn.execute(update, [{
+                'id': row.id,
+                'ip_address_id': known[IPAddress].get(row.ip_address),
+                'user_agent_id': known[UserAgent].get(row.user_agent)
+            } for row in rows])
+        
+        converted += len(rows)
+        last_id = rows[-1].id
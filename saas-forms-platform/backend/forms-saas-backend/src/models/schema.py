@@ -0,0 +1,156 @@
+import logging
+
+from sqlalchemy.exc import DatabaseError, IntegrityError
+
+from src.models.user import db
+from src.models.backfill import Backfill
+from src.models.form import FormEntry, EntryValue
+from src.models.lookup import intern_entry_clients
+from src.models.search import FTS_TABLE, create_search_index
+
+logger = logging.getLogger(__name__)
+
+# Columns added to existing tables; their types come from the models
+ADDED_COLUMNS = {
+    'form_entries': ('ip_address_id', 'user_agent_id'),
+}
+
+# Columns removed from the models that older databases still carry
+DROPPED_COLUMNS = {
+    # Embed snippets are derived from id and theme and built on demand
+    'forms': ('embed_code', 'iframe_code'),
+    # Interned into ip_addresses/user_agents by intern_entry_clients
+    'form_entries': ('ip_address', 'user_agent'),
+}
+
+def unindexed_entries_exist(conn):
+    """True when some entry has no entry_values rows"""
+    return conn.execute(db.select(FormEntry.id).where(
+        ~db.exists().where(EntryValue.entry_id == FormEntry.id)
+    ).limit(1)).first() is not None
+
+def uninterned_clients_exist(conn):
+    """True when some entry keeps its client details only in the old inline columns"""
+    if 'ip_address' not in {column['name'] for column in db.inspect(conn).get_columns('form_entries')}:
+        return False
+    return conn.execute(db.text(
+        'SELECT 1 FROM form_entries WHERE ip_address_id IS NULL AND user_agent_id IS NULL '
+        'AND (ip_address IS NOT NULL OR user_agent IS NOT NULL) LIMIT 1'
+    )).first() is not None
+
+def unsearchable_entries_exist(conn):
+    """True when the SQLite full-text index misses some entry"""
+    if conn.dialect.name != 'sqlite' or not db.inspect(conn).has_table(FTS_TABLE):
+        return False
+    return conn.execute(db.text(
+        f'SELECT 1 FROM form_entries WHERE NOT EXISTS (SELECT 1 FROM {FTS_TABLE} WHERE rowid = form_entries.id) LIMIT 1'
+    )).first() is not None
+
+# Derived tables whose rows are copied from existing data by a backfill
+# command, with a check for whether any existing rows are missing
+BACKFILLS = {
+    'entry_values': unindexed_entries_exist,
+    # Filled by migrate_schema; readers use the inline columns until then
+    'entry_clients': uninterned_clients_exist,
+    # Filled by `flask forms rebuild-search`; search scans until then
+    'search_index': unsearchable_entries_exist,
+}
+
+def record_backfills():
+    """Record, once per database, whether each derived table still needs its backfill"""
+    with db.engine.connect() as conn:
+        recorded = set(conn.execute(db.select(Backfill.name)).scalars())
+    for name, needed in BACKFILLS.items():
+        if name in recorded:
+            continue
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(db.insert(Backfill).values(name=name, complete=not needed(conn)))
+        except IntegrityError:
+            # Another worker starting at the same time recorded it first
+            pass
+
+def add_columns():
+    """Add model columns missing from existing tables"""
+    for table, columns in ADDED_COLUMNS.items():
+        for column in columns:
+            if column in existing_columns(table):
+                continue
+            column_type = db.metadata.tables[table].c[column].type.compile(dialect=db.engine.dialect)
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(db.text(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}'))
+            except DatabaseError:
+                # Another worker starting at the same time added it first
+                if column not in existing_columns(table):
+                    raise
+
+def create_indexes():
+    """Create model indexes missing from existing tables"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(db.engine, checkfirst=True)
+            except DatabaseError:
+                if index.name not in {found['name'] for found in db.inspect(db.engine).get_indexes(table.name)}:
+                    raise
+
+def existing_columns(table):
+    inspector = db.inspect(db.engine)
+    if not inspector.has_table(table):
+        return set()
+    return {column['name'] for column in inspector.get_columns(table)}
+
+def pending_drops():
+    """{table: [column]} of DROPPED_COLUMNS the database still carries"""
+    pending = {}
+    for table, columns in DROPPED_COLUMNS.items():
+        present = [column for column in columns if column in existing_columns(table)]
+        if present:
+            pending[table] = present
+    return pending
+
+def drop_columns():
+    """Drop columns the models no longer define, so rows stop carrying them"""
+    with db.engine.begin() as conn:
+        for table, columns in pending_drops().items():
+            for column in columns:
+                conn.execute(db.text(f'ALTER TABLE {table} DROP COLUMN {column}'))
+
+def upgrade_schema():
+    """Bring an existing database up to date with the models at startup
+
+    `db.create_all()` only creates missing tables, so new columns and
+    indexes of existing tables and the full-text search index are created
+    here, and pending backfills are recorded. Only additive, idempotent
+    steps run, since every worker calls this as it starts; converting data
+    and dropping old columns is left to `flask forms upgrade-schema` (see
+    migrate_schema).
+    """
+    add_columns()
+    create_indexes()
+    create_search_index(db.engine)
+    record_backfills()
+    
+    pending = pending_drops()
+    if pending:
+        logger.warning('Database has columns from an older schema (%s); run `flask forms upgrade-schema` '
+                       'to convert and drop them', ', '.join(f'{table}.{column}' for table, columns in pending.items()
+                                                           for column in columns))
+
+def migrate_schema():
+    """Convert data from older schemas and drop the columns it lived in
+
+    Moves inline entry client details to their lookup tables, then drops
+    DROPPED_COLUMNS. Irreversible, and slow on large tables; run it once,
+    from one process, through `flask forms upgrade-schema`. Returns
+    (entries converted, {table: [dropped column]}).
+    """
+    upgrade_schema()
+    converted = intern_entry_clients(db.engine)
+    # Switch readers to the lookup tables before the inline columns go away
+    with db.engine.begin() as conn:
+        conn.execute(db.update(Backfill).where(Backfill.name == 'entry_clients').values(complete=True))
+    dropped = pending_drops()
+    drop_columns()
+    return converted, dropped
@@ -0,0 +1,71 @@
+import logging
+
+from sqlalchemy.exc import OperationalError
+
+from src.models.user import db
+from src.models.backfill import Backfill
+
+logger = logging.getLogger(__name__)
+
+# SQLite FTS5 index over entry values; rowid is the entry id. Triggers keep
+# it in sync, so every write path (ORM, bulk inserts, the ASGI app) is covered.
+FTS_TABLE = 'form_entries_fts'
+
+# Space-separated top-level values of an entry's JSON data
+SQLITE_ENTRY_TEXT = "(SELECT group_concat(value, ' ') FROM json_each(CASE WHEN json_valid({data}) THEN {data} END))"
+
+SQLITE_SEARCH_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "form_id UNINDEXED, content, tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS form_entries_fts_insert AFTER INSERT ON form_entries BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, form_id, content) "
+    f"VALUES (new.id, new.form_id, {SQLITE_ENTRY_TEXT.format(data='new.data')}); END",
+    f"CREATE TRIGGER IF NOT EXISTS form_entries_fts_delete AFTER DELETE ON form_entries BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS form_entries_fts_update AFTER UPDATE OF data, form_id ON form_entries BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; "
+    f"INSERT INTO {FTS_TABLE}(rowid, form_id, content) "
+    f"VALUES (new.id, new.form_id, {SQLITE_ENTRY_TEXT.format(data='new.data')}); END",
+]
+
+SQLITE_REBUILD = [
+    f"DELETE FROM {FTS_TABLE}",
+    f"INSERT INTO {FTS_TABLE}(rowid, form_id, content) "
+    f"SELECT id, form_id, {SQLITE_ENTRY_TEXT.format(data='data')} FROM form_entries",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')",
+]
+
+# PostgreSQL searches the data column directly through an expression index
+POSTGRES_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_form_entries_search "
+    "ON form_entries USING gin (to_tsvector('simple', data))",
+]
+
+def create_search_index(engine):
+    """Create the full-text index for the engine's dialect; idempotent
+
+    Runs at startup, so a new SQLite index only gets its table and
+    triggers. Existing entries are indexed by `flask forms rebuild-search`
+    (the 'search_index' backfill); search scans until then.
+    """
+    try:
+        with engine.begin() as conn:
+            if engine.dialect.name == 'sqlite':
+                for statement in SQLITE_SEARCH_DDL:
+                    conn.execute(db.text(statement))
+            elif engine.dialect.name == 'postgresql':
+                for statement in POSTGRES_SEARCH_DDL:
+                    conn.execute(db.text(statement))
+    except OperationalError as e:
+        # SQLite builds without FTS5; search falls back to scanning
+        logger.warning('Full-text search index not created: %s', e)
+
+def rebuild_search_index(engine):
+    """Re-index every entry; returns False when the dialect has nothing to rebuild"""
+    if engine.dialect.name != 'sqlite':
+        return False
+    with engine.begin() as conn:
+        for statement in SQLITE_SEARCH_DDL + SQLITE_REBUILD:
+            conn.execute(db.text(statement))
+        conn.execute(db.update(Backfill).where(Backfill.name == 'search_index').values(complete=True))
+    return True
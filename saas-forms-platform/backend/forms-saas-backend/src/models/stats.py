@@ -0,0 +1,31 @@
+from src.models.user import db
+
+class SubmissionCount(db.Model):
+    """Number of submissions a form received in one hour or day bucket"""
+    __tablename__ = 'submission_counts'
+    
+    form_id = db.Column(db.Integer, db.ForeignKey('forms.id'), primary_key=True)
+    granularity = db.Column(db.String(10), primary_key=True)  # 'hour' or 'day'
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'start': self.bucket_start.isoformat(),
+            'count': self.count
+        }
+
+class FieldValueCount(db.Model):
+    """Number of submissions that chose a value in a form's choice field"""
+    __tablename__ = 'field_value_counts'
+    
+    form_id = db.Column(db.Integer, db.ForeignKey('forms.id'), primary_key=True)
+    field_name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.String(255), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'value': self.value,
+            'count': self.count
+        }
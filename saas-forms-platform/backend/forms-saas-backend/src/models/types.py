@@ -0,0 +1,66 @@
+import json
+import zlib
+
+from flask.json.provider import DefaultJSONProvider
+
+from src.models.user import db
+
+try:
+    import orjson
+except ImportError:  # optional fast backend
+    orjson = None
+
+def dumps(value):
+    """Serialize to a JSON string with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(value)
+
+def loads(value):
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+class JSONText(db.TypeDecorator):
+    """JSON stored as text, decoded once when a row is loaded
+
+    The instance attribute holds the decoded value, so repeated reads in a
+    request do not parse again. Values must be reassigned, not mutated in
+    place, for changes to be saved.
+    """
+    impl = db.Text
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        return None if value is None else dumps(value)
+    
+    def process_result_value(self, value, dialect):
+        return None if value is None else loads(value)
+
+class CompressedJSON(db.TypeDecorator):
+    """JSON stored as zlib-compressed bytes, for rarely read cold data"""
+    impl = db.LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        return None if value is None else zlib.compress(dumps(value).encode('utf-8'))
+    
+    def process_result_value(self, value, dialect):
+        return None if value is None else loads(zlib.decompress(value))
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify when available"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def init_json(app):
+    """Switch Flask's JSON handling to orjson when it is installed"""
+    if orjson is not None:
+        app.json = ORJSONProvider(app)
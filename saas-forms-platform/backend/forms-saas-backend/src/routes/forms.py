@@ -1,23 +1,58 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app, make_response, url_for
 from src.models.form import db, Form, FormEntry, FormTemplate
+from src.services.assets import static_assets
+from src.services.bulk import MAX_BULK_ITEMS, MAX_BULK_ENTRIES, create_forms, insert_entries, set_forms_active
+from src.services.cache import LRUCache
+from src.services.dedup import (IDEMPOTENCY_HEADER, MAX_IDEMPOTENCY_KEY_LENGTH, claim_keys, find_duplicate,
+                                 idempotency_submission_key, remember_keys, submission_keys)
+from src.services.entries import index_entry_values, page_entries, parse_datetime
+from src.services.export import EXPORT_FORMATS, generate_export
+from src.services.form_cache import FormMetadataCache
+from src.services.form_list import list_forms
+from src.services.ingest import QueueFull
+from src.services.lookups import client_ids
+from src.services.rendering import render_fields
+from src.services.search import search_entries
+from src.services.stats import GRANULARITIES, get_form_stats, record_entries
 from datetime import datetime
+from functools import lru_cache
+import hashlib
+from html import escape
 import uuid
-import csv
-import io
-from flask import make_response
 
 forms_bp = Blueprint('forms', __name__)
 
+# Rendered embed pages by form id, each tagged with the updated_at version
+# it was rendered from. Entries are dropped whenever the form is
+# invalidated, and a hit is only served when its version matches the form
+# metadata, so a render of an older version stored after the invalidation
+# is never served.
+embed_cache = LRUCache(maxsize=1024)
+
+# Active flag and fields per form for the submit path
+form_cache = FormMetadataCache()
+form_cache.add_listener(embed_cache.pop)
+
 # Forms CRUD Operations
 @forms_bp.route('/forms', methods=['GET'])
 def get_forms():
     """Get all forms"""
     try:
-        forms = Form.query.filter_by(is_active=True).order_by(Form.created_at.desc()).all()
-        return jsonify({
+        try:
+            forms, fields, next_cursor, total = list_forms(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        response = {
             'success': True,
-            'forms': [form.to_dict() for form in forms]
-        })
+            'forms': [form.to_dict(entry_count, only=fields) for form, entry_count in forms]
+        }
+        if request.args.get('limit'):
+            response['next_cursor'] = next_cursor
+        if total is not None:
+            response['total'] = total
+        
+        return jsonify(response)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -41,10 +76,7 @@ def create_form():
         
         db.session.add(form)
         db.session.commit()
-        
-        # Generate embed codes
-        generate_embed_codes(form)
-        db.session.commit()
+        form_cache.invalidate(form.id)
         
         return jsonify({
             'success': True,
@@ -91,10 +123,8 @@ def update_form(form_id):
         
         form.updated_at = datetime.utcnow()
         
-        # Regenerate embed codes
-        generate_embed_codes(form)
-        
         db.session.commit()
+        form_cache.invalidate(form_id)
         
         return jsonify({
             'success': True,
@@ -111,6 +141,7 @@ def delete_form(form_id):
         form = Form.query.get_or_404(form_id)
         form.is_active = False
         db.session.commit()
+        form_cache.invalidate(form_id)
         
         return jsonify({
             'success': True,
@@ -120,85 +151,353 @@ def delete_form(form_id):
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Bulk operations
+def bulk_items(key, limit):
+    """Read the list of bulk items from the request, or return an error response"""
+    data = request.get_json(silent=True) or {}
+    items = data.get(key)
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({'success': False, 'error': f'{key} must be a non-empty list'}), 400)
+    if len(items) > limit:
+        return None, (jsonify({'success': False, 'error': f'At most {limit} {key} per request'}), 413)
+    return items, None
+
+def bulk_response(result, status=200):
+    """Per-item errors only fail the request when no item succeeded"""
+    if result.errors:
+        status = 207 if result.ids else 400
+    return jsonify(result.to_dict()), status
+
+@forms_bp.route('/forms/bulk', methods=['POST'])
+def bulk_create_forms():
+    """Create several forms in one transaction"""
+    try:
+        items, error = bulk_items('forms', MAX_BULK_ITEMS)
+        if error:
+            return error
+        
+        result = create_forms(items)
+        for form_id in result.ids:
+            form_cache.invalidate(form_id)
+        
+        return bulk_response(result, 201)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@forms_bp.route('/forms/bulk/delete', methods=['POST'])
+def bulk_delete_forms():
+    """Soft delete several forms"""
+    return bulk_set_active(False)
+
+@forms_bp.route('/forms/bulk/restore', methods=['POST'])
+def bulk_restore_forms():
+    """Restore several soft-deleted forms"""
+    return bulk_set_active(True)
+
+def bulk_set_active(is_active):
+    try:
+        form_ids, error = bulk_items('ids', MAX_BULK_ITEMS)
+        if error:
+            return error
+        
+        result = set_forms_active(form_ids, is_active)
+        for form_id in result.ids:
+            form_cache.invalidate(form_id)
+        
+        return bulk_response(result)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@forms_bp.route('/forms/<int:form_id>/entries/bulk', methods=['POST'])
+def bulk_create_entries(form_id):
+    """Import several entries into a form in one transaction"""
+    try:
+        form = form_cache.get(form_id)
+        if form is None:
+            return jsonify({'success': False, 'error': 'Form not found'}), 404
+        
+        items, error = bulk_items('entries', MAX_BULK_ENTRIES)
+        if error:
+            return error
+        
+        validate = request.args.get('validate', 'true').lower() != 'false'
+        result = insert_entries(form, items, validate=validate)
+        return bulk_response(result, 201)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # Form Submissions
 @forms_bp.route('/forms/<int:form_id>/submit', methods=['POST'])
 def submit_form(form_id):
     """Submit form data"""
     try:
-        form = Form.query.get_or_404(form_id)
+        # Checked before any database access so floods stay cheap
+        retry_after = rate_limited('submit')
+        if retry_after is not None:
+            return too_many_submissions(retry_after)
+        
+        form = form_cache.get(form_id)
         
+        if form is None:
+            return jsonify({'success': False, 'error': 'Form not found'}), 404
         if not form.is_active:
             return jsonify({'success': False, 'error': 'Form is not active'}), 400
         
-        data = request.get_json()
+        retry_after = rate_limited('submit', form)
+        if retry_after is not None:
+            return too_many_submissions(retry_after)
+        
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+            return jsonify({
+                'success': False,
+                'error': f'{IDEMPOTENCY_HEADER} must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters'
+            }), 400
+        
+        data = request.get_json(silent=True) or {}
+        
+        # Validate before anything is written
+        errors, entry_data = form.validate(data.get('data', {}))
+        if errors:
+            return jsonify({
+                'success': False,
+                'error': next(iter(errors.values())),
+                'errors': errors
+            }), 400
+        
+        # Replays of an earlier submission get its entry back instead of a new one
+        now = datetime.utcnow()
+        keys = submission_keys(form, entry_data, idempotency_key, request.remote_addr, now,
+                               current_app.config.get('IDEMPOTENCY_KEY_TTL', 86400))
+        if keys:
+            duplicate_id = find_duplicate(form_id, keys, now)
+            if duplicate_id is not None:
+                return duplicate_response(duplicate_id)
+        
+        submission_queue = current_app.extensions.get('submission_queue')
+        if submission_queue is not None:
+            receipt = idempotency_key
+            if receipt is None:
+                # A receipt works like an Idempotency-Key the server picked
+                receipt = uuid.uuid4().hex
+                keys.append(idempotency_submission_key(receipt, now, current_app.config.get('IDEMPOTENCY_KEY_TTL', 86400)))
+            return enqueue_submission(submission_queue, form, entry_data, keys, receipt)
         
         # Create form entry
         entry = FormEntry(
             form_id=form_id,
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent', '')
+            **client_ids(request.remote_addr, request.headers.get('User-Agent', ''))
         )
-        entry.set_data(data.get('data', {}))
+        entry.set_data(entry_data)
         
         db.session.add(entry)
+        db.session.flush()
+        if keys:
+            duplicate_id = claim_keys(form_id, keys, entry.id, now)
+            if duplicate_id is not None:
+                # A concurrent request with the same key committed first
+                db.session.rollback()
+                return duplicate_response(duplicate_id)
+        index_entry_values([entry])
+        record_entries([entry], {form_id: form.fields})
+        # Read the id before commit expires the instance and forces a reload
+        entry_id = entry.id
         db.session.commit()
+        remember_keys(form_id, keys, entry_id)
         
         return jsonify({
             'success': True,
             'message': 'Form submitted successfully',
-            'entry_id': entry.id
+            'entry_id': entry_id
         }), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def rate_limited(scope, form=None):
+    """Retry-After seconds when this request is over a rate limit, otherwise None
+
+    Without a form only the per-client limit is checked, which needs no
+    database access; with the form's cached metadata its own limits apply.
+    """
+    limiter = current_app.extensions.get('rate_limiter')
+    if limiter is None:
+        return None
+    if form is None:
+        return limiter.check_client(scope, request.remote_addr)
+    return limiter.check_form(scope, form.id, request.remote_addr, form.settings)
+
+def too_many_submissions(retry_after):
+    return jsonify({'success': False, 'error': 'Too many requests, please retry'}), 429, {'Retry-After': str(retry_after)}
+
+def duplicate_response(entry_id):
+    """Answer a replayed submission with the entry it already created"""
+    return jsonify({
+        'success': True,
+        'message': 'Form already submitted',
+        'entry_id': entry_id,
+        'duplicate': True
+    }), 200
+
+def enqueue_submission(submission_queue, form, entry_data, keys=None, receipt=None):
+    """Hand a submission to the batched writer and wait for its commit
+
+    When the commit takes longer than SUBMISSION_ACK_TIMEOUT the answer is
+    a 202 with `stored: false` and a receipt. A 202 is not a promise to
+    store the submission: it lives only in this process's memory until
+    written, and is lost if the process dies first. Clients keep the
+    submission until get_submission_receipt reports it stored, and send it
+    again with the receipt as its Idempotency-Key when it is unknown, which
+    cannot create a second entry.
+    """
+    try:
+        pending = submission_queue.submit(
+            form.id,
+            entry_data,
+            request.remote_addr,
+            request.headers.get('User-Agent', ''),
+            form.fields,
+            keys
+        )
+    except QueueFull:
+        retry_after = current_app.config.get('SUBMISSION_RETRY_AFTER', 1)
+        return jsonify({'success': False, 'error': 'Too many submissions, please retry'}), 429, {'Retry-After': str(retry_after)}
+    
+    # Return this request's connection to the pool so the writer can get one
+    db.session.close()
+    
+    if not pending.done.wait(current_app.config.get('SUBMISSION_ACK_TIMEOUT', 10)):
+        # Still queued; it will be written once the writer catches up
+        status_url = url_for('forms.get_submission_receipt', form_id=form.id, receipt=receipt)
+        return jsonify({
+            'success': True,
+            'stored': False,
+            'message': 'Form submission queued but not stored yet; check status_url and resend it if unknown',
+            'receipt': receipt,
+            'status_url': status_url
+        }), 202, {'Location': status_url}
+    
+    if pending.error is not None:
+        return jsonify({'success': False, 'error': str(pending.error)}), 500
+    if pending.duplicate:
+        return duplicate_response(pending.entry_id)
+    
+    return jsonify({
+        'success': True,
+        'message': 'Form submitted successfully',
+        'entry_id': pending.entry_id
+    }), 201
+
+@forms_bp.route('/forms/<int:form_id>/submissions/<receipt>', methods=['GET'])
+def get_submission_receipt(form_id, receipt):
+    """Look up a submission accepted with a 202 by its receipt
+
+    'unknown' means the submission was never stored: it was lost from the
+    queue, or its receipt expired with IDEMPOTENCY_KEY_TTL.
+    """
+    try:
+        key = idempotency_submission_key(receipt, datetime.utcnow())
+        entry_id = find_duplicate(form_id, [key], datetime.utcnow())
+        if entry_id is not None:
+            return jsonify({'success': True, 'status': 'stored', 'entry_id': entry_id})
+        
+        submission_queue = current_app.extensions.get('submission_queue')
+        if submission_queue is not None and submission_queue.is_queued(form_id, key[0]):
+            return jsonify({'success': True, 'status': 'queued'})
+        
+        return jsonify({
+            'success': False,
+            'status': 'unknown',
+            'error': f'Submission not found; send it again with the receipt as the {IDEMPOTENCY_HEADER}'
+        }), 404
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # Form Entries Management
 @forms_bp.route('/forms/<int:form_id>/entries', methods=['GET'])
 def get_form_entries(form_id):
-    """Get all entries for a form"""
+    """Get a page of entries for a form"""
     try:
-        form = Form.query.get_or_404(form_id)
-        entries = FormEntry.query.filter_by(form_id=form_id).order_by(FormEntry.submitted_at.desc()).all()
+        Form.query.get_or_404(form_id)
         
-        return jsonify({
+        try:
+            entries, next_cursor, total = page_entries(form_id, request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        response = {
             'success': True,
             'entries': [entry.to_dict() for entry in entries],
-            'total': len(entries)
+            'next_cursor': next_cursor
+        }
+        if total is not None:
+            response['total'] = total
+        
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@forms_bp.route('/forms/<int:form_id>/entries/search', methods=['GET'])
+def search_form_entries(form_id):
+    """Full-text search over a form's entries"""
+    try:
+        if db.session.get(Form, form_id) is None:
+            return jsonify({'success': False, 'error': 'Form not found'}), 404
+        
+        try:
+            hits, next_offset = search_entries(form_id, request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'entries': [dict(entry.to_dict(), snippet=snippet, score=score) for entry, snippet, score in hits],
+            'next_offset': next_offset
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@forms_bp.route('/forms/<int:form_id>/stats', methods=['GET'])
+def get_stats(form_id):
+    """Get submission counts over time and top values per choice field"""
+    try:
+        Form.query.get_or_404(form_id)
+        
+        granularity = request.args.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            return jsonify({'success': False, 'error': f'Unsupported granularity: {granularity}'}), 400
+        try:
+            since = parse_datetime(request.args['since'], 'since') if request.args.get('since') else None
+            until = parse_datetime(request.args['until'], 'until') if request.args.get('until') else None
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'stats': get_form_stats(form_id, granularity, since, until, request.args.get('top', 10, type=int))
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @forms_bp.route('/forms/<int:form_id>/entries/export', methods=['GET'])
 def export_form_entries(form_id):
-    """Export form entries as CSV"""
+    """Export form entries as a streamed CSV or NDJSON download"""
     try:
         form = Form.query.get_or_404(form_id)
-        entries = FormEntry.query.filter_by(form_id=form_id).order_by(FormEntry.submitted_at.desc()).all()
         
-        # Create CSV
-        output = io.StringIO()
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'success': False, 'error': f'Unsupported export format: {export_format}'}), 400
+        compress = request.args.get('compress') == 'gzip'
+        include_archived = request.args.get('include_archived') == 'true'
         
-        if entries:
-            # Get all field names from the first entry
-            first_entry_data = entries[0].get_data()
-            fieldnames = ['ID', 'Submitted At', 'IP Address'] + list(first_entry_data.keys())
-            
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for entry in entries:
-                row = {
-                    'ID': entry.id,
-                    'Submitted At': entry.submitted_at.strftime('%Y-%m-%d %H:%M:%S') if entry.submitted_at else '',
-                    'IP Address': entry.ip_address or ''
-                }
-                row.update(entry.get_data())
-                writer.writerow(row)
-        
-        # Create response
-        response = make_response(output.getvalue())
-        response.headers['Content-Type'] = 'text/csv'
-        response.headers['Content-Disposition'] = f'attachment; filename=form_{form_id}_entries.csv'
+        chunks, mimetype, filename = generate_export(form, export_format, compress, include_archived=include_archived)
+        
+        response = Response(stream_with_context(chunks), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
         
         return response
     except Exception as e:
@@ -234,10 +533,7 @@ def create_form_from_template(template_id):
         
         db.session.add(form)
         db.session.commit()
-        
-        # Generate embed codes
-        generate_embed_codes(form)
-        db.session.commit()
+        form_cache.invalidate(form.id)
         
         return jsonify({
             'success': True,
@@ -252,37 +548,75 @@ def create_form_from_template(template_id):
 def get_embed_codes(form_id):
     """Get embed and iframe codes for a form"""
     try:
-        form = Form.query.get_or_404(form_id)
+        form = db.session.query(Form.id, Form.theme).filter(Form.id == form_id).first()
+        if form is None:
+            return jsonify({'success': False, 'error': 'Form not found'}), 404
+        
+        base_url = current_app.config.get('PUBLIC_BASE_URL') or request.host_url
+        embed_code, iframe_code = generate_embed_codes(base_url.rstrip('/'), form.id, form.theme)
         
         return jsonify({
             'success': True,
-            'embed_code': form.embed_code,
-            'iframe_code': form.iframe_code,
+            'embed_code': embed_code,
+            'iframe_code': iframe_code,
             'form_url': f'/embed/{form_id}'
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # Public form display for embedding
+def render_embed(form):
+    """Render a form's embed page and cache it with its ETag"""
+    html = generate_embed_html(form)
+    # Theme and field changes bump updated_at, like every other form change
+    version = form.updated_at
+    etag = hashlib.sha256(html.encode('utf-8')).hexdigest()
+    
+    rendered = (version, html, etag)
+    embed_cache.set(form.id, rendered)
+    return rendered
+
 @forms_bp.route('/embed/<int:form_id>', methods=['GET'])
 def embed_form(form_id):
     """Public endpoint for embedded forms"""
     try:
-        form = Form.query.get_or_404(form_id)
-        
-        if not form.is_active:
-            return "Form not found or inactive", 404
+        retry_after = rate_limited('embed')
+        if retry_after is None:
+            # Also caches the form's settings for its own limits
+            meta = form_cache.get(form_id)
+            if meta is None or not meta.is_active:
+                return "Form not found or inactive", 404
+            retry_after = rate_limited('embed', meta)
+        if retry_after is not None:
+            return "Too many requests", 429, {'Retry-After': str(retry_after)}
+        
+        rendered = embed_cache.get(form_id)
+        
+        if rendered is None or rendered[0] != meta.version:
+            form = Form.query.get_or_404(form_id)
+            
+            if not form.is_active:
+                return "Form not found or inactive", 404
+            
+            rendered = render_embed(form)
         
         # Return HTML for the embedded form
-        html = generate_embed_html(form)
-        return html, 200, {'Content-Type': 'text/html'}
+        version, html, etag = rendered
+        response = make_response(html, 200, {'Content-Type': 'text/html'})
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config.get('EMBED_CACHE_MAX_AGE', 60)
+        return response.make_conditional(request)
     except Exception as e:
         return f"Error loading form: {str(e)}", 500
 
-def generate_embed_codes(form):
-    """Generate embed and iframe codes for a form"""
-    base_url = request.host_url.rstrip('/')
-    
+@lru_cache(maxsize=4096)
+def generate_embed_codes(base_url, form_id, theme):
+    """Generate embed and iframe codes for a form
+
+    The snippets depend only on their arguments, so they are built on
+    demand and memoized rather than stored with the form.
+    """
     # Generate embed code (JavaScript)
     embed_code = f'''<script>
 (function() {{
@@ -290,27 +624,26 @@ def generate_embed_codes(form):
     script.src = '{base_url}/static/embed.js';
     script.onload = function() {{
         TiDForms.embed({{
-            formId: {form.id},
+            formId: {form_id},
             apiUrl: '{base_url}/api',
-            theme: '{form.theme}'
+            theme: '{theme}'
         }});
     }};
     document.head.appendChild(script);
 }})();
 </script>
-<div id="tid-form-{form.id}"></div>'''
-    
+<div id="tid-form-{form_id}"></div>'''
+
     # Generate iframe code
     iframe_code = f'''<iframe 
-    src="{base_url}/embed/{form.id}" 
+    src="{base_url}/embed/{form_id}" 
     width="100%" 
     height="600" 
     frameborder="0" 
     style="border: none; border-radius: 8px;">
 </iframe>'''
-    
-    form.embed_code = embed_code
-    form.iframe_code = iframe_code
+
+    return embed_code, iframe_code
 
 def generate_embed_html(form):
     """Generate HTML for embedded form"""
@@ -323,80 +656,26 @@ def generate_embed_html(form):
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{form.name}</title>
-    <link rel="stylesheet" href="/static/embed-styles.css">
+    <title>{escape(form.name)}</title>
+    <link rel="stylesheet" href="{static_assets.url('embed-styles.css')}">
 </head>
 <body>
-    <div class="tid-form-container theme-{form.theme}">
+    <div class="tid-form-container theme-{escape(form.theme or '')}">
         <form id="tid-form-{form.id}" class="tid-form" data-form-id="{form.id}">
             <div class="form-header">
-                <h2 class="form-title">{form.name}</h2>
-                {f'<p class="form-description">{form.description}</p>' if form.description else ''}
+                <h2 class="form-title">{escape(form.name)}</h2>
+                {f'<p class="form-description">{escape(form.description)}</p>' if form.description else ''}
             </div>
             <div class="form-fields">
-                {generate_form_fields_html(fields)}
+                {render_fields(fields)}
             </div>
             <div class="form-footer">
                 <button type="submit" class="submit-btn">Submit</button>
             </div>
         </form>
     </div>
-    <script src="/static/embed-form.js"></script>
+    <script src="{static_assets.url('embed-form.js')}"></script>
 </body>
 </html>'''
-    
-    return html
 
-def generate_form_fields_html(fields):
-    """Generate HTML for form fields"""
-    html = ""
-    
-    for field in fields:
-        field_type = field.get('type', 'text')
-        field_name = field.get('name', '')
-        field_label = field.get('label', '')
-        field_required = field.get('required', False)
-        field_placeholder = field.get('placeholder', '')
-        
-        html += f'''
-        <div class="form-field">
-            <label for="{field_name}" class="field-label">
-                {field_label}
-                {' <span class="required">*</span>' if field_required else ''}
-            </label>
-        '''
-        
-        if field_type == 'text' or field_type == 'email':
-            html += f'''
-            <input 
-                type="{field_type}" 
-                id="{field_name}" 
-                name="{field_name}" 
-                placeholder="{field_placeholder}"
-                {'required' if field_required else ''}
-                class="field-input"
-            >
-            '''
-        elif field_type == 'textarea':
-            html += f'''
-            <textarea 
-                id="{field_name}" 
-                name="{field_name}" 
-                placeholder="{field_placeholder}"
-                {'required' if field_required else ''}
-                class="field-textarea"
-                rows="4"
-            ></textarea>
-            '''
-        elif field_type == 'select':
-            options = field.get('options', [])
-            html += f'<select id="{field_name}" name="{field_name}" {"required" if field_required else ""} class="field-select">'
-            html += f'<option value="">{field_placeholder or "Select an option"}</option>'
-            for option in options:
-                html += f'<option value="{option}">{option}</option>'
-            html += '</select>'
-        
-        html += '</div>'
-    
     return html
-
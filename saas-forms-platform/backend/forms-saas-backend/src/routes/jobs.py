@@ -0,0 +1,110 @@
+from flask import Blueprint, current_app, request, jsonify, send_file
+from src.models.job import db, Job
+from src.services.jobs import cancel_job, create_job
+
+jobs_bp = Blueprint('jobs', __name__)
+
+TENANT_HEADER = 'X-Tenant-ID'
+DEFAULT_TENANT = 'default'
+
+def current_tenant():
+    """The requesting tenant, from the X-Tenant-ID header
+
+    Any client can send the header, so it only counts behind a trusted
+    proxy (TRUSTED_PROXIES), which must set or strip it on every request.
+    Requests that reach the app directly all belong to the default tenant.
+    """
+    if not current_app.config.get('TRUSTED_PROXIES'):
+        return DEFAULT_TENANT
+    return request.headers.get(TENANT_HEADER) or DEFAULT_TENANT
+
+def get_tenant_job(job_id):
+    """Get a job of the requesting tenant; other tenants' jobs are not found"""
+    return Job.query.filter_by(id=job_id, tenant=current_tenant()).first()
+
+def job_not_found():
+    return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+@jobs_bp.route('/jobs', methods=['POST'])
+def create_job_route():
+    """Queue a background job"""
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        try:
+            job = create_job(data.get('type'), data.get('params', {}), current_tenant())
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        }), 202
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@jobs_bp.route('/jobs', methods=['GET'])
+def get_jobs():
+    """Get the tenant's most recent jobs"""
+    try:
+        query = Job.query.filter_by(tenant=current_tenant())
+        if request.args.get('status'):
+            query = query.filter_by(status=request.args['status'])
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        jobs = query.order_by(Job.created_at.desc()).limit(limit).all()
+        
+        return jsonify({
+            'success': True,
+            'jobs': [job.to_dict() for job in jobs]
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a job's status and progress"""
+    try:
+        job = get_tenant_job(job_id)
+        if job is None:
+            return job_not_found()
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@jobs_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job_route(job_id):
+    """Cancel a queued or running job"""
+    try:
+        job = get_tenant_job(job_id)
+        if job is None:
+            return job_not_found()
+        if job.status in Job.FINISHED:
+            return jsonify({'success': False, 'error': f'Job already {job.status}'}), 409
+        
+        cancel_job(job)
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@jobs_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def download_job_result(job_id):
+    """Download the file a finished job produced"""
+    try:
+        job = get_tenant_job(job_id)
+        if job is None:
+            return job_not_found()
+        if job.status != 'succeeded' or job.result_path is None:
+            return jsonify({'success': False, 'error': 'Job has no result file'}), 404
+        
+        return send_file(job.result_path, mimetype=job.result_mimetype,
+                         as_attachment=True, download_name=job.result_name)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
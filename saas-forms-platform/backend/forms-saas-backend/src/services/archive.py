@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from src.models.archive import ArchivedEntry
+from src.models.form import db, Form, FormEntry, EntryValue
+from src.models.lookup import IPAddress, UserAgent
+from src.models.schema import pending_drops
+
+# Form.settings key: entries older than this many days move to the archive
+ARCHIVE_SETTING = 'archive_after_days'
+ARCHIVE_BATCH_SIZE = 1000
+
+def archive_after(settings):
+    """Get a form's retention as a timedelta, or None when it keeps every entry hot"""
+    days = (settings or {}).get(ARCHIVE_SETTING)
+    if isinstance(days, bool) or not isinstance(days, (int, float)) or days <= 0:
+        return None
+    return timedelta(days=days)
+
+def archive_cutoffs(now=None):
+    """List (form_id, cutoff) for every form with a retention setting"""
+    if 'form_entries' in pending_drops():
+        # Archiving copies interned client details only; inline ones would be lost
+        raise RuntimeError('Run `flask forms upgrade-schema` before archiving entries')
+    now = now or datetime.utcnow()
+    cutoffs = []
+    for form_id, settings in db.session.query(Form.id, Form.settings).order_by(Form.id):
+        after = archive_after(settings)
+        if after is not None:
+            cutoffs.append((form_id, now - after))
+    return cutoffs
+
+def archive_form_entries(form_id, cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move a form's entries submitted before cutoff to the archive; returns the number moved
+
+    Each batch is copied and deleted in one transaction, so an interrupted
+    run leaves every entry in exactly one tier. Archived entries drop their
+    entry_values rows and leave the full-text index; rollups keep counting
+    them.
+    """
+    moved = 0
+    while True:
+        rows = db.session.query(
+            FormEntry.id, FormEntry.form_id, FormEntry.data, IPAddress.value.label('ip_address'),
+            UserAgent.value.label('user_agent'), FormEntry.submitted_at
+        ).outerjoin(IPAddress, IPAddress.id == FormEntry.ip_address_id) \
+            .outerjoin(UserAgent, UserAgent.id == FormEntry.user_agent_id) \
+            .filter(FormEntry.form_id == form_id, FormEntry.submitted_at < cutoff) \
+            .order_by(FormEntry.id).limit(batch_size).all()
+        if not rows:
+            return moved
+        
+        archived_at = datetime.utcnow()
+        ids = [row.id for row in rows]
+        db.session.execute(db.insert(ArchivedEntry), [dict(row._asdict(), archived_at=archived_at) for row in rows])
+        EntryValue.query.filter(EntryValue.entry_id.in_(ids)).delete(synchronize_session=False)
+        FormEntry.query.filter(FormEntry.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        moved += len(rows)
+
+def archive_entries(now=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive old entries of every form with a retention setting; returns {form_id: moved}"""
+    return {
+        form_id: archive_form_entries(form_id, cutoff, batch_size)
+        for form_id, cutoff in archive_cutoffs(now)
+    }
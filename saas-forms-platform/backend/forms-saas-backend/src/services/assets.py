@@ -0,0 +1,197 @@
+from collections import namedtuple
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+BUILD_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+# Files under these prefixes already carry a content hash in their name (Vite output)
+HASHED_PREFIXES = ('assets/',)
+COMPRESSIBLE_TYPES = ('application/javascript', 'application/json', 'image/svg+xml', 'image/vnd.microsoft.icon')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+logger = logging.getLogger(__name__)
+
+Asset = namedtuple('Asset', ['etag', 'mimetype', 'immutable', 'bodies'])
+
+def is_compressible(mimetype):
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+def fingerprinted_name(path, digest):
+    root, ext = os.path.splitext(path)
+    return f'{root}.{digest[:10]}{ext}'
+
+def compress(body, mimetype, best=True):
+    """Precompressed variants of body, keeping only those that are smaller"""
+    if not is_compressible(mimetype):
+        return {}
+    
+    variants = {'gzip': gzip.compress(body, compresslevel=9 if best else 6, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=11 if best else 5)
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+def iter_sources(static_dir):
+    """Yield (logical path, absolute path) for every source asset"""
+    for root, dirs, files in os.walk(static_dir):
+        if root == static_dir and BUILD_DIR in dirs:
+            dirs.remove(BUILD_DIR)
+        for name in sorted(files):
+            full_path = os.path.join(root, name)
+            yield os.path.relpath(full_path, static_dir).replace(os.sep, '/'), full_path
+
+def build_assets(static_dir):
+    """Fingerprint and precompress the static files into static_dir/dist
+
+    Writes `name.<hash>.ext` plus `.gz`/`.br` siblings for each file and a
+    manifest mapping logical paths to them. Returns the manifest.
+    """
+    output_dir = os.path.join(static_dir, BUILD_DIR)
+    manifest = {}
+    for path, full_path in iter_sources(static_dir):
+        with open(full_path, 'rb') as source:
+            body = source.read()
+        digest = hashlib.sha256(body).hexdigest()
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        variants = compress(body, mimetype)
+        
+        name = fingerprinted_name(path, digest)
+        os.makedirs(os.path.dirname(os.path.join(output_dir, name)), exist_ok=True)
+        for encoding, data in [('identity', body)] + list(variants.items()):
+            with open(os.path.join(output_dir, name + ENCODING_SUFFIXES.get(encoding, '')), 'wb') as output:
+                output.write(data)
+        
+        manifest[path] = {'file': name, 'etag': digest[:20], 'mimetype': mimetype, 'encodings': sorted(variants)}
+    
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as output:
+        json.dump(manifest, output, indent=2, sort_keys=True)
+    return manifest
+
+def stale_paths(static_dir, manifest):
+    """Logical paths whose build output no longer matches the sources"""
+    stale = set(manifest)
+    for path, full_path in iter_sources(static_dir):
+        with open(full_path, 'rb') as source:
+            etag = hashlib.sha256(source.read()).hexdigest()[:20]
+        entry = manifest.get(path)
+        if entry is None or entry['etag'] != etag:
+            stale.add(path)
+        else:
+            stale.discard(path)
+    return sorted(stale)
+
+class StaticAssets:
+    """Static files held in memory and looked up through a manifest
+
+    Each file is reachable under its logical path and under its
+    fingerprinted name; the latter (and Vite's already hashed output) is
+    served as immutable. Serving never touches the filesystem: bodies and
+    their gzip/brotli variants are loaded once, from the build output when
+    `flask forms build-assets` has been run and still matches the sources,
+    otherwise by scanning and compressing the sources at startup.
+    """
+    
+    def __init__(self):
+        self._assets = {}
+        self._urls = {}
+    
+    def load(self, static_dir):
+        manifest_path = os.path.join(static_dir, BUILD_DIR, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            return self._load_sources(static_dir)
+        
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        stale = stale_paths(static_dir, manifest)
+        if stale:
+            # Serving the old build would ship outdated code under a valid fingerprint
+            logger.warning('Static build in %s is out of date (%s); serving the sources instead. '
+                           'Run `flask forms build-assets` to rebuild it.',
+                           os.path.dirname(manifest_path), ', '.join(stale))
+            return self._load_sources(static_dir)
+        self._load_build(os.path.dirname(manifest_path), manifest)
+    
+    def _load_build(self, output_dir, manifest):
+        assets, urls = {}, {}
+        for path, entry in manifest.items():
+            bodies = {}
+            for encoding in ['identity'] + entry['encodings']:
+                with open(os.path.join(output_dir, entry['file'] + ENCODING_SUFFIXES.get(encoding, '')), 'rb') as data:
+                    bodies[encoding] = data.read()
+            self._add(assets, urls, path, entry['file'], entry['etag'], entry['mimetype'], bodies)
+        self._assets, self._urls = assets, urls
+    
+    def _load_sources(self, static_dir):
+        assets, urls = {}, {}
+        for path, full_path in iter_sources(static_dir):
+            with open(full_path, 'rb') as source:
+                body = source.read()
+            digest = hashlib.sha256(body).hexdigest()
+            mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            bodies = dict(compress(body, mimetype, best=False), identity=body)
+            self._add(assets, urls, path, fingerprinted_name(path, digest), digest[:20], mimetype, bodies)
+        self._assets, self._urls = assets, urls
+    
+    def _add(self, assets, urls, path, name, etag, mimetype, bodies):
+        assets[path] = Asset(etag, mimetype, path.startswith(HASHED_PREFIXES), bodies)
+        assets[name] = Asset(etag, mimetype, True, bodies)
+        urls[path] = name
+    
+    def url(self, path):
+        """Public URL of an asset, fingerprinted when the asset is known"""
+        return '/static/' + self._urls.get(path, path)
+    
+    def __contains__(self, path):
+        return path in self._assets
+    
+    def serve(self, path):
+        """Build the response for an asset, or None when there is no such asset"""
+        asset = self._assets.get(path)
+        if asset is None:
+            return None
+        
+        # Ranges address the identity bytes; only whole responses are compressed
+        encoding = 'identity'
+        if 'Range' not in request.headers:
+            for candidate in ('br', 'gzip'):
+                if candidate in asset.bodies and request.accept_encodings[candidate]:
+                    encoding = candidate
+                    break
+        body = asset.bodies[encoding]
+        
+        response = Response(body, mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        if len(asset.bodies) > 1:
+            response.vary.add('Accept-Encoding')
+        response.set_etag(asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}')
+        
+        if asset.immutable:
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        elif asset.mimetype == 'text/html':
+            response.headers['Cache-Control'] = 'no-cache'
+        else:
+            response.cache_control.public = True
+            response.cache_control.max_age = current_app.config.get('STATIC_MAX_AGE', 300)
+        
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(body))
+
+# Shared by the app routes and embed rendering
+static_assets = StaticAssets()
+
+def init_assets(app, static_dir=STATIC_DIR):
+    static_assets.load(static_dir)
+    app.extensions['static_assets'] = static_assets
+    return static_assets
@@ -0,0 +1,220 @@
+import csv
+from datetime import datetime
+
+from src.models.form import db, Form, FormEntry, EntryValue
+from src.models.types import loads
+from src.services.entries import entry_values_enabled
+from src.services.lookups import intern_clients
+from src.services.stats import record_entries
+
+MAX_BULK_ITEMS = 1000
+MAX_BULK_ENTRIES = 5000
+INSERT_CHUNK_SIZE = 500
+
+# Columns of the WordPress plugin's entries CSV (InnovativeForms_Entry_Manager::export_entries_csv)
+PLUGIN_DATE_COLUMN = 'Submission Date'
+PLUGIN_STATUS_COLUMN = 'Status'
+PLUGIN_IP_COLUMN = 'IP Address'
+PLUGIN_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+class BulkResult:
+    """Outcome of a bulk operation: created/affected ids plus per-item errors"""
+    
+    def __init__(self):
+        self.ids = []
+        self.errors = []
+    
+    def error(self, index, message):
+        self.errors.append({'index': index, 'error': message})
+    
+    def to_dict(self):
+        return {
+            'success': not self.errors,
+            'ids': self.ids,
+            'errors': self.errors
+        }
+
+def form_from_item(item):
+    """Build a Form from a bulk item, raising ValueError for invalid input"""
+    if not isinstance(item, dict):
+        raise ValueError('Item must be an object')
+    
+    name = item.get('name', 'Untitled Form')
+    fields = item.get('fields', [])
+    settings = item.get('settings', {})
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError('name must be a non-empty string')
+    if not isinstance(fields, list):
+        raise ValueError('fields must be a list')
+    if not isinstance(settings, dict):
+        raise ValueError('settings must be an object')
+    
+    form = Form(
+        name=name,
+        description=item.get('description', ''),
+        theme=item.get('theme', 'modern'),
+        is_active=bool(item.get('is_active', True))
+    )
+    form.set_fields(fields)
+    form.set_settings(settings)
+    return form
+
+def create_forms(items):
+    """Create forms in one transaction; invalid items are reported and skipped"""
+    result = BulkResult()
+    forms = []
+    for index, item in enumerate(items):
+        try:
+            forms.append(form_from_item(item))
+        except ValueError as e:
+            result.error(index, str(e))
+    
+    db.session.add_all(forms)
+    db.session.commit()
+    
+    result.ids = [form.id for form in forms]
+    return result
+
+def parse_submitted_at(value):
+    if value in (None, ''):
+        return datetime.utcnow()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return datetime.strptime(value, PLUGIN_DATE_FORMAT)
+    raise ValueError('submitted_at must be an ISO 8601 string')
+
+def insert_entries(form, items, validate=True):
+    """Insert entries for a form in one transaction with per-item errors
+
+    `form` is the form's cached metadata (FormMeta). Items look like
+    {'data': {...}, 'submitted_at': '...', 'ip_address': '...'}; ids are
+    returned in item order.
+    """
+    result = BulkResult()
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError('Item must be an object')
+            data = item.get('data', {})
+            if validate:
+                errors, data = form.validate(data)
+                if errors:
+                    raise ValueError(next(iter(errors.values())))
+            elif not isinstance(data, dict):
+                raise ValueError('data must be an object')
+            for key in ('ip_address', 'user_agent'):
+                if not isinstance(item.get(key, ''), (str, type(None))):
+                    raise ValueError(f'{key} must be a string')
+            
+            rows.append({
+                'form_id': form.id,
+                'data': data,
+                'ip_address': item.get('ip_address'),
+                'user_agent': item.get('user_agent', ''),
+                'submitted_at': parse_submitted_at(item.get('submitted_at'))
+            })
+        except ValueError as e:
+            result.error(index, str(e))
+    
+    intern_clients(rows)
+    entries = []
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + INSERT_CHUNK_SIZE]
+        ids = db.session.scalars(
+            db.insert(FormEntry).returning(FormEntry.id, sort_by_parameter_order=True),
+            chunk
+        ).all()
+        for entry_id, row in zip(ids, chunk):
+            entries.append(FormEntry(id=entry_id, **row))
+    
+    if entry_values_enabled():
+        value_rows = []
+        for entry in entries:
+            value_rows.extend(EntryValue.rows_for(entry.id, entry.form_id, entry.data))
+        for start in range(0, len(value_rows), INSERT_CHUNK_SIZE):
+            db.session.execute(db.insert(EntryValue), value_rows[start:start + INSERT_CHUNK_SIZE])
+    record_entries(entries, {form.id: form.fields})
+    db.session.commit()
+    
+    result.ids = [entry.id for entry in entries]
+    return result
+
+def set_forms_active(form_ids, is_active):
+    """Soft-delete or restore forms with one UPDATE; unknown ids are reported"""
+    result = BulkResult()
+    ids = []
+    for index, form_id in enumerate(form_ids):
+        if isinstance(form_id, int) and not isinstance(form_id, bool):
+            ids.append(form_id)
+        else:
+            result.error(index, 'id must be an integer')
+    
+    existing = {row.id for row in db.session.query(Form.id).filter(Form.id.in_(ids))}
+    for index, form_id in enumerate(form_ids):
+        if form_id in ids and form_id not in existing:
+            result.error(index, f'Form {form_id} not found')
+    result.errors.sort(key=lambda error: error['index'])
+    
+    if existing:
+        db.session.query(Form).filter(Form.id.in_(existing)).update(
+            {Form.is_active: is_active, Form.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+    db.session.commit()
+    
+    result.ids = sorted(existing)
+    return result
+
+def plugin_form_item(row):
+    """Map a row of the plugin's innovative_forms table to a bulk form item"""
+    fields = row.get('fields') or []
+    settings = row.get('settings') or {}
+    if isinstance(fields, str):
+        fields = loads(fields)
+    if isinstance(settings, str):
+        settings = loads(settings)
+    # The plugin stores options as value => label maps; both shapes render and validate
+    return {
+        'name': row.get('name'),
+        'description': row.get('description', ''),
+        'theme': row.get('theme') or settings.get('theme', 'modern'),
+        'fields': fields,
+        'settings': settings,
+        'is_active': row.get('status', 'active') == 'active'
+    }
+
+def read_plugin_entries_csv(stream, form, batch_size=MAX_BULK_ENTRIES):
+    """Yield batches of bulk entry items from the plugin's entries CSV export
+
+    Columns are matched to fields by label; checkbox values the plugin
+    joined with ', ' are split back into lists.
+    """
+    fields_by_label = {field.get('label'): field for field in form.fields if field.get('name')}
+    reader = csv.DictReader(stream)
+    reader.fieldnames = [name.lstrip('﻿') for name in reader.fieldnames or []]
+    
+    batch = []
+    for row in reader:
+        data = {}
+        for column, value in row.items():
+            if column in (PLUGIN_DATE_COLUMN, PLUGIN_STATUS_COLUMN, PLUGIN_IP_COLUMN) or column is None:
+                continue
+            field = fields_by_label.get(column)
+            name = field['name'] if field else column
+            if field and field.get('type') == 'checkbox':
+                value = [item for item in (value or '').split(', ') if item]
+            data[name] = value
+        
+        batch.append({
+            'data': data,
+            'submitted_at': row.get(PLUGIN_DATE_COLUMN) or None,
+            'ip_address': row.get(PLUGIN_IP_COLUMN) or None
+        })
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,39 @@
+from collections import OrderedDict
+import threading
+
+class LRUCache:
+    """Thread-safe, size-bounded mapping that evicts the least recently used key"""
+    
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+    
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __contains__(self, key):
+        return key in self._data
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+import hashlib
+import json
+
+from src.models.dedup import SubmissionKey
+from src.models.form import db
+from src.models.lookup import INSERT_DIALECTS
+from src.services.cache import LRUCache
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+DEFAULT_IDEMPOTENCY_TTL = 86400
+# Form.settings key: the same data from the same client within this many
+# seconds is treated as a duplicate of the first submission
+DEDUP_SETTING = 'dedup_window_seconds'
+
+# (form_id, key) -> (entry_id, expires_at) for keys this process saw recently,
+# so replays are answered without a query
+recent_keys = LRUCache(maxsize=10000)
+
+def dedup_window(settings):
+    """Get a form's content dedup window as a timedelta, or None when it is off"""
+    seconds = (settings or {}).get(DEDUP_SETTING)
+    if isinstance(seconds, bool) or not isinstance(seconds, (int, float)) or seconds <= 0:
+        return None
+    return timedelta(seconds=seconds)
+
+def digest(*parts):
+    return hashlib.sha256('\x00'.join(parts).encode('utf-8', 'surrogatepass')).hexdigest()
+
+def idempotency_submission_key(idempotency_key, now, idempotency_ttl=DEFAULT_IDEMPOTENCY_TTL):
+    """(key, expires_at) for an Idempotency-Key, or for a receipt handed out in its place"""
+    return digest('idempotency', idempotency_key), now + timedelta(seconds=idempotency_ttl)
+
+def submission_keys(form, entry_data, idempotency_key, ip_address, now, idempotency_ttl=DEFAULT_IDEMPOTENCY_TTL):
+    """Get the keys identifying a submission as [(key, expires_at)]
+
+    One for the client's Idempotency-Key, if sent, and one for the content
+    when the form has a dedup window. Either is enough to match a replay.
+    """
+    keys = []
+    if idempotency_key:
+        keys.append(idempotency_submission_key(idempotency_key, now, idempotency_ttl))
+    window = dedup_window(form.settings)
+    if window is not None:
+        content = json.dumps(entry_data, sort_keys=True, default=str)
+        keys.append((digest('content', ip_address or '', content), now + window))
+    return keys
+
+def cached_duplicate(form_id, keys, now):
+    """Get the id of the entry holding any of keys from this process's cache alone, or None"""
+    for key, expires_at in keys:
+        cached = recent_keys.get((form_id, key))
+        if cached is not None and cached[1] > now:
+            return cached[0]
+    return None
+
+def duplicate_query(form_id, keys, now):
+    """SELECT key, entry_id, expires_at of a live key among keys"""
+    return db.select(SubmissionKey.key, SubmissionKey.entry_id, SubmissionKey.expires_at).where(
+        SubmissionKey.form_id == form_id,
+        SubmissionKey.key.in_([key for key, expires_at in keys]),
+        SubmissionKey.expires_at > now
+    ).limit(1)
+
+def remember_row(form_id, row):
+    """Cache a duplicate_query row; returns its entry id, or None without a row"""
+    if row is None:
+        return None
+    recent_keys.set((form_id, row.key), (row.entry_id, row.expires_at))
+    return row.entry_id
+
+def find_duplicate(form_id, keys, now):
+    """Get the id of the entry holding any of keys, or None"""
+    cached = cached_duplicate(form_id, keys, now)
+    if cached is not None:
+        return cached
+    return remember_row(form_id, db.session.execute(duplicate_query(form_id, keys, now)).first())
+
+def claim_statements(dialect_name, form_id, keys, entry_id, now):
+    """Statements claiming keys for a new entry: [(key, statement)] after one deleting expired copies
+
+    On SQLite and PostgreSQL a key that is already held inserts no row;
+    other dialects raise IntegrityError instead.
+    """
+    statements = [(None, db.delete(SubmissionKey).where(
+        SubmissionKey.form_id == form_id,
+        SubmissionKey.key.in_([key for key, expires_at in keys]),
+        SubmissionKey.expires_at <= now
+    ))]
+    insert = INSERT_DIALECTS.get(dialect_name)
+    for key, expires_at in keys:
+        values = {'form_id': form_id, 'key': key, 'entry_id': entry_id, 'created_at': now, 'expires_at': expires_at}
+        if insert is None:
+            statements.append((key, db.insert(SubmissionKey).values(**values)))
+        else:
+            statements.append((key, insert(SubmissionKey).values(**values).on_conflict_do_nothing(
+                index_elements=['form_id', 'key'])))
+    return statements
+
+def holder_query(form_id, key):
+    """SELECT the id of the entry holding a key"""
+    return db.select(SubmissionKey.entry_id).where(SubmissionKey.form_id == form_id, SubmissionKey.key == key)
+
+def claim_keys(form_id, keys, entry_id, now):
+    """Insert keys for a new entry in the current transaction
+
+    Returns None when every key was claimed, otherwise the id of the entry
+    already holding one of them; the caller should then roll the entry back.
+    """
+    dialect_name = db.session.get_bind().dialect.name
+    for key, statement in claim_statements(dialect_name, form_id, keys, entry_id, now):
+        result = db.session.execute(statement)
+        if key is not None and result.rowcount == 0:
+            return db.session.execute(holder_query(form_id, key)).scalar()
+    return None
+
+def remember_keys(form_id, keys, entry_id):
+    """Cache committed keys for fast replays"""
+    for key, expires_at in keys:
+        recent_keys.set((form_id, key), (entry_id, expires_at))
+
+def prune_submission_keys(now=None):
+    """Delete expired keys; returns the number deleted"""
+    deleted = SubmissionKey.query.filter(SubmissionKey.expires_at <= (now or datetime.utcnow())) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
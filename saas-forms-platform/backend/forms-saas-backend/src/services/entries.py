@@ -0,0 +1,236 @@
+from flask import current_app
+from src.models.form import db, FormEntry, EntryValue, to_number
+from src.models.archive import ArchivedEntry
+from src.models.backfill import Backfill
+from datetime import datetime
+import heapq
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+FIELD_FILTER_PREFIX = 'field.'
+
+# (database URL, backfill name) pairs known to be complete
+_complete_backfills = set()
+
+def newest_first(query, model=FormEntry):
+    """Order an entries query newest first with id as tie-breaker
+
+    Entries without a submitted_at (imported ones, say) come last on every
+    database, which SQLite does anyway for a descending column.
+    """
+    return query.order_by(model.submitted_at.desc().nulls_last(), model.id.desc())
+
+def after_cursor(query, submitted_at, entry_id, model=FormEntry):
+    """Restrict a newest-first entries query to rows past the given cursor"""
+    if submitted_at is None:
+        return query.filter(model.submitted_at.is_(None), model.id < entry_id)
+    return query.filter(db.or_(
+        model.submitted_at < submitted_at,
+        db.and_(model.submitted_at == submitted_at, model.id < entry_id),
+        model.submitted_at.is_(None)
+    ))
+
+def entry_order(entry):
+    """Sort key matching newest_first, for merging the hot and archived tiers"""
+    return entry.submitted_at is not None, entry.submitted_at or datetime.min, entry.id
+
+def entry_tiers(args):
+    """Entry models a request reads: archived entries only with include_archived=true"""
+    if args.get('include_archived') == 'true':
+        return [FormEntry, ArchivedEntry]
+    return [FormEntry]
+
+def encode_cursor(entry):
+    """Build the opaque `after` cursor pointing at an entry"""
+    return f"{entry.submitted_at.isoformat() if entry.submitted_at else ''},{entry.id}"
+
+def parse_cursor(value):
+    """Parse an `after` cursor into (submitted_at, id); submitted_at is None past the entries without one"""
+    try:
+        submitted_at, entry_id = value.rsplit(',', 1)
+        return datetime.fromisoformat(submitted_at) if submitted_at else None, int(entry_id)
+    except ValueError:
+        raise ValueError(f'Invalid cursor: {value}')
+
+def parse_datetime(value, name):
+    """Parse an ISO 8601 query parameter"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid {name}: {value}')
+
+def filter_entries(query, args, model=FormEntry):
+    """Apply date-range and field-value filters from request args"""
+    if args.get('submitted_after'):
+        query = query.filter(model.submitted_at >= parse_datetime(args['submitted_after'], 'submitted_after'))
+    if args.get('submitted_before'):
+        query = query.filter(model.submitted_at < parse_datetime(args['submitted_before'], 'submitted_before'))
+    
+    for key, value in args.items():
+        if key.startswith(FIELD_FILTER_PREFIX):
+            if model is not FormEntry:
+                # Archived data is compressed, so it cannot be matched in SQL
+                raise ValueError('Field filters cannot be combined with include_archived')
+            query = filter_field_value(query, key[len(FIELD_FILTER_PREFIX):], value)
+    
+    return query
+
+def filter_field_value(query, field_name, value):
+    """Keep entries whose field equals value
+
+    Uses the indexed entry_values table when it is maintained and holds
+    every entry, otherwise falls back to extracting the field from the
+    JSON data column.
+    """
+    number = to_number(value)
+    if not entry_values_enabled() or not entry_values_backfilled():
+        field = db.type_coerce(FormEntry.data, db.JSON)[field_name]
+        matches = field.as_string() == value
+        if number is not None:
+            matches = db.or_(matches, field.as_float() == number)
+        return query.filter(matches)
+    
+    matches = EntryValue.value_text == value
+    if number is not None:
+        matches = db.or_(matches, EntryValue.value_num == number)
+    
+    matching_ids = db.select(EntryValue.entry_id).where(
+        EntryValue.form_id == FormEntry.form_id,
+        EntryValue.field_name == field_name,
+        matches
+    )
+    return query.filter(FormEntry.id.in_(matching_ids))
+
+def entry_values_enabled():
+    return current_app.config.get('ENTRY_VALUES_ENABLED', True)
+
+def backfill_complete(name):
+    """True once the named backfill (see BACKFILLS in src/models/schema.py) has gone through every row"""
+    key = (db.engine.url, name)
+    if key in _complete_backfills:
+        return True
+    backfill = db.session.get(Backfill, name)
+    if backfill is not None and not backfill.complete:
+        return False
+    _complete_backfills.add(key)
+    return True
+
+def entry_values_backfilled():
+    """True once entries that predate entry_values have been indexed into it"""
+    return backfill_complete('entry_values')
+
+@db.event.listens_for(db.session, 'do_orm_execute')
+def load_legacy_clients(state):
+    """Load the inline client details of entries not yet moved to the lookup tables
+
+    Until `flask forms upgrade-schema` has interned them, entries of an
+    older database keep ip_address/user_agent in their own columns only.
+    """
+    if not state.is_select or not any(
+        description['type'] is FormEntry for description in state.statement.column_descriptions
+    ):
+        return
+    if backfill_complete('entry_clients'):
+        return
+    state.statement = state.statement.options(
+        db.with_expression(FormEntry.legacy_ip_address, db.literal_column('form_entries.ip_address')),
+        db.with_expression(FormEntry.legacy_user_agent, db.literal_column('form_entries.user_agent'))
+    )
+
+def index_entry_values(entries):
+    """Write entry_values rows for flushed entries in one executemany"""
+    if not entry_values_enabled():
+        return
+    
+    rows = []
+    for entry in entries:
+        rows.extend(EntryValue.rows_for(entry.id, entry.form_id, entry.get_data()))
+    if rows:
+        db.session.execute(db.insert(EntryValue), rows)
+
+def backfill_entry_values(batch_size=DEFAULT_BATCH_SIZE):
+    """Index entries that have no entry_values rows yet; returns the number indexed"""
+    indexed = 0
+    last_id = 0
+    
+    while True:
+        batch = FormEntry.query.filter(
+            FormEntry.id > last_id,
+            ~db.exists().where(EntryValue.entry_id == FormEntry.id)
+        ).order_by(FormEntry.id).limit(batch_size).all()
+        if not batch:
+            db.session.merge(Backfill(name='entry_values', complete=True))
+            db.session.commit()
+            return indexed
+        
+        rows = []
+        for entry in batch:
+            rows.extend(EntryValue.rows_for(entry.id, entry.form_id, entry.get_data()))
+        if rows:
+            db.session.execute(db.insert(EntryValue), rows)
+        db.session.commit()
+        
+        indexed += len(batch)
+        last_id = batch[-1].id
+        db.session.expunge_all()
+
+def page_entries(form_id, args):
+    """Get one keyset page of a form's entries
+
+    Returns the entries, the cursor for the next page (or None) and the
+    filtered total when `count=true` was requested. With
+    `include_archived=true` the page merges both tiers; ids are unique
+    across them, so the same cursor works for either.
+    """
+    limit = min(max(args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    cursor = parse_cursor(args['after']) if args.get('after') else None
+    counting = args.get('count') == 'true'
+    
+    entries = []
+    total = 0 if counting else None
+    tiers = entry_tiers(args)
+    for model in tiers:
+        query = filter_entries(model.query.filter_by(form_id=form_id), args, model)
+        if counting:
+            total += query.order_by(None).count()
+        if cursor is not None:
+            query = after_cursor(query, *cursor, model=model)
+        
+        # Fetch one extra row to know whether another page exists
+        entries.extend(newest_first(query, model).limit(limit + 1).all())
+    
+    if len(tiers) > 1:
+        entries = sorted(entries, key=entry_order, reverse=True)[:limit + 1]
+    next_cursor = encode_cursor(entries[limit - 1]) if len(entries) > limit else None
+    
+    return entries[:limit], next_cursor, total
+
+def iter_entries(form_id, batch_size=DEFAULT_BATCH_SIZE, include_archived=False):
+    """Yield a form's entries newest first, loading one keyset page at a time"""
+    if include_archived:
+        yield from heapq.merge(
+            iter_tier(FormEntry, form_id, batch_size),
+            iter_tier(ArchivedEntry, form_id, batch_size),
+            key=entry_order, reverse=True
+        )
+    else:
+        yield from iter_tier(FormEntry, form_id, batch_size)
+
+def iter_tier(model, form_id, batch_size):
+    base = model.query.filter_by(form_id=form_id)
+    cursor = None
+    
+    while True:
+        query = base if cursor is None else after_cursor(base, *cursor, model=model)
+        batch = newest_first(query, model).limit(batch_size).all()
+        if not batch:
+            return
+        
+        yield from batch
+        
+        last = batch[-1]
+        cursor = (last.submitted_at, last.id)
+        # Detach the page so the session does not grow with the export;
+        # loaded rows stay readable while the other tier's pages are merged
+        db.session.expunge_all()
@@ -0,0 +1,99 @@
+import csv
+import io
+import zlib
+
+from src.models.types import dumps
+from src.services.entries import iter_entries
+
+BASE_COLUMNS = ['ID', 'Submitted At', 'IP Address']
+# Data keys that are not columns, e.g. of fields since removed, as JSON
+EXTRA_COLUMN = 'Other Fields'
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+def export_fieldnames(form, include_archived=False):
+    """Get the data columns for an export
+
+    Uses the form's field definitions; forms without fields fall back to the
+    union of keys over all stored entries.
+    """
+    names = [field.get('name') for field in form.get_fields() if field.get('name')]
+    if names:
+        return list(dict.fromkeys(names))
+    
+    seen = {}
+    for entry in iter_entries(form.id, include_archived=include_archived):
+        seen.update(dict.fromkeys(entry.get_data()))
+    return list(seen)
+
+def format_value(value):
+    """Flatten list values (checkboxes) the way the WordPress export does"""
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value)
+    return value
+
+def generate_csv(form, entries=None, include_archived=False):
+    """Yield CSV chunks for all entries of a form"""
+    data_columns = [
+        name for name in export_fieldnames(form, include_archived) if name not in BASE_COLUMNS + [EXTRA_COLUMN]
+    ]
+    columns = set(data_columns)
+    
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=BASE_COLUMNS + data_columns + [EXTRA_COLUMN])
+    writer.writeheader()
+    
+    if entries is None:
+        entries = iter_entries(form.id, include_archived=include_archived)
+    for entry in entries:
+        data = entry.get_data()
+        row = {key: format_value(value) for key, value in data.items() if key in columns}
+        extra = {key: value for key, value in data.items() if key not in columns}
+        row.update({
+            EXTRA_COLUMN: dumps(extra) if extra else '',
+            'ID': entry.id,
+            'Submitted At': entry.submitted_at.strftime('%Y-%m-%d %H:%M:%S') if entry.submitted_at else '',
+            'IP Address': entry.ip_address or ''
+        })
+        writer.writerow(row)
+        
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    yield buffer.getvalue()
+
+def generate_ndjson(form, entries=None, include_archived=False):
+    """Yield one JSON document per entry"""
+    if entries is None:
+        entries = iter_entries(form.id, include_archived=include_archived)
+    for entry in entries:
+        yield dumps(entry.to_dict()) + '\n'
+
+def gzip_chunks(chunks):
+    """Compress a stream of text chunks into a gzip stream"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def generate_export(form, export_format='csv', compress=False, entries=None, include_archived=False):
+    """Get the chunk generator, mimetype and filename for an export
+
+    `entries` replaces the default newest-first iteration over the form's
+    entries, e.g. to report progress while exporting. `include_archived`
+    adds entries moved to the archive tier.
+    """
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    generator = generate_csv if export_format == 'csv' else generate_ndjson
+    chunks = generator(form, entries, include_archived)
+    filename = f'form_{form.id}_entries.{extension}'
+    
+    if compress:
+        return gzip_chunks(chunks), 'application/gzip', filename + '.gz'
+    return chunks, mimetype, filename
@@ -0,0 +1,100 @@
+from collections import namedtuple
+from datetime import datetime
+import threading
+import time
+
+from src.models.form import db, Form
+from src.services.cache import LRUCache
+from src.services.validation import compile_validator
+
+FormMeta = namedtuple('FormMeta', ['id', 'is_active', 'fields', 'settings', 'version', 'validate'])
+META_COLUMNS = (Form.id, Form.is_active, Form.fields, Form.settings, Form.updated_at)
+
+class FormMetadataCache:
+    """In-process cache of the form metadata needed on the submit path
+
+    Besides the active flag, fields and settings, each entry carries the
+    submission validator compiled from that version of the form's fields.
+
+    Entries expire after `ttl` seconds and are dropped explicitly when a
+    form changes in this process. Changes made by other workers are picked
+    up by polling `forms.updated_at` at most every `poll_interval` seconds.
+    Missing forms are cached too, so probing unknown ids stays cheap.
+    """
+    
+    def __init__(self, ttl=30, poll_interval=2, maxsize=10000):
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self._cache = LRUCache(maxsize=maxsize)
+        self._listeners = []
+        self._poll_lock = threading.Lock()
+        self._last_poll = 0.0
+        self._high_water = None
+        self._seen_at_mark = set()
+    
+    def add_listener(self, callback):
+        """Call `callback(form_id)` whenever a form is invalidated"""
+        self._listeners.append(callback)
+    
+    def invalidate(self, form_id):
+        self._cache.pop(form_id)
+        for callback in self._listeners:
+            callback(form_id)
+    
+    def clear(self):
+        self._cache.clear()
+    
+    def get(self, form_id):
+        """Get a form's metadata, or None when the form does not exist"""
+        self.poll_changes()
+        
+        found, meta = self.lookup(form_id)
+        if found:
+            return meta
+        
+        row = db.session.query(*META_COLUMNS).filter(Form.id == form_id).first()
+        return self.store(form_id, row)
+    
+    def lookup(self, form_id):
+        """Get (found, metadata) from the cache alone, without querying"""
+        cached = self._cache.get(form_id)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return True, cached[0]
+        return False, None
+    
+    def store(self, form_id, row):
+        """Cache metadata built from a META_COLUMNS row (None for a missing form)"""
+        meta = None
+        if row is not None:
+            fields = row.fields or []
+            meta = FormMeta(row.id, bool(row.is_active), fields, row.settings or {}, row.updated_at, compile_validator(fields))
+        
+        self._cache.set(form_id, (meta, time.monotonic()))
+        return meta
+    
+    def poll_changes(self):
+        """Invalidate forms that any worker changed since the last poll"""
+        now = time.monotonic()
+        if now - self._last_poll < self.poll_interval or not self._poll_lock.acquire(blocking=False):
+            return
+        
+        try:
+            self._last_poll = now
+            if self._high_water is None:
+                # Nothing is cached yet that could be stale; just set the mark
+                self._high_water = db.session.query(db.func.max(Form.updated_at)).scalar() or datetime.min
+                return
+            
+            changed = db.session.query(Form.id, Form.updated_at) \
+                .filter(Form.updated_at >= self._high_water).all()
+            for form_id, updated_at in changed:
+                if updated_at == self._high_water and form_id in self._seen_at_mark:
+                    continue
+                self.invalidate(form_id)
+                if updated_at > self._high_water:
+                    self._high_water = updated_at
+                    self._seen_at_mark = set()
+                if updated_at == self._high_water:
+                    self._seen_at_mark.add(form_id)
+        finally:
+            self._poll_lock.release()
@@ -0,0 +1,73 @@
+from sqlalchemy.orm import load_only
+
+from src.models.form import db, Form, FORM_DICT_FIELDS
+from src.services.entries import MAX_PAGE_SIZE, parse_cursor
+
+LIST_FIELDS = tuple(FORM_DICT_FIELDS) + ('entry_count',)
+
+def parse_fields(value):
+    """Parse a `fields` sparse-fieldset parameter; None selects every field"""
+    if not value:
+        return None
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def newest_first(query):
+    return query.order_by(Form.created_at.desc(), Form.id.desc())
+
+def after_cursor(query, created_at, form_id):
+    return query.filter(db.or_(
+        Form.created_at < created_at,
+        db.and_(Form.created_at == created_at, Form.id < form_id)
+    ))
+
+def encode_cursor(form):
+    return f'{form.created_at.isoformat()},{form.id}'
+
+def list_forms(args):
+    """Get active forms newest first for the forms list
+
+    Supports `fields` (sparse fieldset; other columns are not loaded),
+    `q` (case-insensitive name search), `count=true` for the filtered
+    total, and keyset pagination through `limit` and `after`. Without
+    `limit` every matching form is returned. Returns ((form, entry_count)
+    pairs, fields, next cursor, total).
+    """
+    fields = parse_fields(args.get('fields'))
+    with_counts = fields is None or 'entry_count' in fields
+    
+    criteria = [Form.is_active.is_(True)]
+    if args.get('q'):
+        criteria.append(Form.name.icontains(args['q'], autoescape=True))
+    
+    total = db.session.query(db.func.count(Form.id)).filter(*criteria).scalar() \
+        if args.get('count') == 'true' else None
+    
+    query = Form.with_entry_counts() if with_counts else db.session.query(Form)
+    query = query.filter(*criteria)
+    
+    if fields is not None:
+        # id and created_at are always needed for the cursor
+        columns = {'id', 'created_at'} | (set(fields) & set(FORM_DICT_FIELDS))
+        query = query.options(load_only(*[getattr(Form, name) for name in columns]))
+    
+    if args.get('after'):
+        query = after_cursor(query, *parse_cursor(args['after']))
+    query = newest_first(query)
+    
+    limit = args.get('limit', type=int)
+    if limit is None:
+        rows = query.all()
+        return normalize(rows, with_counts), fields, None, total
+    
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    # Fetch one extra row to know whether another page exists
+    rows = normalize(query.limit(limit + 1).all(), with_counts)
+    next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return rows[:limit], fields, next_cursor, total
+
+def normalize(rows, with_counts):
+    return [tuple(row) for row in rows] if with_counts else [(form, None) for form in rows]
@@ -0,0 +1,253 @@
+import atexit
+from collections import Counter
+from datetime import datetime
+import queue
+import threading
+import time
+
+from src.models.form import db, FormEntry
+from src.services.dedup import claim_keys, remember_keys
+from src.services.entries import index_entry_values
+from src.services.lookups import intern_clients
+from src.services.stats import record_entries
+from src.services.workers import is_reloader_parent
+
+class QueueFull(Exception):
+    """Raised when the submission queue cannot take more work"""
+
+class PendingSubmission:
+    """A queued submission the request thread waits on until it is committed"""
+    
+    __slots__ = ('form_id', 'data', 'ip_address', 'user_agent', 'fields', 'keys', 'submitted_at',
+                 'done', 'entry_id', 'duplicate', 'error')
+    
+    def __init__(self, form_id, data, ip_address, user_agent, fields=None, keys=None):
+        self.form_id = form_id
+        self.data = data
+        self.fields = fields or []
+        self.ip_address = ip_address
+        self.user_agent = user_agent
+        # Dedup keys from src.services.dedup.submission_keys
+        self.keys = keys or []
+        self.submitted_at = None
+        self.done = threading.Event()
+        self.entry_id = None
+        # Set when the submission replayed an earlier one; entry_id is then that entry
+        self.duplicate = False
+        self.error = None
+
+class SubmissionQueue:
+    """Bounded in-process queue flushed to the database in group commits
+
+    A single writer thread collects up to `batch_size` submissions, or
+    whatever arrived within `flush_interval` seconds of the first one, and
+    inserts them in one transaction.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, app, maxsize=10000, batch_size=200, flush_interval=0.05):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._closed = False
+        self._lock = threading.Lock()
+        # (form_id, key) of dedup keys -> number of their submissions still queued
+        self._queued_keys = Counter()
+        self._stats = {
+            'enqueued': 0,
+            'committed': 0,
+            'rejected': 0,
+            'failed': 0,
+            'duplicates': 0,
+            'batches': 0,
+            'last_batch_size': 0,
+            'last_flush_seconds': 0.0,
+        }
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=30):
+        """Stop accepting work and wait for queued submissions to be written"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+    
+    def submit(self, form_id, data, ip_address, user_agent, fields=None, keys=None):
+        """Queue a submission; raises QueueFull when the queue is at capacity"""
+        if self._closed:
+            raise QueueFull()
+        
+        pending = PendingSubmission(form_id, data, ip_address, user_agent, fields, keys)
+        # Record the keys first: the writer may flush the submission, and
+        # release its keys, before put_nowait returns
+        self._hold_keys([pending])
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            self._release_keys([pending])
+            self._count('rejected')
+            raise QueueFull()
+        self._count('enqueued')
+        return pending
+    
+    def is_queued(self, form_id, key):
+        """True while a submission holding this dedup key waits to be written"""
+        with self._lock:
+            return (form_id, key) in self._queued_keys
+    
+    def _hold_keys(self, batch):
+        with self._lock:
+            self._queued_keys.update((pending.form_id, key) for pending in batch for key, expires_at in pending.keys)
+    
+    def _release_keys(self, batch):
+        with self._lock:
+            for queued_key in ((pending.form_id, key) for pending in batch for key, expires_at in pending.keys):
+                self._queued_keys[queued_key] -= 1
+                if self._queued_keys[queued_key] <= 0:
+                    del self._queued_keys[queued_key]
+    
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['depth'] = self._queue.qsize()
+        return stats
+    
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+    
+    def _next_batch(self):
+        """Block for the first submission, then gather the rest of a batch"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        
+        while len(batch) < self.batch_size and batch[-1] is not self._STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._next_batch()
+                stopping = batch[-1] is self._STOP
+                if stopping:
+                    batch.pop()
+                
+                if batch:
+                    self._flush(batch)
+                if stopping:
+                    return
+    
+    def _claim_keys(self, batch, entries):
+        """Claim the batch's dedup keys; returns the (pending, entry) pairs to keep
+
+        Entries whose key is already held, by an earlier submission or one
+        earlier in this batch, are removed again and answered as duplicates.
+        Each entry claims its keys in a savepoint, so a conflict on its second
+        key also releases the first.
+        """
+        now = datetime.utcnow()
+        written = []
+        for pending, entry in zip(batch, entries):
+            if not pending.keys:
+                written.append((pending, entry))
+                continue
+            
+            savepoint = db.session.begin_nested()
+            duplicate_id = claim_keys(pending.form_id, pending.keys, entry.id, now)
+            if duplicate_id is None:
+                savepoint.commit()
+                written.append((pending, entry))
+                continue
+            savepoint.rollback()
+            db.session.delete(entry)
+            pending.entry_id = duplicate_id
+            pending.duplicate = True
+        if len(written) < len(entries):
+            db.session.flush()
+        return written
+    
+    def _flush(self, batch):
+        started = time.perf_counter()
+        try:
+            self._write(batch)
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                batch[0].error = e
+                self._count('failed')
+            else:
+                # Write the submissions one by one, so only the one at fault fails
+                for pending in batch:
+                    try:
+                        self._write([pending])
+                    except Exception as e:
+                        db.session.rollback()
+                        pending.error = e
+                        self._count('failed')
+        finally:
+            db.session.remove()
+            self._release_keys(batch)
+            for pending in batch:
+                pending.done.set()
+        
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['last_batch_size'] = len(batch)
+            self._stats['last_flush_seconds'] = time.perf_counter() - started
+    
+    def _write(self, batch):
+        """Insert a batch of submissions and commit them in one transaction"""
+        clients = intern_clients([
+            {'ip_address': pending.ip_address, 'user_agent': pending.user_agent} for pending in batch
+        ])
+        entries = []
+        for pending, client in zip(batch, clients):
+            # A retried submission may have been answered by a rolled-back entry
+            pending.entry_id = None
+            pending.duplicate = False
+            entry = FormEntry(form_id=pending.form_id, **client)
+            entry.set_data(pending.data)
+            entries.append(entry)
+        
+        db.session.add_all(entries)
+        db.session.flush()
+        written = self._claim_keys(batch, entries)
+        written_entries = [entry for pending, entry in written]
+        index_entry_values(written_entries)
+        record_entries(written_entries, {pending.form_id: pending.fields for pending in batch})
+        db.session.commit()
+        for pending, entry in written:
+            pending.entry_id = entry.id
+            pending.submitted_at = entry.submitted_at
+            remember_keys(pending.form_id, pending.keys, entry.id)
+        self._count('committed', len(written))
+        self._count('duplicates', len(batch) - len(written))
+
+def init_submission_queue(app):
+    """Start the batched writer when SUBMISSION_QUEUE_ENABLED is set"""
+    if not app.config.get('SUBMISSION_QUEUE_ENABLED') or is_reloader_parent(app):
+        return None
+    
+    submission_queue = SubmissionQueue(
+        app,
+        maxsize=app.config.get('SUBMISSION_QUEUE_SIZE', 10000),
+        batch_size=app.config.get('SUBMISSION_BATCH_SIZE', 200),
+        flush_interval=app.config.get('SUBMISSION_FLUSH_INTERVAL', 0.05)
+    )
+    submission_queue.start()
+    atexit.register(submission_queue.stop)
+    app.extensions['submission_queue'] = submission_queue
+    return submission_queue
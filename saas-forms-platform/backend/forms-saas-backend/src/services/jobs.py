@@ -0,0 +1,404 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+
+from flask import current_app
+
+from src.models.engine import DEFAULT_SQLITE_PATH
+from src.models.form import db, Form, FormEntry
+from src.models.archive import ArchivedEntry
+from src.models.job import Job
+from src.services.archive import archive_cutoffs, archive_form_entries
+from src.services.bulk import INSERT_CHUNK_SIZE, MAX_BULK_ENTRIES, insert_entries
+from src.services.dedup import prune_submission_keys
+from src.services.entries import backfill_entry_values, iter_entries
+from src.services.export import EXPORT_FORMATS, generate_export
+from src.services.form_cache import FormMetadataCache
+from src.services.stats import rebuild_form_stats
+from src.services.workers import is_reloader_parent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(DEFAULT_SQLITE_PATH), 'jobs')
+PROGRESS_INTERVAL = 0.5
+
+JobType = namedtuple('JobType', ['run', 'validate', 'restartable'])
+JOB_TYPES = {}
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+class JobInterrupted(Exception):
+    """Raised inside a job when the runner shuts down"""
+
+def job_type(name, validate=None, restartable=True):
+    """Register `run(context, params)` as the handler for a job type
+
+    `validate(params)` checks request parameters when the job is created,
+    raising ValueError, and returns the parameters to store. Jobs
+    interrupted by a shutdown are requeued only when `restartable`.
+    """
+    def register(run):
+        JOB_TYPES[name] = JobType(run, validate or (lambda params: params), restartable)
+        return run
+    return register
+
+class JobContext:
+    """Handed to job handlers for progress reporting and result files"""
+    
+    def __init__(self, runner, job_id):
+        self.runner = runner
+        self.job_id = job_id
+        self.result_file = None
+        self._last_progress = 0.0
+    
+    def progress(self, current, total=None, force=False):
+        """Record progress and stop the job if it was cancelled
+
+        Writes go through their own connection so the handler's session
+        and the objects it holds are left alone. Calls are throttled, so
+        handlers can report after every item.
+        """
+        if self.runner.stopping:
+            raise JobInterrupted()
+        now = time.monotonic()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        
+        values = {'progress': current, 'heartbeat_at': datetime.utcnow()}
+        if total is not None:
+            values['progress_total'] = total
+        with db.engine.begin() as conn:
+            conn.execute(db.update(Job).where(Job.id == self.job_id).values(**values))
+            cancelled = conn.execute(db.select(Job.cancel_requested).where(Job.id == self.job_id)).scalar()
+        if cancelled:
+            raise JobCancelled()
+    
+    def track(self, items, total=None):
+        """Yield items while reporting how many have been processed"""
+        self.progress(0, total, force=True)
+        count = 0
+        for item in items:
+            yield item
+            count += 1
+            self.progress(count)
+        self.progress(count, force=True)
+    
+    def open_result(self, filename, mimetype):
+        """Open the job's downloadable result file for binary writing"""
+        os.makedirs(self.runner.results_dir, exist_ok=True)
+        path = os.path.join(self.runner.results_dir, f'{self.job_id}-{filename}')
+        self.result_file = (path, filename, mimetype)
+        return open(path, 'wb')
+
+class JobRunner:
+    """Runs queued jobs from the jobs table on a thread pool
+
+    A dispatcher thread claims queued jobs oldest first with a conditional
+    UPDATE, so several processes can share one database, and never runs
+    more than `tenant_concurrency` jobs per tenant at once. It also keeps
+    the heartbeat of its running jobs fresh, fails jobs whose worker died
+    (no heartbeat for `stale_after` seconds) and deletes result files
+    `result_ttl` seconds after a job finished.
+    """
+    
+    def __init__(self, app, max_workers=4, tenant_concurrency=2, poll_interval=1.0,
+                 results_dir=DEFAULT_RESULTS_DIR, result_ttl=86400, stale_after=600):
+        self.app = app
+        self.max_workers = max_workers
+        self.tenant_concurrency = tenant_concurrency
+        self.poll_interval = poll_interval
+        self.results_dir = results_dir
+        self.result_ttl = result_ttl
+        self.stale_after = stale_after
+        self.stopping = False
+        self._running = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._executor = None
+        self._thread = None
+        self._last_maintenance = 0.0
+    
+    def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job-worker')
+        self._thread = threading.Thread(target=self._dispatch, name='job-dispatcher', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=30):
+        """Stop claiming jobs; running jobs are requeued at their next progress report"""
+        if self._thread is None:
+            return
+        self.stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+    
+    def wake(self):
+        self._wake.set()
+    
+    def _dispatch(self):
+        while not self.stopping:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self.stopping:
+                return
+            with self.app.app_context():
+                try:
+                    self._claim_jobs()
+                    if time.monotonic() - self._last_maintenance >= 60:
+                        self._last_maintenance = time.monotonic()
+                        self._maintain()
+                except Exception:
+                    logger.exception('Job dispatch failed')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+    
+    def _claim_jobs(self):
+        with self._lock:
+            free = self.max_workers - len(self._running)
+        if free <= 0:
+            return
+        
+        running = dict(db.session.query(Job.tenant, db.func.count(Job.id))
+                       .filter(Job.status == 'running').group_by(Job.tenant))
+        queued = db.session.query(Job.id, Job.tenant).filter(Job.status == 'queued') \
+            .order_by(Job.created_at).limit(free * 10).all()
+        db.session.commit()
+        
+        for job_id, tenant in queued:
+            if free <= 0:
+                break
+            if running.get(tenant, 0) >= self.tenant_concurrency:
+                continue
+            
+            now = datetime.utcnow()
+            claimed = db.session.query(Job).filter(Job.id == job_id, Job.status == 'queued').update(
+                {Job.status: 'running', Job.started_at: now, Job.heartbeat_at: now},
+                synchronize_session=False
+            )
+            db.session.commit()
+            if not claimed:
+                continue
+            
+            running[tenant] = running.get(tenant, 0) + 1
+            free -= 1
+            with self._lock:
+                self._running.add(job_id)
+            self._executor.submit(self._run, job_id)
+    
+    def _maintain(self):
+        now = datetime.utcnow()
+        with self._lock:
+            running = list(self._running)
+        if running:
+            db.session.query(Job).filter(Job.id.in_(running)).update(
+                {Job.heartbeat_at: now}, synchronize_session=False)
+        
+        stale = Job.query.filter(Job.status == 'running', Job.heartbeat_at < now - timedelta(seconds=self.stale_after))
+        if running:
+            stale = stale.filter(Job.id.notin_(running))
+        stale.update({Job.status: 'failed', Job.error: 'Worker stopped responding', Job.finished_at: now},
+                     synchronize_session=False)
+        
+        expired = Job.query.filter(Job.result_path.isnot(None),
+                                   Job.finished_at < now - timedelta(seconds=self.result_ttl)).all()
+        for job in expired:
+            remove_file(job.result_path)
+            job.result_path = None
+        db.session.commit()
+    
+    def _run(self, job_id):
+        with self.app.app_context():
+            context = JobContext(self, job_id)
+            handler = None
+            values = {}
+            try:
+                job = db.session.get(Job, job_id)
+                handler = JOB_TYPES[job.type]
+                params = job.params or {}
+                db.session.commit()
+                
+                result = handler.run(context, params)
+                values = {'status': 'succeeded', 'result': result}
+                if context.result_file is not None:
+                    values.update(zip(('result_path', 'result_name', 'result_mimetype'), context.result_file))
+            except JobCancelled:
+                values = {'status': 'cancelled'}
+            except JobInterrupted:
+                if handler.restartable:
+                    values = {'status': 'queued', 'progress': 0, 'started_at': None}
+                else:
+                    values = {'status': 'failed', 'error': 'Interrupted by shutdown'}
+            except Exception as e:
+                logger.exception('Job %s failed', job_id)
+                values = {'status': 'failed', 'error': str(e)}
+            finally:
+                db.session.rollback()
+                if values.get('status') != 'succeeded' and context.result_file is not None:
+                    remove_file(context.result_file[0])
+                if values.get('status') != 'queued':
+                    values['finished_at'] = datetime.utcnow()
+                try:
+                    db.session.query(Job).filter(Job.id == job_id).update(
+                        {getattr(Job, key): value for key, value in values.items()}, synchronize_session=False)
+                    db.session.commit()
+                finally:
+                    db.session.remove()
+                    with self._lock:
+                        self._running.discard(job_id)
+                    self.wake()
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def create_job(job_type_name, params, tenant='default'):
+    """Validate and queue a job; raises ValueError for bad input"""
+    handler = JOB_TYPES.get(job_type_name)
+    if handler is None:
+        raise ValueError(f'Unknown job type: {job_type_name}')
+    if not isinstance(params, dict):
+        raise ValueError('params must be an object')
+    
+    job = Job(id=uuid.uuid4().hex, type=job_type_name, tenant=tenant, params=handler.validate(params))
+    db.session.add(job)
+    db.session.commit()
+    
+    runner = current_app.extensions.get('job_runner')
+    if runner is not None:
+        runner.wake()
+    return job
+
+def cancel_job(job):
+    """Cancel a queued job now, or ask a running job to stop"""
+    if job.status == 'queued':
+        cancelled = Job.query.filter(Job.id == job.id, Job.status == 'queued').update(
+            {Job.status: 'cancelled', Job.finished_at: datetime.utcnow()}, synchronize_session=False)
+        if cancelled:
+            db.session.commit()
+            return
+    if job.status in ('queued', 'running'):
+        job.cancel_requested = True
+    db.session.commit()
+
+def require_form(params):
+    form_id = params.get('form_id')
+    if not isinstance(form_id, int) or db.session.get(Form, form_id) is None:
+        raise ValueError('form_id must be the id of an existing form')
+    return form_id
+
+def validate_export(params):
+    export_format = params.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Unsupported export format: {export_format}')
+    return {
+        'form_id': require_form(params),
+        'format': export_format,
+        'compress': bool(params.get('compress')),
+        'include_archived': bool(params.get('include_archived'))
+    }
+
+@job_type('export', validate=validate_export)
+def run_export(context, params):
+    """Write a form's entries export to the job's result file"""
+    form = db.session.get(Form, params['form_id'])
+    include_archived = params.get('include_archived', False)
+    total = FormEntry.query.filter_by(form_id=form.id).count()
+    if include_archived:
+        total += ArchivedEntry.query.filter_by(form_id=form.id).count()
+    entries = context.track(iter_entries(form.id, include_archived=include_archived), total)
+    chunks, mimetype, filename = generate_export(form, params['format'], params['compress'],
+                                                 entries=entries, include_archived=include_archived)
+    
+    with context.open_result(filename, mimetype) as output:
+        for chunk in chunks:
+            output.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    return {'entries': total}
+
+def validate_rebuild_stats(params):
+    form_id = params.get('form_id')
+    return {'form_id': None if form_id is None else require_form(params)}
+
+@job_type('rebuild_stats', validate=validate_rebuild_stats)
+def run_rebuild_stats(context, params):
+    """Recompute submission rollups for one form or all forms"""
+    query = Form.query if params['form_id'] is None else Form.query.filter_by(id=params['form_id'])
+    form_ids = [row.id for row in query.with_entities(Form.id)]
+    for form_id in context.track(form_ids, len(form_ids)):
+        rebuild_form_stats(db.session.get(Form, form_id))
+    return {'forms': len(form_ids)}
+
+@job_type('backfill_entry_values')
+def run_backfill_entry_values(context, params):
+    """Index existing entries into the entry_values table"""
+    context.progress(0, force=True)
+    return {'entries': backfill_entry_values()}
+
+@job_type('archive_entries')
+def run_archive_entries(context, params):
+    """Move entries past their form's archive_after_days into the archive"""
+    cutoffs = archive_cutoffs()
+    moved = 0
+    for form_id, cutoff in context.track(cutoffs, len(cutoffs)):
+        moved += archive_form_entries(form_id, cutoff)
+    return {'forms': len(cutoffs), 'entries': moved}
+
+@job_type('prune_submission_keys')
+def run_prune_submission_keys(context, params):
+    """Delete expired idempotency and content dedup keys"""
+    context.progress(0, force=True)
+    return {'deleted': prune_submission_keys()}
+
+def validate_import_entries(params):
+    entries = params.get('entries')
+    if not isinstance(entries, list) or not entries:
+        raise ValueError('entries must be a non-empty list')
+    if len(entries) > MAX_BULK_ENTRIES:
+        raise ValueError(f'At most {MAX_BULK_ENTRIES} entries per job')
+    return {'form_id': require_form(params), 'entries': entries, 'validate': params.get('validate', True) is not False}
+
+@job_type('import_entries', validate=validate_import_entries, restartable=False)
+def run_import_entries(context, params):
+    """Insert entries in chunks, one transaction per chunk
+
+    Chunks already committed stay when the job is cancelled or fails.
+    """
+    form = FormMetadataCache().get(params['form_id'])
+    items = params['entries']
+    context.progress(0, len(items), force=True)
+    
+    imported = 0
+    errors = []
+    for start in range(0, len(items), INSERT_CHUNK_SIZE):
+        result = insert_entries(form, items[start:start + INSERT_CHUNK_SIZE], validate=params['validate'])
+        imported += len(result.ids)
+        errors.extend(dict(error, index=error['index'] + start) for error in result.errors)
+        context.progress(min(start + INSERT_CHUNK_SIZE, len(items)))
+    return {'imported': imported, 'errors': errors}
+
+def init_job_runner(app):
+    """Start the job runner unless JOBS_ENABLED is off"""
+    if not app.config.get('JOBS_ENABLED', True) or is_reloader_parent(app):
+        return None
+    
+    runner = JobRunner(
+        app,
+        max_workers=app.config.get('JOB_WORKERS', 4),
+        tenant_concurrency=app.config.get('JOB_TENANT_CONCURRENCY', 2),
+        results_dir=app.config.get('JOB_RESULTS_DIR', DEFAULT_RESULTS_DIR),
+        result_ttl=app.config.get('JOB_RESULT_TTL', 86400)
+    )
+    runner.start()
+    atexit.register(runner.stop)
+    app.extensions['job_runner'] = runner
+    return runner
@@ -0,0 +1,80 @@
+from src.models.form import db
+from src.models.lookup import IPAddress, UserAgent, resolve_ids
+from src.services.cache import LRUCache
+
+DEFAULT_CACHE_SIZE = 8192
+
+class Interner:
+    """Resolves strings to lookup-table ids, remembering them in an LRU
+
+    Entries repeat the same few thousand IP addresses and user agents, so
+    the submit path almost always resolves them from memory. Misses insert
+    the row in a short transaction of their own: an id is only cached once
+    its row is committed, whatever happens to the caller's transaction.
+    """
+    
+    def __init__(self, model, maxsize=DEFAULT_CACHE_SIZE):
+        self.model = model
+        self.cache = LRUCache(maxsize)
+    
+    def ids_for(self, values):
+        """Map each non-None value to its id"""
+        ids = {}
+        missing = []
+        for value in set(values):
+            if value is None:
+                continue
+            value_id = self.cache.get(value)
+            if value_id is None:
+                missing.append(value)
+            else:
+                ids[value] = value_id
+        
+        if missing:
+            with db.engine.begin() as conn:
+                resolved = resolve_ids(conn, self.model, missing)
+            for value, value_id in resolved.items():
+                self.cache.set(value, value_id)
+            ids.update(resolved)
+        return ids
+    
+    def id_for(self, value):
+        if value is None:
+            return None
+        return self.ids_for([value])[value]
+    
+    def clear(self):
+        self.cache.clear()
+
+ip_addresses = Interner(IPAddress)
+user_agents = Interner(UserAgent)
+
+def client_ids(ip_address, user_agent):
+    """FormEntry columns for a client's IP address and user agent"""
+    return {
+        'ip_address_id': ip_addresses.id_for(ip_address),
+        'user_agent_id': user_agents.id_for(user_agent)
+    }
+
+def cached_client_ids(ip_address, user_agent):
+    """client_ids from the caches alone, or None when either value is not cached"""
+    ids = {}
+    for column, interner, value in (('ip_address_id', ip_addresses, ip_address),
+                                    ('user_agent_id', user_agents, user_agent)):
+        ids[column] = None if value is None else interner.cache.get(value)
+        if value is not None and ids[column] is None:
+            return None
+    return ids
+
+def intern_clients(rows):
+    """Replace ip_address/user_agent in insert mappings with their lookup ids
+
+    Resolves the distinct values of a whole batch with one round trip per
+    table at most.
+    """
+    ip_ids = ip_addresses.ids_for([row.get('ip_address') for row in rows])
+    agent_ids = user_agents.ids_for([row.get('user_agent') for row in rows])
+    for row in rows:
+        row['ip_address_id'] = ip_ids.get(row.pop('ip_address', None))
+        row['user_agent_id'] = agent_ids.get(row.pop('user_agent', None))
+    return rows
@@ -0,0 +1,239 @@
+from bisect import bisect_left
+from collections import Counter, defaultdict
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+
+from flask import Response, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+PROFILE_HEADER = 'X-Profile'
+SLOW_QUERY_BREAKDOWN = 10
+# Submission queue stats that only ever grow; the rest are point-in-time values
+QUEUE_COUNTERS = frozenset(['enqueued', 'committed', 'rejected', 'failed', 'duplicates', 'batches'])
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, per label set"""
+    
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series = {}
+    
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{format_labels(labels + (("le", str(bound)),))} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {total}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {cumulative}')
+        return lines
+
+class CounterMetric:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._series = Counter()
+    
+    def inc(self, labels, amount=1):
+        self._series[labels] += amount
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self._series.items()):
+            lines.append(f'{self.name}{format_labels(labels)} {value}')
+        return lines
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+class RequestMetrics:
+    """Per-endpoint request metrics collected with Flask request hooks
+
+    Records latency, response size and the number and time of SQL
+    statements for every request, keyed by URL rule rather than path so
+    the label set stays bounded. Statements are attributed to the request
+    running on the current thread; work done by background threads (such
+    as the submission writer) is not counted.
+
+    Requests slower than SLOW_REQUEST_SECONDS are logged with a per-statement
+    breakdown. With PROFILING_ENABLED set, a request carrying an
+    `X-Profile: cprofile` (or `pyinstrument`) header is profiled and the
+    report logged.
+    """
+    
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.requests = CounterMetric('http_requests_total', 'Requests by endpoint, method and status')
+        self.latency = Histogram('http_request_duration_seconds', 'Request latency', LATENCY_BUCKETS)
+        self.response_size = Histogram('http_response_size_bytes', 'Response body size', SIZE_BUCKETS)
+        self.query_count = Histogram('db_queries_per_request', 'SQL statements per request', QUERY_COUNT_BUCKETS)
+        self.query_time = Histogram('db_query_duration_seconds', 'SQL time per request', LATENCY_BUCKETS)
+        self.app = app
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        self.app = app
+        self.slow_threshold = app.config.get('SLOW_REQUEST_SECONDS', 1.0)
+        self.profiling = app.config.get('PROFILING_ENABLED', False)
+        
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.extensions['request_metrics'] = self
+    
+    def _before_request(self):
+        local = self._local
+        local.started = time.perf_counter()
+        local.queries = defaultdict(lambda: [0, 0.0])
+        local.profiler = self._start_profiler() if self.profiling else None
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'queries', None) is not None:
+            self._local.query_started = time.perf_counter()
+    
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        queries = getattr(self._local, 'queries', None)
+        if queries is None:
+            return
+        stats = queries[statement]
+        stats[0] += 1
+        stats[1] += time.perf_counter() - self._local.query_started
+    
+    def _after_request(self, response):
+        local = self._local
+        if getattr(local, 'queries', None) is None:
+            return response
+        
+        elapsed = time.perf_counter() - local.started
+        queries = local.queries
+        query_count = sum(stats[0] for stats in queries.values())
+        query_time = sum(stats[1] for stats in queries.values())
+        # Streamed bodies have no length up front and are left out
+        size = None if response.is_streamed else response.calculate_content_length()
+        
+        endpoint = (('endpoint', request.url_rule.rule if request.url_rule else 'unmatched'),
+                    ('method', request.method))
+        with self._lock:
+            self.requests.inc(endpoint + (('status', str(response.status_code)),))
+            self.latency.observe(endpoint, elapsed)
+            self.query_count.observe(endpoint, query_count)
+            self.query_time.observe(endpoint, query_time)
+            if size is not None:
+                self.response_size.observe(endpoint, size)
+        
+        if elapsed >= self.slow_threshold:
+            self._log_slow_request(elapsed, query_count, query_time, queries)
+        if local.profiler is not None:
+            self._stop_profiler(local.profiler)
+            local.profiler = None
+        
+        response.headers['Server-Timing'] = f'app;dur={elapsed * 1000:.1f}, db;dur={query_time * 1000:.1f}'
+        local.queries = None
+        return response
+    
+    def _teardown_request(self, exc):
+        # Stop collecting even when after_request did not run
+        profiler = getattr(self._local, 'profiler', None)
+        if profiler is not None:
+            self._stop_profiler(profiler)
+        self._local.profiler = None
+        self._local.queries = None
+    
+    def _log_slow_request(self, elapsed, query_count, query_time, queries):
+        breakdown = sorted(queries.items(), key=lambda item: item[1][1], reverse=True)[:SLOW_QUERY_BREAKDOWN]
+        lines = [f'  {count}x {seconds * 1000:.1f}ms {" ".join(statement.split())[:200]}'
+                 for statement, (count, seconds) in breakdown]
+        logger.warning('Slow request %s %s: %.1fms, %d queries in %.1fms\n%s',
+                       request.method, request.full_path.rstrip('?'), elapsed * 1000,
+                       query_count, query_time * 1000, '\n'.join(lines))
+    
+    def _start_profiler(self):
+        mode = request.headers.get(PROFILE_HEADER, '').lower()
+        if mode == 'pyinstrument' and Profiler is not None:
+            profiler = Profiler()
+            profiler.start()
+        elif mode in ('1', 'cprofile', 'pyinstrument'):
+            # cProfile stands in when pyinstrument is not installed
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            return None
+        return profiler
+    
+    def _stop_profiler(self, profiler):
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(30)
+            report = output.getvalue()
+        else:
+            profiler.stop()
+            report = profiler.output_text()
+        logger.info('Profile for %s %s\n%s', request.method, request.full_path.rstrip('?'), report)
+    
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for metric in (self.requests, self.latency, self.response_size, self.query_count, self.query_time):
+                lines.extend(metric.render())
+        
+        submission_queue = self.app.extensions.get('submission_queue')
+        if submission_queue is not None:
+            for name, value in submission_queue.stats().items():
+                metric_type = 'counter' if name in QUEUE_COUNTERS else 'gauge'
+                lines.append(f'# TYPE submission_queue_{name} {metric_type}')
+                lines.append(f'submission_queue_{name} {value}')
+        
+        rate_limiter = self.app.extensions.get('rate_limiter')
+        if rate_limiter is not None:
+            for name, value in rate_limiter.stats().items():
+                metric_type = 'counter' if name.startswith('rejected_') else 'gauge'
+                lines.append(f'# TYPE rate_limiter_{name} {metric_type}')
+                lines.append(f'rate_limiter_{name} {value}')
+        return '\n'.join(lines) + '\n'
+    
+    def metrics_view(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+def init_metrics(app):
+    """Collect request metrics and serve them on /metrics when METRICS_ENABLED is set"""
+    if not app.config.get('METRICS_ENABLED'):
+        return None
+    return RequestMetrics(app)
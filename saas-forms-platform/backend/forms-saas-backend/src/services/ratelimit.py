@@ -0,0 +1,214 @@
+from collections import namedtuple
+from functools import lru_cache
+import logging
+import math
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
+
+logger = logging.getLogger(__name__)
+
+Limit = namedtuple('Limit', ['rate', 'burst'])  # tokens per second, bucket size
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+# Defaults per scope. 'ip' limits each client across all forms, 'form' each
+# form across all clients; Form.settings['rate_limits'] can override 'form'
+# and add a per-client limit on that form only ('form_ip').
+DEFAULT_RATE_LIMITS = {
+    'submit': {'ip': '30/minute', 'form': '600/minute'},
+    'embed': {'ip': '300/minute', 'form': '6000/minute'},
+}
+FORM_SETTING = 'rate_limits'
+EVICT_INTERVAL = 60
+
+@lru_cache(maxsize=256)
+def parse_limit(value):
+    """Parse '10/minute' into a Limit allowing bursts of 10; None or '' means unlimited"""
+    if not value:
+        return None
+    try:
+        count, period = value.split('/')
+        count = float(count)
+        seconds = PERIODS[period.strip().rstrip('s')]
+    except (AttributeError, KeyError, ValueError):
+        raise ValueError(f'Invalid rate limit: {value!r}')
+    if count < 1:
+        raise ValueError(f'Invalid rate limit: {value!r}')
+    return Limit(count / seconds, count)
+
+class MemoryBuckets:
+    """Token buckets in a dict of key -> (tokens, updated_at, full_at)
+
+    A bucket that has refilled completely behaves like a missing one, so
+    the periodic sweep drops every bucket past its full_at.
+    """
+    
+    shared = False
+    
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last_evict = time.monotonic()
+    
+    def take(self, key, limit, now):
+        """Take a token; returns 0 when allowed, otherwise seconds until a token is available"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = limit.burst if bucket is None else min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            if tokens < 1:
+                return (1 - tokens) / limit.rate
+            tokens -= 1
+            self._buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+            
+            if now - self._last_evict >= EVICT_INTERVAL:
+                self._last_evict = now
+                self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        return 0
+    
+    def __len__(self):
+        return len(self._buckets)
+
+class SQLBuckets:
+    """Token buckets in a database table shared by every worker
+
+    Meant for a small SQLite file of its own (RATE_LIMIT_STORAGE_URL), not
+    the application database, so limiting never competes with entry writes.
+    Each check is one atomic upsert that only succeeds when a token is left.
+    """
+    
+    shared = True
+    
+    CREATE = ('CREATE TABLE IF NOT EXISTS rate_limit_buckets '
+              '(key VARCHAR(255) PRIMARY KEY, tokens FLOAT NOT NULL, updated_at FLOAT NOT NULL, full_at FLOAT NOT NULL)')
+    TAKE = (
+        'INSERT INTO rate_limit_buckets (key, tokens, updated_at, full_at) '
+        'VALUES (:key, :burst - 1, :now, :now + 1 / :rate) '
+        'ON CONFLICT (key) DO UPDATE SET '
+        'tokens = {least}(:burst, rate_limit_buckets.tokens + (:now - rate_limit_buckets.updated_at) * :rate) - 1, '
+        'updated_at = :now, '
+        'full_at = :now + (:burst - {least}(:burst, rate_limit_buckets.tokens '
+        '+ (:now - rate_limit_buckets.updated_at) * :rate) + 1) / :rate '
+        'WHERE {least}(:burst, rate_limit_buckets.tokens + (:now - rate_limit_buckets.updated_at) * :rate) >= 1 '
+        'RETURNING tokens'
+    )
+    EVICT = 'DELETE FROM rate_limit_buckets WHERE full_at <= :now'
+    
+    def __init__(self, url):
+        self.engine = create_engine(url)
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', self._sqlite_pragmas)
+        least = 'MIN' if self.engine.dialect.name == 'sqlite' else 'LEAST'
+        self._take = text(self.TAKE.format(least=least))
+        self._last_evict = time.monotonic()
+        with self.engine.begin() as conn:
+            conn.execute(text(self.CREATE))
+    
+    @staticmethod
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # Bucket state is disposable; favour throughput over durability
+        for pragma in ('journal_mode=WAL', 'synchronous=OFF', 'busy_timeout=1000'):
+            cursor.execute(f'PRAGMA {pragma}')
+        cursor.close()
+    
+    def take(self, key, limit, now):
+        with self.engine.begin() as conn:
+            allowed = conn.execute(self._take, {
+                'key': '|'.join(map(str, key)), 'burst': limit.burst, 'rate': limit.rate, 'now': now
+            }).first() is not None
+            if time.monotonic() - self._last_evict >= EVICT_INTERVAL:
+                self._last_evict = time.monotonic()
+                conn.execute(text(self.EVICT), {'now': now})
+        # A token frees up within 1 / rate seconds at most
+        return 0 if allowed else 1 / limit.rate
+    
+    def __len__(self):
+        with self.engine.connect() as conn:
+            return conn.execute(text('SELECT COUNT(*) FROM rate_limit_buckets')).scalar()
+
+class RateLimiter:
+    """Per-client and per-form token buckets for the public endpoints
+
+    check_client needs only the client address, so floods from one client
+    are rejected before the database is touched (beyond the shared bucket
+    table, when one is configured). check_form then applies the form's
+    limits, using its settings from the form metadata cache.
+    """
+    
+    def __init__(self, limits=None, storage=None):
+        self.limits = {scope: dict(scope_limits) for scope, scope_limits in (limits or DEFAULT_RATE_LIMITS).items()}
+        self.storage = storage or MemoryBuckets()
+        self._rejected = {}
+        self._lock = threading.Lock()
+    
+    def limits_for(self, scope, settings):
+        """{kind: Limit} for a scope, with a form's overrides applied"""
+        limits = dict(self.limits.get(scope, {}))
+        overrides = ((settings or {}).get(FORM_SETTING) or {}).get(scope) or {}
+        if 'form' in overrides:
+            limits['form'] = overrides['form']
+        if 'ip' in overrides:
+            limits['form_ip'] = overrides['ip']
+        
+        parsed = {}
+        for kind in ('ip', 'form_ip', 'form'):
+            try:
+                limit = parse_limit(limits.get(kind))
+            except ValueError:
+                # A malformed form setting must not take the endpoint down
+                limit = parse_limit(self.limits.get(scope, {}).get(kind))
+            if limit is not None:
+                parsed[kind] = limit
+        return parsed
+    
+    def check_client(self, scope, ip_address):
+        """Take a token from the client's bucket; returns None when allowed, else the Retry-After seconds"""
+        return self._take(scope, self.limits_for(scope, None), {'ip': (scope, 'ip', ip_address)})
+    
+    def check_form(self, scope, form_id, ip_address, settings=None):
+        """Take a token from the form's buckets; returns None when allowed, else the Retry-After seconds"""
+        return self._take(scope, self.limits_for(scope, settings), {
+            'form_ip': (scope, 'form_ip', form_id, ip_address),
+            'form': (scope, 'form', form_id),
+        })
+    
+    def _take(self, scope, limits, keys):
+        now = time.time()
+        for kind, key in keys.items():
+            limit = limits.get(kind)
+            if limit is None:
+                continue
+            wait = self.storage.take(key, limit, now)
+            if wait:
+                with self._lock:
+                    self._rejected[(scope, kind)] = self._rejected.get((scope, kind), 0) + 1
+                return max(1, math.ceil(wait))
+        return None
+    
+    def stats(self):
+        with self._lock:
+            stats = {f'rejected_{scope}_{kind}': count for (scope, kind), count in sorted(self._rejected.items())}
+        if not self.storage.shared:
+            stats['buckets'] = len(self.storage)
+        return stats
+
+def init_rate_limiter(app):
+    """Throttle the public submit and embed endpoints unless RATE_LIMIT_ENABLED is off"""
+    if not app.config.get('RATE_LIMIT_ENABLED', True):
+        return None
+    if app.config.get('TRUSTED_PROXIES') is None:
+        # Behind a proxy every client would share the proxy's bucket
+        logger.warning('Rate limiting by remote address; set TRUSTED_PROXIES if the app runs behind a proxy')
+    
+    limits = {scope: dict(scope_limits) for scope, scope_limits in DEFAULT_RATE_LIMITS.items()}
+    for scope, scope_limits in (app.config.get('RATE_LIMITS') or {}).items():
+        limits.setdefault(scope, {}).update(scope_limits)
+    for scope_limits in limits.values():
+        for value in scope_limits.values():
+            parse_limit(value)
+    
+    url = app.config.get('RATE_LIMIT_STORAGE_URL')
+    limiter = RateLimiter(limits, SQLBuckets(url) if url else MemoryBuckets())
+    app.extensions['rate_limiter'] = limiter
+    return limiter
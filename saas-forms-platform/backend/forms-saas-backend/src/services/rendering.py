@@ -0,0 +1,146 @@
+from html import escape
+
+# Field renderers by field type. Each renderer appends HTML fragments to an
+# output list; the fragment templates are bound `str.format` methods built
+# once at import time, and every interpolated value is escaped first.
+FIELD_RENDERERS = {}
+
+FIELD_OPEN = '<div class="form-field">'
+FIELD_CLOSE = '</div>'
+LABEL = '<label for="{id}" class="field-label">{label}{required_mark}</label>'.format
+REQUIRED_MARK = ' <span class="required">*</span>'
+INPUT = ('<input type="{type}" id="{id}" name="{name}" placeholder="{placeholder}"'
+         '{extra}{required} class="field-input">').format
+TEXTAREA = ('<textarea id="{id}" name="{name}" placeholder="{placeholder}"{required}'
+            ' class="field-textarea" rows="{rows}"></textarea>').format
+SELECT_OPEN = '<select id="{id}" name="{name}"{required} class="field-select">'.format
+OPTION = '<option value="{value}">{label}</option>'.format
+SELECT_CLOSE = '</select>'
+# A group has no single control for a <label for>; it names the group instead
+GROUP_LABEL = '<span id="{id}-label" class="field-label">{label}{required_mark}</span>'.format
+CHOICE_GROUP_OPEN = '<div class="field-choices{inline}" role="{role}" aria-labelledby="{id}-label">'.format
+CHOICE = ('<label class="field-choice"><input type="{type}" id="{id}" name="{name}"'
+          ' value="{value}"{required} class="field-{type}"> {label}</label>').format
+CHOICE_GROUP_CLOSE = '</div>'
+CONSENT = ('<label class="field-choice field-consent"><input type="checkbox" id="{id}"'
+           ' name="{name}" value="1"{required} class="field-checkbox"> {label}{required_mark}</label>').format
+DESCRIPTION = '<p class="field-description">{description}</p>'.format
+
+DEFAULT_TEXTAREA_ROWS = 4
+
+RANGE_ATTRIBUTES = ('min', 'max', 'step', 'pattern')
+INPUT_TYPES = ('text', 'email', 'tel', 'url', 'number', 'date', 'file')
+
+def field_renderer(*field_types):
+    """Register a renderer for one or more field types"""
+    def register(render):
+        for field_type in field_types:
+            FIELD_RENDERERS[field_type] = render
+        return render
+    return register
+
+def normalize_options(options):
+    """Get (value, label) pairs from list, dict or {value, label} option formats"""
+    if isinstance(options, dict):
+        return [(str(value), str(label)) for value, label in options.items()]
+    
+    pairs = []
+    for option in options or []:
+        if isinstance(option, dict):
+            value = option.get('value', option.get('label', ''))
+            pairs.append((str(value), str(option.get('label', value))))
+        else:
+            pairs.append((str(option), str(option)))
+    return pairs
+
+def common_attributes(field):
+    """Get the escaped attributes shared by every field type"""
+    name = escape(str(field.get('name', '')))
+    return {
+        'id': name,
+        'name': name,
+        'label': escape(str(field.get('label', ''))),
+        'placeholder': escape(str(field.get('placeholder', ''))),
+        'required': ' required' if field.get('required') else '',
+        'required_mark': REQUIRED_MARK if field.get('required') else '',
+    }
+
+def render_label(out, attrs):
+    out.append(LABEL(**attrs))
+
+@field_renderer(*INPUT_TYPES)
+def render_input(out, field, attrs):
+    extra = ''.join(
+        f' {key}="{escape(str(field[key]))}"' for key in RANGE_ATTRIBUTES if key in field
+    )
+    if field.get('type') == 'file' and field.get('accept'):
+        extra += f' accept="{escape(str(field["accept"]))}"'
+    
+    input_type = field.get('type') if field.get('type') in INPUT_TYPES else 'text'
+    render_label(out, attrs)
+    out.append(INPUT(type=input_type, extra=extra, **attrs))
+
+@field_renderer('textarea')
+def render_textarea(out, field, attrs):
+    render_label(out, attrs)
+    out.append(TEXTAREA(rows=textarea_rows(field), **attrs))
+
+def textarea_rows(field):
+    """The field's rows setting, or the default when it is missing or not a positive number"""
+    try:
+        rows = int(field.get('rows', DEFAULT_TEXTAREA_ROWS))
+    except (TypeError, ValueError):
+        return DEFAULT_TEXTAREA_ROWS
+    return rows if rows > 0 else DEFAULT_TEXTAREA_ROWS
+
+@field_renderer('select')
+def render_select(out, field, attrs):
+    render_label(out, attrs)
+    out.append(SELECT_OPEN(**attrs))
+    out.append(OPTION(value='', label=attrs['placeholder'] or 'Select an option'))
+    for value, label in normalize_options(field.get('options')):
+        out.append(OPTION(value=escape(value), label=escape(label)))
+    out.append(SELECT_CLOSE)
+
+@field_renderer('radio', 'checkbox')
+def render_choices(out, field, attrs):
+    field_type = field.get('type')
+    # A required attribute on every checkbox would force all of them to be
+    # ticked, so only radio groups get it
+    required = attrs['required'] if field_type == 'radio' else ''
+    
+    out.append(GROUP_LABEL(**attrs))
+    out.append(CHOICE_GROUP_OPEN(
+        inline=' inline' if field.get('inline') else '',
+        role='radiogroup' if field_type == 'radio' else 'group',
+        id=attrs['id']
+    ))
+    for index, (value, label) in enumerate(normalize_options(field.get('options'))):
+        out.append(CHOICE(
+            type=field_type,
+            id=f"{attrs['id']}-{index}",
+            name=attrs['name'],
+            value=escape(value),
+            label=escape(label),
+            required=required
+        ))
+    out.append(CHOICE_GROUP_CLOSE)
+
+@field_renderer('gdpr_consent')
+def render_consent(out, field, attrs):
+    out.append(CONSENT(**attrs))
+    if field.get('description'):
+        out.append(DESCRIPTION(description=escape(str(field['description']))))
+
+def render_fields(fields):
+    """Render form fields to HTML, falling back to a text input for unknown types"""
+    out = []
+    for field in fields:
+        attrs = common_attributes(field)
+        render = FIELD_RENDERERS.get(field.get('type', 'text'), render_input)
+        
+        out.append(FIELD_OPEN)
+        render(out, field, attrs)
+        out.append(FIELD_CLOSE)
+    
+    return ''.join(out)
@@ -0,0 +1,114 @@
+from html import escape
+import re
+
+from src.models.form import db, FormEntry
+from src.models.search import FTS_TABLE
+from src.services.entries import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, backfill_complete, newest_first
+
+MAX_QUERY_LENGTH = 200
+SNIPPET_TOKENS = 16
+SNIPPET_CHARS = 80
+# Placeholders the database wraps matches in; replaced after HTML escaping
+MARK_START = '\x01'
+MARK_END = '\x02'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+POSTGRES_CONFIG = db.literal_column("'simple'")
+
+FTS5_SEARCH = db.text(
+    f"SELECT rowid AS id, bm25({FTS_TABLE}) AS score, "
+    f"snippet({FTS_TABLE}, 1, :mark_start, :mark_end, '…', :tokens) AS snippet "
+    f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query AND form_id = :form_id "
+    f"ORDER BY score LIMIT :limit OFFSET :offset"
+)
+
+_fts5_available = {}
+
+def search_tokens(text):
+    return TOKEN_RE.findall(text[:MAX_QUERY_LENGTH])
+
+def fts5_query(tokens):
+    """Quote every token so user input cannot use FTS5 syntax; the last one matches as a prefix"""
+    quoted = ['"' + token.replace('"', '""') + '"' for token in tokens]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def highlight(snippet):
+    """Escape a snippet and turn the match placeholders into <mark> tags"""
+    return escape(snippet or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+def search_backend():
+    """'fts5', 'postgresql' or 'scan' for the current database"""
+    engine = db.engine
+    if engine.dialect.name == 'postgresql':
+        return 'postgresql'
+    if engine.dialect.name == 'sqlite':
+        available = _fts5_available.get(engine.url)
+        if available is None:
+            available = _fts5_available[engine.url] = db.inspect(engine).has_table(FTS_TABLE)
+        # Until rebuild-search has run, the index misses older entries
+        if available and backfill_complete('search_index'):
+            return 'fts5'
+    return 'scan'
+
+def search_entries(form_id, args):
+    """Search a form's entries by their values
+
+    Returns ([(entry, snippet_html, score)], next_offset). Results are
+    ranked by relevance where the database supports it, newest first
+    otherwise.
+    """
+    tokens = search_tokens(args.get('q', ''))
+    if not tokens:
+        raise ValueError('q must contain at least one word')
+    limit = min(max(args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    offset = max(args.get('offset', 0, type=int), 0)
+    
+    search = {'fts5': search_fts5, 'postgresql': search_postgresql}.get(search_backend(), search_scan)
+    # Fetch one extra row to know whether another page exists
+    hits = search(form_id, tokens, limit + 1, offset)
+    next_offset = offset + limit if len(hits) > limit else None
+    return hits[:limit], next_offset
+
+def search_fts5(form_id, tokens, limit, offset):
+    rows = db.session.execute(FTS5_SEARCH, {
+        'query': fts5_query(tokens), 'form_id': form_id, 'limit': limit, 'offset': offset,
+        'mark_start': MARK_START, 'mark_end': MARK_END, 'tokens': SNIPPET_TOKENS
+    }).all()
+    entries = {entry.id: entry for entry in FormEntry.query.filter(FormEntry.id.in_([row.id for row in rows]))}
+    # bm25() is lower for better matches; report higher-is-better scores
+    return [(entries[row.id], highlight(row.snippet), -row.score) for row in rows if row.id in entries]
+
+def search_postgresql(form_id, tokens, limit, offset):
+    # Same expression as ix_form_entries_search so the index is used
+    document = db.func.to_tsvector(POSTGRES_CONFIG, FormEntry.data)
+    query = db.func.to_tsquery(POSTGRES_CONFIG, ' & '.join(f"'{token}'" for token in tokens) + ':*')
+    score = db.func.ts_rank(document, query)
+    snippet = db.func.ts_headline(POSTGRES_CONFIG, FormEntry.data, query,
+                                  f'StartSel={MARK_START}, StopSel={MARK_END}, MaxWords={SNIPPET_TOKENS}, MinWords=5')
+    
+    rows = db.session.query(FormEntry, snippet, score) \
+        .filter(FormEntry.form_id == form_id, document.op('@@')(query)) \
+        .order_by(score.desc(), FormEntry.id.desc()).limit(limit).offset(offset).all()
+    return [(entry, highlight(text), float(rank)) for entry, text, rank in rows]
+
+def search_scan(form_id, tokens, limit, offset):
+    """Fallback without a full-text index: match every word in the stored data"""
+    query = FormEntry.query.filter(FormEntry.form_id == form_id)
+    # Compare against the raw JSON text, not a JSON-encoded pattern
+    data = db.type_coerce(FormEntry.data, db.Text)
+    for token in tokens:
+        query = query.filter(data.icontains(token, autoescape=True))
+    entries = newest_first(query).limit(limit).offset(offset).all()
+    return [(entry, highlight(scan_snippet(entry, tokens)), None) for entry in entries]
+
+def scan_snippet(entry, tokens):
+    """Cut a snippet around the first matching value"""
+    pattern = re.compile('|'.join(re.escape(token) for token in tokens), re.IGNORECASE)
+    for value in (entry.get_data() or {}).values():
+        text = ' '.join(map(str, value)) if isinstance(value, list) else str(value)
+        match = pattern.search(text)
+        if match:
+            start = max(match.start() - SNIPPET_CHARS // 2, 0)
+            window = text[start:start + SNIPPET_CHARS]
+            return pattern.sub(lambda found: MARK_START + found.group(0) + MARK_END, window)
+    return ''
@@ -0,0 +1,135 @@
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.form import db, Form
+from src.models.stats import SubmissionCount, FieldValueCount
+from src.services.entries import iter_entries
+
+GRANULARITIES = ('hour', 'day')
+CHOICE_FIELD_TYPES = ('select', 'radio', 'checkbox')
+DEFAULT_TOP_VALUES = 10
+UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+UPSERT_CHUNK_SIZE = 500
+
+def bucket_start(timestamp, granularity):
+    if granularity == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def choice_fields(fields):
+    return [field['name'] for field in fields if field.get('type') in CHOICE_FIELD_TYPES and field.get('name')]
+
+def stats_enabled():
+    return current_app.config.get('STATS_ROLLUPS_ENABLED', True)
+
+def aggregate(entries, fields_by_form):
+    """Count entries per time bucket and per chosen value"""
+    buckets = Counter()
+    values = Counter()
+    choice_fields_by_form = {form_id: choice_fields(fields) for form_id, fields in fields_by_form.items()}
+    
+    for entry in entries:
+        submitted_at = entry.submitted_at or datetime.utcnow()
+        for granularity in GRANULARITIES:
+            buckets[(entry.form_id, granularity, bucket_start(submitted_at, granularity))] += 1
+        
+        names = choice_fields_by_form.get(entry.form_id)
+        if not names:
+            continue
+        data = entry.get_data()
+        for name in names:
+            value = data.get(name)
+            for item in value if isinstance(value, list) else [value]:
+                if item not in (None, ''):
+                    values[(entry.form_id, name, str(item)[:255])] += 1
+    
+    return buckets, values
+
+def upsert_statements(insert, model, key_columns, counts):
+    """Build INSERT ... ON CONFLICT statements adding counts to rollup rows"""
+    rows = [dict(zip(key_columns, key), count=count) for key, count in counts.items()]
+    statements = []
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        statement = insert(model).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        statements.append(statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={'count': model.count + statement.excluded['count']}
+        ))
+    return statements
+
+def upsert_counts(model, key_columns, counts):
+    """Add counts to rollup rows, creating rows that do not exist yet"""
+    if not counts:
+        return
+    
+    insert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if insert is None:
+        for key, count in counts.items():
+            keys = dict(zip(key_columns, key))
+            updated = model.query.filter_by(**keys).update({model.count: model.count + count})
+            if not updated:
+                db.session.add(model(count=count, **keys))
+        return
+    
+    for statement in upsert_statements(insert, model, key_columns, counts):
+        db.session.execute(statement)
+
+def record_entries(entries, fields_by_form):
+    """Fold newly written entries into the rollups within the caller's transaction"""
+    if not stats_enabled():
+        return
+    buckets, values = aggregate(entries, fields_by_form)
+    upsert_counts(SubmissionCount, ['form_id', 'granularity', 'bucket_start'], buckets)
+    upsert_counts(FieldValueCount, ['form_id', 'field_name', 'value'], values)
+
+def rollup_statements(dialect_name, entries, fields_by_form):
+    """Build the rollup upserts for entries, for callers outside the ORM session"""
+    insert = UPSERT_DIALECTS[dialect_name]
+    buckets, values = aggregate(entries, fields_by_form)
+    return upsert_statements(insert, SubmissionCount, ['form_id', 'granularity', 'bucket_start'], buckets) + \
+        upsert_statements(insert, FieldValueCount, ['form_id', 'field_name', 'value'], values)
+
+def get_form_stats(form_id, granularity='day', since=None, until=None, top=DEFAULT_TOP_VALUES):
+    """Read a form's rollups; cost depends on the number of buckets, not entries"""
+    query = SubmissionCount.query.filter_by(form_id=form_id, granularity=granularity)
+    if since is not None:
+        query = query.filter(SubmissionCount.bucket_start >= bucket_start(since, granularity))
+    if until is not None:
+        query = query.filter(SubmissionCount.bucket_start < until)
+    buckets = query.order_by(SubmissionCount.bucket_start).all()
+    
+    fields = {}
+    for row in FieldValueCount.query.filter_by(form_id=form_id) \
+            .order_by(FieldValueCount.field_name, FieldValueCount.count.desc()):
+        values = fields.setdefault(row.field_name, [])
+        if len(values) < top:
+            values.append(row.to_dict())
+    
+    return {
+        'granularity': granularity,
+        'total': sum(bucket.count for bucket in buckets),
+        'buckets': [bucket.to_dict() for bucket in buckets],
+        'fields': fields
+    }
+
+def rebuild_form_stats(form):
+    """Recompute a form's rollups from its stored entries, archived ones included"""
+    SubmissionCount.query.filter_by(form_id=form.id).delete()
+    FieldValueCount.query.filter_by(form_id=form.id).delete()
+    
+    fields_by_form = {form.id: form.get_fields()}
+    buckets, values = aggregate(iter_entries(form.id, include_archived=True), fields_by_form)
+    upsert_counts(SubmissionCount, ['form_id', 'granularity', 'bucket_start'], buckets)
+    upsert_counts(FieldValueCount, ['form_id', 'field_name', 'value'], values)
+    db.session.commit()
+
+def rebuild_stats(form_id=None):
+    """Rebuild rollups for one form or all forms; returns the number of forms"""
+    query = Form.query if form_id is None else Form.query.filter_by(id=form_id)
+    form_ids = [row.id for row in query.with_entities(Form.id)]
+    for current_id in form_ids:
+        rebuild_form_stats(db.session.get(Form, current_id))
+    return len(form_ids)
@@ -0,0 +1,279 @@
+from datetime import date
+from urllib.parse import urlparse
+import math
+import re
+
+from src.services.rendering import normalize_options
+
+# Ported from the WordPress plugin's class-form-validator.php. A form's
+# fields are compiled once into per-field check closures; each check takes
+# a non-empty submitted value and returns (error, sanitized_value).
+
+DEFAULT_MAX_LENGTH = 1000
+DEFAULT_TEXTAREA_MAX_LENGTH = 10000
+MAX_UNDECLARED_FIELDS = 100
+
+TAG_RE = re.compile(r'<[^>]*>')
+CONTROL_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+WHITESPACE_RE = re.compile(r'\s+')
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+PHONE_RE = re.compile(r'^[\d\s\-\(\)\+]+$')
+
+def sanitize_text(value, multiline=False):
+    """Approximate WordPress sanitize_text_field / sanitize_textarea_field"""
+    value = CONTROL_RE.sub('', TAG_RE.sub('', value))
+    if multiline:
+        return value.strip()
+    return WHITESPACE_RE.sub(' ', value).strip()
+
+def is_empty(value):
+    if isinstance(value, (list, dict)):
+        return not value
+    return value is None or str(value).strip() == ''
+
+def as_text(value):
+    """Get a scalar submission value as text, or None for nested values"""
+    if isinstance(value, (list, dict)):
+        return None
+    return str(value)
+
+def number_bound(field, key):
+    try:
+        return float(field[key]) if field.get(key) not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+def date_bound(field, key):
+    try:
+        return date.fromisoformat(field[key]) if field.get(key) else None
+    except (TypeError, ValueError):
+        return None
+
+def compile_text(field, label):
+    multiline = field.get('type') == 'textarea'
+    default_max = DEFAULT_TEXTAREA_MAX_LENGTH if multiline else DEFAULT_MAX_LENGTH
+    min_length = int(number_bound(field, 'min_length') or 0) or None
+    max_length = int(number_bound(field, 'max_length') or default_max)
+    too_short = f'{label} must be at least {min_length} characters long.'
+    too_long = f'{label} must be no more than {max_length} characters long.'
+    invalid = f'{label} is invalid.'
+    
+    def check(value):
+        text = as_text(value)
+        if text is None:
+            return invalid, None
+        if len(text) > max_length * 4:
+            # Do not spend time sanitizing payloads that cannot fit anyway
+            return too_long, None
+        text = sanitize_text(text, multiline)
+        if min_length is not None and len(text) < min_length:
+            return too_short, None
+        if len(text) > max_length:
+            return too_long, None
+        return None, text
+    return check
+
+def compile_email(field, label):
+    invalid = f'{label} must be a valid email address.'
+    
+    def check(value):
+        text = as_text(value)
+        if text is None or len(text) > 254:
+            return invalid, None
+        text = text.strip()
+        if not EMAIL_RE.match(text):
+            return invalid, None
+        return None, text
+    return check
+
+def compile_url(field, label):
+    invalid = f'{label} must be a valid URL.'
+    
+    def check(value):
+        text = as_text(value)
+        if text is None or len(text) > 2048:
+            return invalid, None
+        text = text.strip()
+        parsed = urlparse(text)
+        if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+            return invalid, None
+        return None, text
+    return check
+
+def compile_phone(field, label):
+    invalid = f'{label} must be a valid phone number.'
+    
+    def check(value):
+        text = as_text(value)
+        if text is None or len(text) > 50:
+            return invalid, None
+        text = sanitize_text(text)
+        if not PHONE_RE.match(text):
+            return invalid, None
+        return None, text
+    return check
+
+def compile_number(field, label):
+    minimum = number_bound(field, 'min')
+    maximum = number_bound(field, 'max')
+    invalid = f'{label} must be a valid number.'
+    too_small = f'{label} must be at least {field.get("min")}.'
+    too_large = f'{label} must be no more than {field.get("max")}.'
+    
+    def check(value):
+        if isinstance(value, bool):
+            return invalid, None
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return invalid, None
+        if not math.isfinite(number):
+            return invalid, None
+        if minimum is not None and number < minimum:
+            return too_small, None
+        if maximum is not None and number > maximum:
+            return too_large, None
+        return None, int(number) if number.is_integer() else number
+    return check
+
+def compile_date(field, label):
+    minimum = date_bound(field, 'min')
+    maximum = date_bound(field, 'max')
+    invalid = f'{label} must be a valid date.'
+    too_early = f'{label} must be after {field.get("min")}.'
+    too_late = f'{label} must be before {field.get("max")}.'
+    
+    def check(value):
+        text = as_text(value)
+        try:
+            parsed = date.fromisoformat(text.strip()[:10])
+        except (AttributeError, ValueError):
+            return invalid, None
+        if minimum is not None and parsed < minimum:
+            return too_early, None
+        if maximum is not None and parsed > maximum:
+            return too_late, None
+        return None, parsed.isoformat()
+    return check
+
+def compile_choice(field, label):
+    options = normalize_options(field.get('options'))
+    allowed = frozenset(value for value, _ in options)
+    invalid = f'Invalid selection for {label}.'
+    
+    def check(value):
+        text = as_text(value)
+        if text is None:
+            return invalid, None
+        if allowed and text not in allowed:
+            return invalid, None
+        return None, text if allowed else sanitize_text(text)
+    return check
+
+def compile_checkbox(field, label):
+    options = normalize_options(field.get('options'))
+    allowed = frozenset(value for value, _ in options)
+    invalid = f'Invalid selection for {label}.'
+    
+    def check(value):
+        values = value if isinstance(value, list) else [value]
+        selected = []
+        for item in values:
+            text = as_text(item)
+            if text is None or (allowed and text not in allowed):
+                return invalid, None
+            selected.append(text if allowed else sanitize_text(text))
+        if not allowed and len(selected) > MAX_UNDECLARED_FIELDS:
+            return invalid, None
+        return None, selected
+    return check
+
+def compile_consent(field, label):
+    def check(value):
+        return None, '1'
+    return check
+
+FIELD_COMPILERS = {
+    'email': compile_email,
+    'url': compile_url,
+    'tel': compile_phone,
+    'number': compile_number,
+    'date': compile_date,
+    'checkbox': compile_checkbox,
+    'radio': compile_choice,
+    'select': compile_choice,
+    'gdpr_consent': compile_consent,
+}
+
+def compile_undeclared():
+    """Validator for forms without field definitions: bound size, keep keys"""
+    check_text = compile_text({'type': 'textarea'}, 'Value')
+    
+    def validate(data):
+        if len(data) > MAX_UNDECLARED_FIELDS:
+            return {'data': 'Too many fields submitted.'}, None
+        
+        errors = {}
+        cleaned = {}
+        for name, value in data.items():
+            if len(name) > 100:
+                errors[name[:100]] = 'Field name is too long.'
+                continue
+            if isinstance(value, (int, float)) or value is None:
+                cleaned[name] = value
+                continue
+            if isinstance(value, list):
+                value = ', '.join(str(item) for item in value if not isinstance(item, (list, dict)))
+            error, cleaned[name] = check_text(value)
+            if error:
+                errors[name] = error
+        
+        return errors, cleaned
+    return validate
+
+def compile_validator(fields):
+    """Compile a form's field definitions into a `validate(data)` function
+
+    `validate` returns `(errors, sanitized_data)`; `errors` maps field names
+    to messages and is empty when the submission is valid. Only declared
+    fields are kept in the sanitized data.
+    """
+    if not fields:
+        undeclared = compile_undeclared()
+    else:
+        undeclared = None
+        checks = []
+        for field in fields:
+            name = field.get('name')
+            if not name:
+                continue
+            label = field.get('label') or name
+            compiler = FIELD_COMPILERS.get(field.get('type'), compile_text)
+            required = bool(field.get('required'))
+            checks.append((name, required, f'{label} is required.', compiler(field, label)))
+    
+    def validate(data):
+        if not isinstance(data, dict):
+            return {'data': 'Submission data must be an object.'}, None
+        if undeclared is not None:
+            return undeclared(data)
+        
+        errors = {}
+        cleaned = {}
+        for name, required, missing, check in checks:
+            value = data.get(name)
+            if is_empty(value):
+                if required:
+                    errors[name] = missing
+                else:
+                    cleaned[name] = ''
+                continue
+            
+            error, value = check(value)
+            if error:
+                errors[name] = error
+            else:
+                cleaned[name] = value
+        
+        return errors, cleaned
+    return validate
@@ -0,0 +1,11 @@
+import os
+
+def is_reloader_parent(app):
+    """True in the process that only watches files for the debug reloader
+
+    With debug on, `app.run()` and `flask run` import the app once in a
+    watcher process and again in the child that serves requests, which
+    werkzeug marks with WERKZEUG_RUN_MAIN. Background threads belong in the
+    child only; the watcher never reloads its code.
+    """
+    return app.debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
@@ -180,6 +180,34 @@
         clearFieldError(field);
     }
 
+    function createIdempotencyKey() {
+        if (window.crypto && crypto.randomUUID) {
+            return crypto.randomUUID();
+        }
+        return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+    }
+
+    const RECEIPT_CHECKS = 5;
+    const RECEIPT_CHECK_INTERVAL = 1000;
+
+    // A 202 only means the submission is queued in server memory; wait for
+    // its receipt to report it stored before treating it as submitted
+    async function confirmReceipt(statusUrl) {
+        for (let attempt = 0; attempt < RECEIPT_CHECKS; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, RECEIPT_CHECK_INTERVAL));
+            const response = await fetch(new URL(statusUrl, window.location.origin));
+            const receipt = await response.json();
+            if (receipt.status === 'stored') {
+                return;
+            }
+            if (receipt.status !== 'queued') {
+                break;
+            }
+        }
+        // Submitting again reuses the Idempotency-Key, so this cannot create a second entry
+        throw new Error('Your submission could not be confirmed, please submit again');
+    }
+
     async function handleFormSubmission(form, formId) {
         const submitButton = form.querySelector('.submit-btn');
         const originalText = submitButton.textContent;
@@ -209,14 +237,22 @@
             const data = {};
             
             for (let [key, value] of formData.entries()) {
-                data[key] = value;
+                // Checkbox groups submit one value per ticked option
+                data[key] = key in data ? [].concat(data[key], value) : value;
+            }
+
+            // One key per filled-in form, so double clicks and retries are
+            // recognized by the server and return the first entry
+            if (!form.dataset.idempotencyKey) {
+                form.dataset.idempotencyKey = createIdempotencyKey();
             }
 
             // Submit to API
             const response = await fetch(`${API_BASE}/forms/${formId}/submit`, {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    'Idempotency-Key': form.dataset.idempotencyKey
                 },
                 body: JSON.stringify({ data })
             });
@@ -224,8 +260,12 @@
             const result = await response.json();
 
             if (result.success) {
+                if (response.status === 202) {
+                    await confirmReceipt(result.status_url);
+                }
                 showSuccessMessage(form);
                 form.reset();
+                delete form.dataset.idempotencyKey;
                 
                 // Clear all validation states
                 inputs.forEach(input => {
@@ -100,13 +100,14 @@
         apiRequest: function(endpoint, options = {}) {
             const url = `${CONFIG.apiUrl}${endpoint}`;
             const defaultOptions = {
-                method: 'GET',
-                headers: {
-                    'Content-Type': 'application/json'
-                }
+                method: 'GET'
+            };
+            const headers = {
+                'Content-Type': 'application/json',
+                ...options.headers
             };
 
-            return fetch(url, { ...defaultOptions, ...options })
+            return fetch(url, { ...defaultOptions, ...options, headers })
                 .then(response => {
                     if (!response.ok) {
                         throw new Error(`HTTP error! status: ${response.status}`);
@@ -125,6 +126,14 @@
         // Generate unique ID
         generateId: function() {
             return 'tid-form-' + Math.random().toString(36).substr(2, 9);
+        },
+
+        // Key the server uses to recognize retries of the same submission
+        createIdempotencyKey: function() {
+            if (window.crypto && crypto.randomUUID) {
+                return crypto.randomUUID();
+            }
+            return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
         }
     };
 
@@ -402,13 +411,26 @@
                     data[key] = value;
                 }
 
+                // One key per filled-in form, so double clicks and retries
+                // return the first entry instead of creating another
+                if (!form.dataset.idempotencyKey) {
+                    form.dataset.idempotencyKey = utils.createIdempotencyKey();
+                }
+
                 // Submit to API
                 const response = await utils.apiRequest(`/forms/${this.formData.id}/submit`, {
                     method: 'POST',
+                    headers: {
+                        'Idempotency-Key': form.dataset.idempotencyKey
+                    },
                     body: JSON.stringify({ data })
                 });
 
                 if (response.success) {
+                    if (response.stored === false) {
+                        await this.confirmReceipt(response.status_url);
+                    }
+                    delete form.dataset.idempotencyKey;
                     this.showSuccessMessage(form);
                 } else {
                     throw new Error(response.error || 'Submission failed');
@@ -425,6 +447,24 @@
             }
         }
 
+        // A queued submission (202) is only in server memory; wait for its
+        // receipt to report it stored before treating it as submitted
+        async confirmReceipt(statusUrl) {
+            for (let attempt = 0; attempt < 5; attempt++) {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                const response = await fetch(new URL(statusUrl, CONFIG.apiUrl));
+                const receipt = await response.json();
+                if (receipt.status === 'stored') {
+                    return;
+                }
+                if (receipt.status !== 'queued') {
+                    break;
+                }
+            }
+            // Submitting again reuses the Idempotency-Key, so this cannot create a second entry
+            throw new Error('Your submission could not be confirmed, please submit again');
+        }
+
         showSuccessMessage(form) {
             const message = utils.createElement('div', {
                 className: 'tid-form-message tid-form-success',
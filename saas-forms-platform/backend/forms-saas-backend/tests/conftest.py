@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from flask import Flask
+
+from src.models.user import db
+from src.models.form import Form, FormEntry, FormTemplate
+from src.models.stats import SubmissionCount, FieldValueCount
+from src.models.job import Job
+from src.models.archive import ArchivedEntry
+from src.models.lookup import IPAddress, UserAgent
+from src.models.dedup import SubmissionKey
+from src.models.backfill import Backfill
+from src.models.engine import configure_database, init_database
+from src.models.types import init_json
+from src.routes.forms import forms_bp, form_cache, embed_cache
+from src.services.dedup import recent_keys
+from src.services.lookups import ip_addresses, user_agents
+
+# form_entries and forms as created by the first release
+OLD_SCHEMA = [
+    'CREATE TABLE forms (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, description TEXT, '
+    'theme VARCHAR(50), fields TEXT, settings TEXT, embed_code TEXT, iframe_code TEXT, is_active BOOLEAN, '
+    'created_at DATETIME, updated_at DATETIME)',
+    'CREATE TABLE form_entries (id INTEGER PRIMARY KEY, form_id INTEGER NOT NULL REFERENCES forms (id), '
+    'data TEXT, ip_address VARCHAR(45), user_agent TEXT, submitted_at DATETIME)',
+    "INSERT INTO forms (id, name, fields, settings, embed_code, is_active, created_at, updated_at) "
+    "VALUES (1, 'Old', '[]', '{}', '<script>', 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00')",
+    "INSERT INTO form_entries (form_id, data, ip_address, user_agent, submitted_at) "
+    "VALUES (1, '{\"a\": \"x\"}', '10.0.0.1', 'curl/8', '2024-01-02 00:00:00.000000')",
+]
+
+@pytest.fixture
+def database_path(tmp_path):
+    return tmp_path / 'test.db'
+
+@pytest.fixture
+def app(database_path):
+    """The forms API on a SQLite database, fresh unless a test overrides database_path"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    init_json(app)
+    app.register_blueprint(forms_bp, url_prefix='/api')
+    configure_database(app, f'sqlite:///{database_path}')
+    init_database(app)
+    
+    # The route-level caches are module globals; start every test cold
+    form_cache.clear()
+    embed_cache.clear()
+    ip_addresses.clear()
+    user_agents.clear()
+    recent_keys.clear()
+    
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def old_database(tmp_path):
+    """Path of a SQLite database in the first release's schema"""
+    path = tmp_path / 'old.db'
+    conn = sqlite3.connect(path)
+    for statement in OLD_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+    return path
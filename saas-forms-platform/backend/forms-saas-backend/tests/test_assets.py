@@ -0,0 +1,27 @@
+from src.services.assets import StaticAssets, build_assets
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+def test_load_serves_the_build_when_it_matches_the_sources(tmp_path):
+    write(tmp_path / 'embed.js', 'console.log(1)')
+    manifest = build_assets(str(tmp_path))
+    
+    assets = StaticAssets()
+    assets.load(str(tmp_path))
+    
+    assert assets.url('embed.js') == '/static/' + manifest['embed.js']['file']
+
+def test_load_falls_back_to_the_sources_when_the_build_is_stale(tmp_path, caplog):
+    write(tmp_path / 'embed.js', 'console.log(1)')
+    old = build_assets(str(tmp_path))['embed.js']['file']
+    write(tmp_path / 'embed.js', 'console.log(2)')
+    write(tmp_path / 'extra.css', 'body {}')
+    
+    assets = StaticAssets()
+    assets.load(str(tmp_path))
+    
+    assert assets.url('embed.js') != '/static/' + old
+    assert 'extra.css' in assets
+    assert 'out of date' in caplog.text
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from src.models.form import db, Form, FormEntry
+
+def test_pages_reach_entries_without_submitted_at(app, client):
+    with app.app_context():
+        form = Form(name='Imported', fields=[])
+        db.session.add(form)
+        db.session.flush()
+        for submitted_at in (datetime(2024, 1, 1), None, datetime(2024, 1, 2), None):
+            entry = FormEntry(form_id=form.id, data={})
+            db.session.add(entry)
+            db.session.flush()
+            # Bypass the column default, as imports of old data do
+            entry.submitted_at = submitted_at
+        db.session.commit()
+        form_id = form.id
+    
+    ids = []
+    query = 'limit=1'
+    while query is not None:
+        body = client.get(f'/api/forms/{form_id}/entries?{query}').get_json()
+        ids.extend(entry['id'] for entry in body['entries'])
+        query = f"limit=1&after={body['next_cursor']}" if body['next_cursor'] else None
+    
+    assert ids == [3, 1, 4, 2]
@@ -0,0 +1,23 @@
+import csv
+import io
+import json
+
+from src.models.form import db, Form, FormEntry
+from src.services.export import generate_csv
+
+def test_csv_keeps_data_of_removed_fields(app):
+    with app.app_context():
+        form = Form(name='Contact', fields=[{'name': 'name', 'type': 'text', 'label': 'Name'}])
+        db.session.add(form)
+        db.session.flush()
+        db.session.add_all([
+            FormEntry(form_id=form.id, data={'name': 'Ada', 'phone': '555', 'ID': 'x'}),
+            FormEntry(form_id=form.id, data={'name': 'Grace'}),
+        ])
+        db.session.commit()
+        
+        rows = list(csv.DictReader(io.StringIO(''.join(generate_csv(form)))))
+    
+    assert [row['name'] for row in rows] == ['Grace', 'Ada']
+    assert rows[0]['Other Fields'] == ''
+    assert json.loads(rows[1]['Other Fields']) == {'phone': '555', 'ID': 'x'}
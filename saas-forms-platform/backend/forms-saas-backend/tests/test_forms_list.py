@@ -0,0 +1,54 @@
+from sqlalchemy import event
+
+from src.models.form import db, Form, FormEntry
+
+FORMS = 5
+ENTRIES_PER_FORM = 4
+
+def seed(app):
+    with app.app_context():
+        for i in range(FORMS):
+            form = Form(name=f'Form {i}', fields=[{'name': 'a', 'type': 'text', 'label': 'A'}])
+            db.session.add(form)
+            db.session.flush()
+            for j in range(ENTRIES_PER_FORM):
+                entry = FormEntry(form_id=form.id)
+                entry.set_data({'a': f'value {j}'})
+                db.session.add(entry)
+        db.session.commit()
+
+def count_statements(app, fn):
+    """Call fn and return (its result, the SQL statements it issued)"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        return fn(), statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+def test_list_forms_issues_one_statement(app, client):
+    seed(app)
+    
+    response, statements = count_statements(app, lambda: client.get('/api/forms'))
+    
+    assert response.status_code == 200
+    forms = response.get_json()['forms']
+    assert len(forms) == FORMS
+    assert all(form['entry_count'] == ENTRIES_PER_FORM for form in forms)
+    assert len(statements) == 1, statements
+
+def test_list_forms_statements_do_not_grow_with_entries(app, client):
+    seed(app)
+    seed(app)
+    
+    response, statements = count_statements(app, lambda: client.get('/api/forms?limit=3'))
+    
+    assert response.status_code == 200
+    assert len(response.get_json()['forms']) == 3
+    assert len(statements) == 1, statements
@@ -0,0 +1,28 @@
+import pytest
+
+from src.models.job import db, Job
+from src.routes.jobs import jobs_bp
+
+@pytest.fixture
+def jobs_client(app):
+    app.register_blueprint(jobs_bp, url_prefix='/api')
+    with app.app_context():
+        db.session.add_all([Job(id='a' * 32, type='export', tenant='default'),
+                            Job(id='b' * 32, type='export', tenant='acme')])
+        db.session.commit()
+    return app.test_client()
+
+def job_ids(client, tenant):
+    response = client.get('/api/jobs', headers={'X-Tenant-ID': tenant})
+    return [job['id'] for job in response.get_json()['jobs']]
+
+@pytest.mark.parametrize('trusted_proxies', [None, 0])
+def test_tenant_header_is_ignored_without_a_proxy(app, jobs_client, trusted_proxies):
+    app.config['TRUSTED_PROXIES'] = trusted_proxies
+    
+    assert job_ids(jobs_client, 'acme') == ['a' * 32]
+
+def test_tenant_header_is_honoured_behind_a_proxy(app, jobs_client):
+    app.config['TRUSTED_PROXIES'] = 1
+    
+    assert job_ids(jobs_client, 'acme') == ['b' * 32]
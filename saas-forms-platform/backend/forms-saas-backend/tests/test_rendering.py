@@ -0,0 +1,53 @@
+import re
+
+import pytest
+
+from src.models.form import db, Form
+from src.routes.forms import render_embed
+from src.services.rendering import render_fields
+
+@pytest.mark.parametrize('rows, expected', [(6, '6'), ('8', '8'), ('tall', '4'), (None, '4'), (-2, '4'), ([3], '4')])
+def test_textarea_rows(rows, expected):
+    html = render_fields([{'name': 'message', 'type': 'textarea', 'label': 'Message', 'rows': rows}])
+    
+    assert f'rows="{expected}"' in html
+
+def test_embed_renders_a_textarea_with_bad_rows(app, client):
+    response = client.post('/api/forms', json={
+        'name': 'Feedback',
+        'fields': [{'name': 'message', 'type': 'textarea', 'label': 'Message', 'rows': 'tall'}]
+    })
+    form_id = response.get_json()['form']['id']
+    
+    response = client.get(f'/api/embed/{form_id}')
+    
+    assert response.status_code == 200
+    assert b'rows="4"' in response.data
+
+def test_embed_skips_a_render_of_an_older_version(app, client):
+    response = client.post('/api/forms', json={
+        'name': 'Feedback', 'fields': [{'name': 'message', 'type': 'text', 'label': 'Old label'}]
+    })
+    form_id = response.get_json()['form']['id']
+    with app.app_context():
+        old_form = db.session.get(Form, form_id)
+        db.session.expunge(old_form)
+    client.put(f'/api/forms/{form_id}', json={'fields': [{'name': 'message', 'type': 'text', 'label': 'New label'}]})
+    
+    # A request that loaded the form before the update stores its render late
+    with app.app_context():
+        render_embed(old_form)
+    response = client.get(f'/api/embed/{form_id}')
+    
+    assert b'New label' in response.data
+
+@pytest.mark.parametrize('field_type', ['radio', 'checkbox'])
+def test_labels_point_at_rendered_controls(field_type):
+    html = render_fields([
+        {'name': 'email', 'type': 'email', 'label': 'Email'},
+        {'name': 'size', 'type': field_type, 'label': 'Size', 'options': ['S', 'M']},
+    ])
+    
+    ids = set(re.findall(r' id="([^"]+)"', html))
+    assert set(re.findall(r' for="([^"]+)"', html)) <= ids
+    assert set(re.findall(r' aria-labelledby="([^"]+)"', html)) == {'size-label'} <= ids
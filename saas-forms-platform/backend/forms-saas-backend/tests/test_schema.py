@@ -0,0 +1,59 @@
+from flask import Flask
+
+from src.models.engine import configure_database, init_database
+from src.models.form import db, Form, FormEntry
+from src.models.schema import migrate_schema, pending_drops
+from src.services.export import generate_csv
+
+def make_app(path):
+    app = Flask(__name__)
+    configure_database(app, f'sqlite:///{path}')
+    init_database(app)
+    return app
+
+def test_startup_only_adds_to_an_old_database(old_database):
+    app = make_app(old_database)
+    
+    with app.app_context():
+        assert pending_drops() == {'forms': ['embed_code', 'iframe_code'], 'form_entries': ['ip_address', 'user_agent']}
+        assert FormEntry.query.count() == 1
+        db.session.remove()
+        db.engine.dispose()
+    
+    # A second worker starting against the same database changes nothing
+    app = make_app(old_database)
+    with app.app_context():
+        assert 'form_entries' in pending_drops()
+        db.session.remove()
+        db.engine.dispose()
+
+def test_migrate_schema_converts_and_drops_old_columns(old_database):
+    app = make_app(old_database)
+    
+    with app.app_context():
+        converted, dropped = migrate_schema()
+        
+        assert converted == 1
+        assert dropped == {'forms': ['embed_code', 'iframe_code'], 'form_entries': ['ip_address', 'user_agent']}
+        assert pending_drops() == {}
+        entry = FormEntry.query.one()
+        assert (entry.ip_address, entry.user_agent) == ('10.0.0.1', 'curl/8')
+        assert migrate_schema() == (0, {})
+        db.session.remove()
+        db.engine.dispose()
+
+def test_entries_keep_client_details_until_migrated(old_database):
+    app = make_app(old_database)
+    
+    with app.app_context():
+        entry = FormEntry.query.one()
+        assert (entry.ip_address, entry.user_agent) == ('10.0.0.1', 'curl/8')
+        assert ''.join(generate_csv(db.session.get(Form, 1))).splitlines()[1] == '1,2024-01-02 00:00:00,10.0.0.1,x,'
+        db.session.remove()
+        
+        migrate_schema()
+        db.session.remove()
+        entry = FormEntry.query.one()
+        assert (entry.ip_address, entry.user_agent) == ('10.0.0.1', 'curl/8')
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,27 @@
+import pytest
+
+from src.models.form import db
+from src.models.search import FTS_TABLE, rebuild_search_index
+from src.services.search import search_backend
+
+@pytest.fixture
+def database_path(old_database):
+    return old_database
+
+def search_ids(client, q):
+    response = client.get(f'/api/forms/1/entries/search?q={q}')
+    assert response.status_code == 200
+    return [entry['id'] for entry in response.get_json()['entries']]
+
+def test_startup_leaves_indexing_old_entries_to_rebuild_search(app, client):
+    with app.app_context():
+        # Startup created the index without filling it
+        assert db.session.execute(db.text(f'SELECT count(*) FROM {FTS_TABLE}')).scalar() == 0
+        assert search_backend() == 'scan'
+    assert search_ids(client, 'x') == [1]
+    
+    with app.app_context():
+        assert rebuild_search_index(db.engine)
+        db.session.remove()
+        assert search_backend() == 'fts5'
+    assert search_ids(client, 'x') == [1]
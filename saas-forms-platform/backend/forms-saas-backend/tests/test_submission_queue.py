@@ -0,0 +1,97 @@
+from datetime import datetime
+import threading
+import time
+
+import pytest
+
+from src.models.form import db, Form, FormEntry
+from src.services.dedup import idempotency_submission_key
+from src.services.ingest import PendingSubmission, init_submission_queue
+
+@pytest.fixture
+def submission_queue(app):
+    app.config['SUBMISSION_QUEUE_ENABLED'] = True
+    submission_queue = init_submission_queue(app)
+    yield submission_queue
+    submission_queue.stop()
+
+@pytest.fixture
+def form_id(app):
+    with app.app_context():
+        form = Form(name='Contact', fields=[{'name': 'name', 'type': 'text', 'label': 'Name'}])
+        db.session.add(form)
+        db.session.commit()
+        return form.id
+
+def wait_for_status(client, status_url, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(status_url)
+        if response.get_json()['status'] == status or time.monotonic() > deadline:
+            return response
+        time.sleep(0.01)
+
+def test_unacknowledged_submission_returns_a_receipt(app, client, submission_queue, form_id):
+    app.config['SUBMISSION_ACK_TIMEOUT'] = 0
+    
+    response = client.post(f'/api/forms/{form_id}/submit', json={'data': {'name': 'Ada'}})
+    
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['receipt'] and body['stored'] is False
+    assert response.headers['Location'] == body['status_url']
+    
+    stored = wait_for_status(client, body['status_url'], 'stored')
+    assert stored.status_code == 200
+    with app.app_context():
+        assert db.session.get(FormEntry, stored.get_json()['entry_id']) is not None
+    
+    # Resending with the receipt as Idempotency-Key does not create a second entry
+    app.config['SUBMISSION_ACK_TIMEOUT'] = 10
+    replay = client.post(f'/api/forms/{form_id}/submit', json={'data': {'name': 'Ada'}},
+                         headers={'Idempotency-Key': body['receipt']})
+    assert replay.get_json()['duplicate'] is True
+    assert replay.get_json()['entry_id'] == stored.get_json()['entry_id']
+
+def test_unknown_receipt_is_not_found(client, submission_queue, form_id):
+    response = client.get(f'/api/forms/{form_id}/submissions/missing')
+    
+    assert response.status_code == 404
+    assert response.get_json()['status'] == 'unknown'
+
+def test_receipt_is_queued_until_written(app, submission_queue, form_id):
+    started = threading.Event()
+    release = threading.Event()
+    flush = submission_queue._flush
+    
+    def blocked_flush(batch):
+        started.set()
+        release.wait(5)
+        flush(batch)
+    
+    submission_queue._flush = blocked_flush
+    key = idempotency_submission_key('receipt-1', datetime.utcnow())
+    first = submission_queue.submit(form_id, {'name': 'Ada'}, None, None, keys=[key])
+    started.wait(5)
+    second = submission_queue.submit(form_id, {'name': 'Ada'}, None, None, keys=[key])
+    assert submission_queue.is_queued(form_id, key[0])
+    
+    release.set()
+    first.done.wait(5)
+    second.done.wait(5)
+    assert not submission_queue.is_queued(form_id, key[0])
+    assert second.duplicate and second.entry_id == first.entry_id
+
+def test_bad_submission_fails_alone(app, submission_queue, form_id):
+    batch = [PendingSubmission(form_id, {'name': 'Ada'}, None, None),
+             PendingSubmission(form_id, {'name': object()}, None, None),
+             PendingSubmission(form_id, {'name': 'Grace'}, None, None)]
+    
+    with app.app_context():
+        submission_queue._flush(batch)
+        
+        assert batch[1].error is not None and batch[1].entry_id is None
+        for pending in (batch[0], batch[2]):
+            assert pending.error is None
+            assert db.session.get(FormEntry, pending.entry_id).get_data() == pending.data
+    assert submission_queue.stats()['failed'] == 1